@@ -0,0 +1,75 @@
+from dataclasses import dataclass
+import json
+import os
+from pathlib import Path
+from timeit import Timer
+from typing import Optional
+
+from ..utils.slotted_dataclass import add_slots
+from .benchmark_suite import Benchmark
+
+
+@add_slots
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    seconds_per_call: float
+
+
+@add_slots
+@dataclass(frozen=True)
+class BenchmarkComparison:
+    name: str
+    seconds_per_call: float
+    baseline_seconds_per_call: Optional[float]
+
+    @property
+    def change(self) -> Optional[float]:
+        if not self.baseline_seconds_per_call:
+            return None
+
+        return self.seconds_per_call / self.baseline_seconds_per_call - 1
+
+    def is_regression(self, threshold: float) -> bool:
+        return self.change is not None and self.change > threshold
+
+
+def measure_benchmark(benchmark: Benchmark, repeat_count: int = 5) -> BenchmarkResult:
+    timer = Timer(benchmark.run)
+    # calls are batched so that each measurement takes at least 0.2 seconds
+    (call_count, _) = timer.autorange()
+    # the fastest measurement is the one least disturbed by other processes
+    duration = min(timer.repeat(repeat=repeat_count, number=call_count))
+
+    return BenchmarkResult(name=benchmark.name, seconds_per_call=duration / call_count)
+
+
+def compare_benchmark_result(
+    result: BenchmarkResult, baseline: dict[str, float]
+) -> BenchmarkComparison:
+    return BenchmarkComparison(
+        name=result.name,
+        seconds_per_call=result.seconds_per_call,
+        baseline_seconds_per_call=baseline.get(result.name),
+    )
+
+
+def load_benchmark_baseline(baseline_file_path: Path) -> dict[str, float]:
+    if not baseline_file_path.is_file():
+        return {}
+
+    return {
+        name: float(seconds_per_call)
+        for name, seconds_per_call in json.loads(baseline_file_path.read_text()).items()
+    }
+
+
+def save_benchmark_baseline(baseline_file_path: Path, results: list[BenchmarkResult]):
+    # results of benchmarks that haven't been run are kept
+    baseline = {
+        **load_benchmark_baseline(baseline_file_path),
+        **{result.name: result.seconds_per_call for result in results},
+    }
+    temporary_file_path = baseline_file_path.with_name(f"{baseline_file_path.name}.tmp")
+    temporary_file_path.write_text(json.dumps(baseline, indent=2, sort_keys=True))
+    os.replace(temporary_file_path, baseline_file_path)
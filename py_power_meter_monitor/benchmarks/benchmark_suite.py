@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable
+
+from ..iec_62056_protocol.block_check_character import get_block_check_character
+from ..iec_62056_protocol.data_block import DataBlock
+from ..iec_62056_protocol.iec_62056_21_messages import (
+    DataMessage,
+    IdentificationMessage,
+)
+from ..iec_62056_protocol.mode_c_state_machine import (
+    InitialState,
+    ReceiveMessageEvent,
+    ResetEvent,
+    get_next_state,
+)
+from ..iec_62056_protocol.obis_data_block import ObisDataBlock
+from ..iec_62056_protocol.obis_data_set import parse_obis_id_from_address
+from ..utils.slotted_dataclass import add_slots
+from ..workers.iec_62056_obis_data_set_mqtt_logger import (
+    compile_mqtt_publish_plan,
+    get_configuration_payload,
+    get_device_state_payload,
+)
+from .benchmark_workloads import BenchmarkWorkload
+
+
+@add_slots
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    run: Callable[[], Any]
+
+
+def get_benchmarks(workloads: list[BenchmarkWorkload]) -> list[Benchmark]:
+    return [
+        benchmark
+        for workload in workloads
+        for benchmark in get_workload_benchmarks(workload)
+    ]
+
+
+def get_workload_benchmarks(workload: BenchmarkWorkload) -> list[Benchmark]:
+    frame = workload.data_message_frame
+    data_message = DataMessage.from_bytes(timestamp=0, frame=frame)
+    obis_data_block = ObisDataBlock.from_iec_62056_21_data_block(
+        obis_data_set_configs=workload.obis_data_set_configs_by_id,
+        data_block=data_message.data,
+    )
+    addresses = [data_set.address for data_set in data_message.data.data_lines]
+    mqtt_config = workload.mqtt_config
+    publish_plan = compile_mqtt_publish_plan(
+        mqtt_config, workload.obis_data_set_configs_by_id.values()
+    )
+    entity_plans = [
+        (obis_data_set, publish_plan[obis_data_set.id])
+        for obis_data_set in obis_data_block.data_sets
+        if obis_data_set.id in publish_plan
+    ]
+    identification_event = ReceiveMessageEvent(
+        message=IdentificationMessage(
+            timestamp=0,
+            manufacturer_id="LOG",
+            baud_rate_id="5",
+            mode_ids="",
+            identification="LK13BE",
+        )
+    )
+    data_event = ReceiveMessageEvent(message=data_message)
+
+    def parse_obis_ids():
+        for address in addresses:
+            parse_obis_id_from_address(address)
+
+    def run_readout():
+        (state, _) = get_next_state(InitialState(), ResetEvent())
+        (state, _) = get_next_state(state, identification_event)
+        get_next_state(state, data_event)
+
+    def get_configuration_payloads():
+        for (obis_data_set, entity_plan) in entity_plans:
+            get_configuration_payload(
+                mqtt_config=mqtt_config,
+                obis_data_set_config=entity_plan.obis_data_set_config,
+                obis_data_block=obis_data_block,
+                obis_data_set=obis_data_set,
+            )
+
+    def get_state_payloads():
+        for (obis_data_set, entity_plan) in entity_plans:
+            entity_plan.serialize_state(obis_data_set)
+
+    def get_device_state_payloads():
+        get_device_state_payload(
+            obis_data_block,
+            {
+                entity_plan.device_state_key: obis_data_set.value
+                for (obis_data_set, entity_plan) in entity_plans
+            },
+        )
+
+    benchmarks = {
+        # the block check character covers everything after the start of text
+        "get_block_check_character": partial(get_block_check_character, frame[1:-1]),
+        "DataMessage.from_bytes": partial(
+            DataMessage.from_bytes, timestamp=0, frame=frame
+        ),
+        "DataBlock.from_bytes": partial(
+            DataBlock.from_bytes,
+            timestamp=0,
+            data=frame,
+            start=len(DataMessage.initiator),
+            end=len(frame)
+            - len(DataMessage.terminator)
+            - DataMessage.extra_bytes_after_terminator,
+        ),
+        "parse_obis_id_from_address": parse_obis_ids,
+        "ObisDataBlock.from_iec_62056_21_data_block": partial(
+            ObisDataBlock.from_iec_62056_21_data_block,
+            obis_data_set_configs=workload.obis_data_set_configs_by_id,
+            data_block=data_message.data,
+        ),
+        "get_next_state": run_readout,
+        "get_configuration_payload": get_configuration_payloads,
+        "serialize_state": get_state_payloads,
+        "get_device_state_payload": get_device_state_payloads,
+    }
+
+    return [
+        Benchmark(name=f"{workload.name}/{name}", run=run)
+        for (name, run) in benchmarks.items()
+    ]
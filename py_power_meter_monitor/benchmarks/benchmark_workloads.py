@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+from ..config import (
+    MqttConfig,
+    ObisDataSetConfig,
+    ObisFloatDataSetConfig,
+    ObisStringDataSetConfig,
+    load_configuration_from_file_path,
+)
+from ..iec_62056_protocol.data_block import DataBlock, DataSet
+from ..iec_62056_protocol.iec_62056_21_messages import DataMessage
+from ..iec_62056_protocol.obis_data_set import ObisId, format_obis_id
+from ..utils.slotted_dataclass import add_slots
+
+synthetic_line_count = 10000
+
+
+@add_slots
+@dataclass(frozen=True)
+class BenchmarkWorkload:
+    name: str
+    mqtt_config: MqttConfig
+    obis_data_set_configs_by_id: dict[ObisId, ObisDataSetConfig]
+    data_message_frame: bytes
+
+
+def load_meter_workloads(config_directory: Path) -> list[BenchmarkWorkload]:
+    workloads: list[BenchmarkWorkload] = []
+
+    for config_file_path in sorted(config_directory.glob("*-config.toml")):
+        configuration = load_configuration_from_file_path(config_file_path)
+        meter_configs = configuration.meter_configs
+
+        for meter_index, meter_config in enumerate(meter_configs):
+            name = config_file_path.stem.removesuffix("-config")
+            obis_data_set_configs = meter_config.obis.data_sets
+            workloads.append(
+                BenchmarkWorkload(
+                    name=f"{name}-{meter_index}" if len(meter_configs) > 1 else name,
+                    mqtt_config=configuration.mqtt.copy(
+                        update={"device": meter_config.device}
+                    ),
+                    obis_data_set_configs_by_id={
+                        obis_data_set_config.id: obis_data_set_config
+                        for obis_data_set_config in obis_data_set_configs
+                    },
+                    data_message_frame=get_data_message_frame(
+                        get_data_set(obis_data_set_config, index)
+                        for index, obis_data_set_config in enumerate(
+                            obis_data_set_configs
+                        )
+                    ),
+                )
+            )
+
+    return workloads
+
+
+def create_synthetic_workload(
+    line_count: int = synthetic_line_count,
+) -> BenchmarkWorkload:
+    # the meter id, followed by one energy register per tariff of many
+    # measured quantities
+    obis_data_set_configs: list[ObisDataSetConfig] = [
+        ObisStringDataSetConfig(
+            id=(1, 0, 96, 1, 0, 255), name="Meter Id", value_type="string"
+        ),
+        *(
+            ObisFloatDataSetConfig(
+                id=(1, 0, 1 + index // 100, 8, index % 100, 255),
+                name=f"Synthetic Register {index}",
+                value_type="float",
+            )
+            for index in range(line_count - 1)
+        ),
+    ]
+
+    return BenchmarkWorkload(
+        name=f"synthetic-{line_count}",
+        mqtt_config=MqttConfig(),
+        obis_data_set_configs_by_id={
+            obis_data_set_config.id: obis_data_set_config
+            for obis_data_set_config in obis_data_set_configs
+        },
+        data_message_frame=get_data_message_frame(
+            get_data_set(obis_data_set_config, index)
+            for index, obis_data_set_config in enumerate(obis_data_set_configs)
+        ),
+    )
+
+
+def get_data_message_frame(data_sets: Iterable[DataSet]) -> bytes:
+    return bytes(
+        DataMessage(
+            timestamp=0,
+            data=DataBlock(manufacturer_identification="", data_lines=list(data_sets)),
+        )
+    )
+
+
+def get_data_set(obis_data_set_config: ObisDataSetConfig, index: int) -> DataSet:
+    address = format_obis_id(obis_data_set_config.id)
+
+    if obis_data_set_config.value_type == "string":
+        return DataSet(
+            timestamp=0, address=address, value=f"1LOG{index:08d}", unit=None
+        )
+    elif obis_data_set_config.value_type == "integer":
+        return DataSet(timestamp=0, address=address, value=f"{index:06d}", unit="W")
+    else:
+        return DataSet(
+            timestamp=0,
+            address=address,
+            value=f"{12345.6789 + index:010.4f}",
+            unit=get_unit(obis_data_set_config.id),
+        )
+
+
+def get_unit(id: ObisId) -> Optional[str]:
+    # the units of common measured quantities and types of measurement
+    (quantity, measurement_type) = id[2:4]
+
+    if measurement_type == 8:
+        return "kWh"
+    elif quantity in (32, 52, 72):
+        return "V"
+    elif quantity in (31, 51, 71):
+        return "A"
+    elif quantity == 14:
+        return "Hz"
+    elif measurement_type == 7:
+        return "W"
+    else:
+        return None
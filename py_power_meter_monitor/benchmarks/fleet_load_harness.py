@@ -0,0 +1,250 @@
+import asyncio
+from dataclasses import dataclass
+from math import ceil
+import os
+from pathlib import Path
+from random import Random
+import re
+import resource
+from time import monotonic, time
+from typing import Optional
+
+import asyncio_mqtt  # type: ignore
+
+from ..commands.monitor_serial import create_meter_pipeline
+from ..config import (
+    MeterConfig,
+    MqttConfig,
+    MqttDeviceConfig,
+    ObisConfig,
+    ObisDataSetConfig,
+    ObisFloatDataSetConfig,
+    ObisStringDataSetConfig,
+    ReadoutMode,
+)
+from ..iec_62056_protocol.iec_62056_21_messages import IdentificationMessage
+from ..utils.memory_serial_stream import MemorySerialStream
+from ..utils.slotted_dataclass import add_slots
+from ..workers.mode_c_meter_simulator import (
+    create_synthetic_data_messages,
+    simulate_mode_c_meter,
+)
+
+# state payloads start with the time at which their data set was read
+state_timestamp_pattern = re.compile(rb'\{"timestamp": ([-+.0-9eE]+)')
+event_loop_probe_interval = 0.01
+
+
+@add_slots
+@dataclass(frozen=True)
+class LoadTestStepResult:
+    meter_count: int
+    duration: float
+    published_count: int
+    state_published_count: int
+    latency_percentiles: tuple[Optional[float], Optional[float], Optional[float]]
+    resident_set_size: int
+    event_loop_lag_percentile: Optional[float]
+    maximum_event_loop_lag: Optional[float]
+
+    @property
+    def publish_rate(self) -> float:
+        return self.published_count / self.duration if self.duration else 0.0
+
+    @property
+    def state_publish_rate(self) -> float:
+        return self.state_published_count / self.duration if self.duration else 0.0
+
+
+class PublicationRecorder:
+    def __init__(self):
+        self.published_count = 0
+        self.latencies: list[float] = []
+
+    def record(self, topic: str, payload: bytes):
+        self.published_count += 1
+
+        if (match := state_timestamp_pattern.match(payload)) is not None:
+            self.latencies.append(time() - float(match[1]))
+
+    def reset(self):
+        self.published_count = 0
+        self.latencies = []
+
+
+async def run_load_test_step(
+    meter_count: int,
+    meter_config: MeterConfig,
+    mqtt_client: asyncio_mqtt.Client,
+    mqtt_config: MqttConfig,
+    recorder: PublicationRecorder,
+    identification: IdentificationMessage,
+    register_count: int,
+    polling_delay: float,
+    response_delay: float,
+    warm_up_duration: float,
+    step_duration: float,
+    seed: int,
+) -> LoadTestStepResult:
+    streams = [MemorySerialStream() for _ in range(meter_count)]
+    event_loop_lags: list[float] = []
+    sinks = [asyncio.create_task(probe_event_loop_lag(event_loop_lags))]
+    readers: list["asyncio.Task[None]"] = []
+
+    for index, stream in enumerate(streams):
+        readers.append(
+            asyncio.create_task(
+                simulate_mode_c_meter(
+                    reader=stream.meter_reader,
+                    write=stream.send_from_meter,
+                    identification=identification,
+                    get_data_message=create_synthetic_data_messages(
+                        register_count, Random(seed + index)
+                    ),
+                    response_delay=response_delay,
+                )
+            )
+        )
+        (reader, meter_sinks) = start_meter_pipeline(
+            meter_config=get_load_test_meter_config(
+                meter_config, index, register_count, polling_delay
+            ),
+            serial_port=stream,
+            mqtt_client=mqtt_client,
+            mqtt_config=mqtt_config,
+        )
+        readers.append(reader)
+        sinks.extend(meter_sinks)
+
+    try:
+        # the first readouts of all meters start at the same time, which isn't
+        # representative of the steady state
+        await asyncio.sleep(warm_up_duration)
+        recorder.reset()
+        event_loop_lags.clear()
+        start_time = monotonic()
+        await asyncio.sleep(step_duration)
+        duration = monotonic() - start_time
+        latencies = sorted(recorder.latencies)
+        sorted_event_loop_lags = sorted(event_loop_lags)
+
+        return LoadTestStepResult(
+            meter_count=meter_count,
+            duration=duration,
+            published_count=recorder.published_count,
+            state_published_count=len(latencies),
+            latency_percentiles=(
+                get_percentile(latencies, 0.5),
+                get_percentile(latencies, 0.95),
+                get_percentile(latencies, 0.99),
+            ),
+            resident_set_size=get_resident_set_size(),
+            event_loop_lag_percentile=get_percentile(sorted_event_loop_lags, 0.99),
+            maximum_event_loop_lag=get_percentile(sorted_event_loop_lags, 1.0),
+        )
+    finally:
+        # the readers and simulated meters stop at the end of their streams
+        for stream in streams:
+            stream.close()
+
+        await asyncio.gather(*readers, return_exceptions=True)
+
+        for sink in sinks:
+            sink.cancel()
+
+        await asyncio.gather(*sinks, return_exceptions=True)
+
+
+def start_meter_pipeline(
+    meter_config: MeterConfig,
+    serial_port: MemorySerialStream,
+    mqtt_client: asyncio_mqtt.Client,
+    mqtt_config: MqttConfig,
+) -> tuple["asyncio.Task[None]", list["asyncio.Task[None]"]]:
+    # the pipeline of `monitor_meter`, whose reader is stopped before the sinks
+    (reader, sinks) = create_meter_pipeline(
+        meter_config=meter_config,
+        serial_port=serial_port,
+        mqtt_client=mqtt_client,
+        mqtt_config=mqtt_config,
+    )
+
+    return (
+        asyncio.create_task(reader),
+        [asyncio.create_task(sink) for sink in sinks],
+    )
+
+
+def get_load_test_meter_config(
+    meter_config: MeterConfig, index: int, register_count: int, polling_delay: float
+) -> MeterConfig:
+    return meter_config.copy(
+        update={
+            "serial_port": meter_config.serial_port.copy(
+                update={
+                    "port_url": f"memory://{index}",
+                    "baud_rate": 300,
+                    "polling_delay": polling_delay,
+                    "readout_mode": ReadoutMode.DATA,
+                    "adaptive_baud_rate": False,
+                    "capture_file": None,
+                }
+            ),
+            "device": MqttDeviceConfig(
+                id=f"load-test-meter-{index}", name=f"Load Test Meter {index}"
+            ),
+            "obis": ObisConfig(
+                data_sets=get_synthetic_obis_data_set_configs(register_count)
+            ),
+        }
+    )
+
+
+def get_synthetic_obis_data_set_configs(
+    register_count: int,
+) -> list[ObisDataSetConfig]:
+    # the data sets of the synthetic data messages of the meter simulator
+    return [
+        ObisStringDataSetConfig(
+            id=(1, 0, 96, 1, 0, 255), name="Meter Id", value_type="string"
+        ),
+        ObisFloatDataSetConfig(
+            id=(1, 0, 16, 7, 0, 255), name="Power", value_type="float"
+        ),
+        *(
+            ObisFloatDataSetConfig(
+                id=(1, 0, 1, 8, index, 255),
+                name=f"Energy Register {index}",
+                value_type="float",
+            )
+            for index in range(register_count)
+        ),
+    ]
+
+
+async def probe_event_loop_lag(
+    event_loop_lags: list[float], interval: float = event_loop_probe_interval
+):
+    # a busy event loop resumes sleeping tasks late
+    while True:
+        deadline = monotonic() + interval
+        await asyncio.sleep(interval)
+        event_loop_lags.append(max(0.0, monotonic() - deadline))
+
+
+def get_percentile(sorted_values: list[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+
+    # nearest rank
+    return sorted_values[max(0, ceil(fraction * len(sorted_values)) - 1)]
+
+
+def get_resident_set_size() -> int:
+    try:
+        page_count = int(Path("/proc/self/statm").read_text().split()[1])
+    except OSError:
+        # without procfs only the peak size is known
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    return page_count * os.sysconf("SC_PAGE_SIZE")
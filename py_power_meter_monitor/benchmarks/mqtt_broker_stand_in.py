@@ -0,0 +1,109 @@
+import asyncio
+from logging import getLogger
+from typing import Callable, Optional
+
+logger = getLogger(__package__)
+
+connect_packet_type = 1
+publish_packet_type = 3
+publish_release_packet_type = 6
+subscribe_packet_type = 8
+ping_request_packet_type = 12
+disconnect_packet_type = 14
+
+connection_acknowledgement_packet = b"\x20\x02\x00\x00"
+ping_response_packet = b"\xd0\x00"
+
+
+class MqttBrokerStandIn:
+    # accepts the connections and publications of MQTT 3.1.1 clients like a
+    # broker would, but only hands the publications to a callback instead of
+    # forwarding them to subscribers
+    def __init__(self, on_publish: Callable[[str, bytes], None]):
+        self.on_publish = on_publish
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, hostname: str = "127.0.0.1") -> int:
+        # the port is chosen by the operating system
+        self.server = await asyncio.start_server(self.serve_client, hostname, 0)
+
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self.server is None:
+            return
+
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def serve_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            while True:
+                (packet_type, flags, body) = await read_mqtt_packet(reader)
+
+                if packet_type == connect_packet_type:
+                    writer.write(connection_acknowledgement_packet)
+                elif packet_type == publish_packet_type:
+                    self.receive_publication(writer, flags, body)
+                elif packet_type == publish_release_packet_type:
+                    writer.write(b"\x70\x02" + body[:2])
+                elif packet_type == subscribe_packet_type:
+                    writer.write(get_subscription_acknowledgement_packet(body))
+                elif packet_type == ping_request_packet_type:
+                    writer.write(ping_response_packet)
+                elif packet_type == disconnect_packet_type:
+                    break
+                else:
+                    logger.warning(f"MQTT broker stand-in ignored packet {packet_type}")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def receive_publication(
+        self, writer: asyncio.StreamWriter, flags: int, body: bytes
+    ):
+        quality_of_service = (flags >> 1) & 0x03
+        topic_end = 2 + int.from_bytes(body[:2], "big")
+        payload_start = topic_end + (2 if quality_of_service else 0)
+        packet_id = body[topic_end:payload_start]
+
+        if quality_of_service == 1:
+            writer.write(b"\x40\x02" + packet_id)
+        elif quality_of_service == 2:
+            writer.write(b"\x50\x02" + packet_id)
+
+        self.on_publish(body[2:topic_end].decode("utf-8"), body[payload_start:])
+
+
+async def read_mqtt_packet(reader: asyncio.StreamReader) -> tuple[int, int, bytes]:
+    (first_byte,) = await reader.readexactly(1)
+    remaining_length = 0
+
+    # the remaining length is encoded in up to four bytes of seven bits each
+    for shift in range(0, 28, 7):
+        (length_byte,) = await reader.readexactly(1)
+        remaining_length |= (length_byte & 0x7F) << shift
+
+        if not length_byte & 0x80:
+            break
+
+    return (
+        first_byte >> 4,
+        first_byte & 0x0F,
+        await reader.readexactly(remaining_length),
+    )
+
+
+def get_subscription_acknowledgement_packet(body: bytes) -> bytes:
+    # every subscription is granted with quality of service 0
+    subscription_count = 0
+    position = 2
+
+    while position < len(body):
+        position += 2 + int.from_bytes(body[position : position + 2], "big") + 1
+        subscription_count += 1
+
+    return bytes([0x90, 2 + subscription_count]) + body[:2] + bytes(subscription_count)
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from ..benchmark_runner import (
+    BenchmarkResult,
+    compare_benchmark_result,
+    load_benchmark_baseline,
+    save_benchmark_baseline,
+)
+from ..benchmark_suite import get_benchmarks
+from ..benchmark_workloads import create_synthetic_workload, load_meter_workloads
+
+config_directory = Path(__file__).parents[3] / "etc"
+
+
+def test_run_every_benchmark():
+    workloads = [
+        *load_meter_workloads(config_directory),
+        create_synthetic_workload(line_count=100),
+    ]
+
+    assert [workload.name for workload in workloads] == [
+        "default",
+        "landis-gyr",
+        "logarex",
+        "synthetic-100",
+    ]
+
+    for benchmark in get_benchmarks(workloads):
+        benchmark.run()
+
+
+def test_compare_with_stored_baseline(tmp_path):
+    baseline_file_path = tmp_path / "baseline.json"
+    save_benchmark_baseline(
+        baseline_file_path,
+        [BenchmarkResult(name="a", seconds_per_call=1.0)],
+    )
+    save_benchmark_baseline(
+        baseline_file_path,
+        [BenchmarkResult(name="b", seconds_per_call=2.0)],
+    )
+    baseline = load_benchmark_baseline(baseline_file_path)
+
+    assert baseline == {"a": 1.0, "b": 2.0}
+    assert compare_benchmark_result(
+        BenchmarkResult(name="a", seconds_per_call=1.5), baseline
+    ).is_regression(0.2)
+    assert not compare_benchmark_result(
+        BenchmarkResult(name="b", seconds_per_call=2.2), baseline
+    ).is_regression(0.2)
+    assert not compare_benchmark_result(
+        BenchmarkResult(name="c", seconds_per_call=3.0), baseline
+    ).is_regression(0.2)
@@ -0,0 +1,75 @@
+import asyncio
+
+import asyncio_mqtt  # type: ignore
+
+from ...config import MeterConfig, MqttConfig
+from ...iec_62056_protocol.iec_62056_21_messages import IdentificationMessage
+from ..fleet_load_harness import PublicationRecorder, get_percentile, run_load_test_step
+from ..mqtt_broker_stand_in import MqttBrokerStandIn
+
+
+def test_receive_publications_of_mqtt_client():
+    async def publish():
+        publications: list[tuple[str, bytes]] = []
+        broker = MqttBrokerStandIn(
+            on_publish=lambda topic, payload: publications.append((topic, payload))
+        )
+        port = await broker.start()
+
+        try:
+            async with asyncio_mqtt.Client(hostname="127.0.0.1", port=port) as client:
+                await client.publish("meter/state", payload=b"1", qos=0)
+                await client.publish("meter/config", payload=b"2", qos=1, retain=True)
+        finally:
+            await broker.close()
+
+        return publications
+
+    assert asyncio.run(publish()) == [("meter/state", b"1"), ("meter/config", b"2")]
+
+
+def test_measure_step_of_simulated_meters():
+    async def run_step():
+        recorder = PublicationRecorder()
+        broker = MqttBrokerStandIn(on_publish=recorder.record)
+        port = await broker.start()
+
+        try:
+            async with asyncio_mqtt.Client(hostname="127.0.0.1", port=port) as client:
+                return await run_load_test_step(
+                    meter_count=2,
+                    meter_config=MeterConfig(),
+                    mqtt_client=client,
+                    mqtt_config=MqttConfig(),
+                    recorder=recorder,
+                    identification=IdentificationMessage.from_bytes(
+                        timestamp=0, frame=b"/SIM6METER\r\n"
+                    ),
+                    register_count=2,
+                    polling_delay=0.1,
+                    response_delay=0.0,
+                    warm_up_duration=0.0,
+                    step_duration=1.5,
+                    seed=0,
+                )
+        finally:
+            await broker.close()
+
+    result = asyncio.run(run_step())
+
+    assert result.meter_count == 2
+    # the configuration and state of four data sets of each meter
+    assert result.published_count >= 16
+    assert result.state_published_count >= 8
+    assert None not in result.latency_percentiles
+    assert result.resident_set_size > 0
+    assert result.maximum_event_loop_lag is not None
+
+
+def test_get_nearest_rank_percentile():
+    values = [float(value) for value in range(1, 101)]
+
+    assert get_percentile(values, 0.5) == 50.0
+    assert get_percentile(values, 0.99) == 99.0
+    assert get_percentile(values, 1.0) == 100.0
+    assert get_percentile([], 0.5) is None
@@ -1,23 +1,45 @@
 import asyncio
+from contextlib import nullcontext
+from datetime import datetime
 from logging import basicConfig
 from pathlib import Path
-from typing import Optional
+import sys
+from typing import List, Optional
 
 import typer
 
 from .commands.monitor_serial import run_monitor_serial
-from .config import load_configuration_from_file_path, load_default_configuration
+from .commands.read_load_profile import run_read_load_profile
+from .commands.replay_session import run_replay_session
+from .commands.run_load_test import run_load_test
+from .commands.run_benchmarks import run_benchmarks
+from .commands.simulate_meter import run_simulate_meter
+from .commands.supervise_serial import run_supervised_monitor_serial
+from .config import (
+    PyPowerMeterMonitorConfig,
+    load_configuration_from_file_path,
+    load_default_configuration,
+)
+from .iec_62056_protocol.errors import ParsingError
+from .iec_62056_protocol.iec_62056_21_messages import IdentificationMessage
 
 app = typer.Typer()
 
 
-@app.command()
+# monitoring is the default when no command is given
+@app.callback(invoke_without_command=True)
 def run(
+    context: typer.Context,
     config_file: Optional[Path] = typer.Option(
         None,
         dir_okay=False,
         exists=True,
     ),
+    worker_processes: int = typer.Option(
+        0,
+        min=0,
+        help="Shard the meters across this many supervised worker processes.",
+    ),
 ):
 
     configuration = (
@@ -27,11 +49,222 @@ def run(
     )
 
     basicConfig(level=configuration.logging.level.value)
+    context.obj = configuration
+
+    if context.invoked_subcommand is not None:
+        return
+
+    if worker_processes > 0:
+        asyncio.run(
+            run_supervised_monitor_serial(
+                meter_configs=configuration.meter_configs,
+                mqtt_config=configuration.mqtt,
+                worker_process_count=worker_processes,
+                logging_level=configuration.logging.level,
+            )
+        )
+    else:
+        asyncio.run(
+            run_monitor_serial(
+                meter_configs=configuration.meter_configs,
+                mqtt_config=configuration.mqtt,
+            )
+        )
+
+
+@app.command(help="Read a load profile from a meter and write it as CSV.")
+def read_load_profile(
+    context: typer.Context,
+    start: Optional[datetime] = typer.Option(
+        None, help="Read the records from this time on."
+    ),
+    end: Optional[datetime] = typer.Option(
+        None, help="Read the records up to this time."
+    ),
+    meter: int = typer.Option(
+        0, min=0, help="The index of the meter in the configuration."
+    ),
+    profile_address: str = typer.Option("P.01"),
+    output_file: Optional[Path] = typer.Option(None, dir_okay=False),
+):
+    configuration: PyPowerMeterMonitorConfig = context.obj
+    meter_configs = configuration.meter_configs
+
+    if meter >= len(meter_configs):
+        raise typer.BadParameter(f"Only {len(meter_configs)} meters are configured.")
+
+    with (
+        output_file.open("w", newline="") if output_file else nullcontext(sys.stdout)
+    ) as output:
+        asyncio.run(
+            run_read_load_profile(
+                meter_config=meter_configs[meter],
+                start=start,
+                end=end,
+                profile_address=profile_address,
+                output=output,
+            )
+        )
+
+
+@app.command(help="Replay a captured serial session as if it was read from a meter.")
+def replay_session(
+    context: typer.Context,
+    capture_file: Path = typer.Argument(..., dir_okay=False, exists=True),
+    meter: int = typer.Option(
+        0, min=0, help="The index of the meter in the configuration."
+    ),
+    speed: float = typer.Option(
+        1.0,
+        min=0,
+        help="The replay speed relative to real time, or 0 for as fast as possible.",
+    ),
+):
+    configuration: PyPowerMeterMonitorConfig = context.obj
+    meter_configs = configuration.meter_configs
+
+    if meter >= len(meter_configs):
+        raise typer.BadParameter(f"Only {len(meter_configs)} meters are configured.")
+
+    asyncio.run(
+        run_replay_session(
+            meter_config=meter_configs[meter],
+            capture_file=capture_file,
+            speed=speed or None,
+        )
+    )
+
+
+@app.command(help="Simulate mode C meters on pseudo terminals and print their ports.")
+def simulate_meter(
+    meter_count: int = typer.Option(1, min=1, help="The number of meters."),
+    identification: str = typer.Option(
+        "SIM5METER", help="The identification sent by the meters, e.g. LOG5LK13BE."
+    ),
+    capture_file: Optional[Path] = typer.Option(
+        None,
+        dir_okay=False,
+        exists=True,
+        help="Send the first data message of this session capture.",
+    ),
+    register_count: int = typer.Option(
+        16, min=0, help="The number of energy registers of synthetic data messages."
+    ),
+    response_delay: float = typer.Option(0.2, min=0),
+    noise_rate: float = typer.Option(
+        0.0,
+        min=0,
+        max=1,
+        help="The share of data messages with a wrong block check character.",
+    ),
+    seed: Optional[int] = typer.Option(None, help="Make the simulation repeatable."),
+    link: Optional[str] = typer.Option(
+        None, help="Link the ports to this path, e.g. /tmp/meter-{index}."
+    ),
+):
+    asyncio.run(
+        run_simulate_meter(
+            meter_count=meter_count,
+            identification=parse_identification(identification),
+            capture_file=capture_file,
+            register_count=register_count,
+            response_delay=response_delay,
+            noise_rate=noise_rate,
+            seed=seed,
+            link=link,
+        )
+    )
+
+
+@app.command(help="Run the benchmarks and compare them with the stored baseline.")
+def benchmark(
+    config_directory: Path = typer.Option(
+        Path("etc"),
+        file_okay=False,
+        exists=True,
+        help="Derive realistic data blocks from the meters configured here.",
+    ),
+    baseline_file: Path = typer.Option(Path("benchmark-baseline.json"), dir_okay=False),
+    save_baseline: bool = typer.Option(
+        False, help="Store the results as the new baseline."
+    ),
+    threshold: float = typer.Option(
+        0.2, min=0, help="Fail when a benchmark is slower than the baseline by more."
+    ),
+    name_filter: Optional[str] = typer.Option(
+        None, "--filter", help="Only run the benchmarks whose name contains this."
+    ),
+    repeat_count: int = typer.Option(5, "--repeat", min=1),
+):
+    passed = run_benchmarks(
+        config_directory=config_directory,
+        baseline_file=baseline_file,
+        save_baseline=save_baseline,
+        threshold=threshold,
+        name_filter=name_filter,
+        repeat_count=repeat_count,
+        output=sys.stdout,
+    )
+
+    if not passed:
+        raise typer.Exit(code=1)
+
+
+@app.command(help="Measure how the monitor scales with the number of simulated meters.")
+def load_test(
+    context: typer.Context,
+    meter_counts: List[int] = typer.Option(
+        [1, 10, 100],
+        "--meter-count",
+        min=1,
+        help="Run a step with this many meters, repeat to ramp up.",
+    ),
+    meter: int = typer.Option(
+        0,
+        min=0,
+        help="Use the serial port settings of this meter of the configuration.",
+    ),
+    identification: str = typer.Option(
+        "SIM5METER", help="The identification sent by the meters, e.g. LOG5LK13BE."
+    ),
+    register_count: int = typer.Option(
+        16, min=0, help="The number of energy registers of the data messages."
+    ),
+    polling_delay: float = typer.Option(1.0, min=0),
+    response_delay: float = typer.Option(0.2, min=0),
+    warm_up_duration: float = typer.Option(
+        5.0, min=0, help="Discard the measurements of these seconds of each step."
+    ),
+    step_duration: float = typer.Option(30.0, min=0),
+    seed: int = typer.Option(0),
+):
+    configuration: PyPowerMeterMonitorConfig = context.obj
+    meter_configs = configuration.meter_configs
+
+    if meter >= len(meter_configs):
+        raise typer.BadParameter(f"Only {len(meter_configs)} meters are configured.")
 
     asyncio.run(
-        run_monitor_serial(
-            serial_config=configuration.serial_port,
+        run_load_test(
+            meter_config=meter_configs[meter],
             mqtt_config=configuration.mqtt,
-            obis_config=configuration.obis,
+            meter_counts=meter_counts,
+            identification=parse_identification(identification),
+            register_count=register_count,
+            polling_delay=polling_delay,
+            response_delay=response_delay,
+            warm_up_duration=warm_up_duration,
+            step_duration=step_duration,
+            seed=seed,
+            output=sys.stdout,
         )
     )
+
+
+def parse_identification(identification: str) -> IdentificationMessage:
+    try:
+        return IdentificationMessage.from_bytes(
+            timestamp=0, frame=f"/{identification}\r\n".encode("iso-8859-1")
+        )
+    except (ParsingError, UnicodeEncodeError):
+        raise typer.BadParameter(f"Invalid identification {identification}.")
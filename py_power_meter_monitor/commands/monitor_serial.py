@@ -1,35 +1,318 @@
 # pyright: reportUnknownMemberType=false
 import asyncio
+from contextlib import ExitStack
 from logging import getLogger
+from time import monotonic
+from typing import Any, Awaitable, Callable, Coroutine, Optional
 
 import asyncio_mqtt  # type: ignore
 from aioserial import AioSerial  # type: ignore
+import serial  # type: ignore
 
-from ..config import MqttConfig, ObisConfig, SerialPortConfig
+from ..config import (
+    MeterConfig,
+    MqttConfig,
+    ObisDataSetConfig,
+    ReadoutMode,
+    SerialPortConfig,
+    SerialPortTransport,
+)
+from ..iec_62056_protocol.baud_rate_negotiation import BaudRateNegotiator
+from ..iec_62056_protocol.columnar_obis_data_block import ColumnarObisDataBlockTopic
 from ..iec_62056_protocol.data_block import DataBlock
+from ..iec_62056_protocol.obis_data_block import ObisDataBlock
+from ..iec_62056_protocol.obis_data_set import ObisId, format_obis_id
+from ..utils.bounded_cache import BoundedCache
 from ..utils.publish_subscribe_topic import PublishSubscribeTopic
-from ..workers.iec_62056_data_serial_reader import read_iec_62056_data_from_serial
+from ..utils.readout_diagnostics import DecodeCacheKind, ReadoutDiagnostics
+from ..utils.restart_backoff import RestartBackoff
+from ..utils.serial_stream import SerialStream
+from ..utils.session_capture import SessionCaptureWriter
+from ..workers.iec_62056_data_serial_reader import (
+    SerialConnection,
+    read_iec_62056_data_from_serial,
+)
+from ..workers.iec_62056_obis_data_block_decoder import (
+    decode_iec_62056_obis_data_blocks,
+)
 from ..workers.iec_62056_obis_data_set_logger import log_iec_62056_obis_data_sets
 from ..workers.iec_62056_obis_data_set_mqtt_logger import (
     mqtt_log_iec_62056_obis_data_sets,
 )
+from ..workers.push_data_serial_reader import (
+    read_mode_d_data_from_serial,
+    read_sml_data_from_serial,
+)
 
 logger = getLogger(__package__)
 
 
 async def run_monitor_serial(
+    meter_configs: list[MeterConfig],
+    mqtt_config: MqttConfig,
+):
+    async with asyncio_mqtt.Client(
+        hostname=mqtt_config.broker.hostname,
+        port=mqtt_config.broker.port,
+        username=mqtt_config.broker.username,
+        password=mqtt_config.broker.password,
+    ) as mqtt_client:
+        # the meters fail and restart independently of each other
+        await asyncio.gather(
+            *[
+                supervise_meter(
+                    meter_config=meter_config,
+                    mqtt_client=mqtt_client,
+                    mqtt_config=mqtt_config,
+                )
+                for meter_config in meter_configs
+            ]
+        )
+
+
+async def supervise_meter(
+    meter_config: MeterConfig,
+    mqtt_client: asyncio_mqtt.Client,
+    mqtt_config: MqttConfig,
+    open_port: Optional[Callable[[SerialPortConfig], SerialConnection]] = None,
+):
+    async def run_meter(serial_port: SerialConnection):
+        await monitor_meter(
+            meter_config=meter_config,
+            serial_port=serial_port,
+            mqtt_client=mqtt_client,
+            mqtt_config=mqtt_config,
+        )
+
+    await supervise_serial_port(
+        serial_config=meter_config.serial_port, run=run_meter, open_port=open_port
+    )
+
+
+async def supervise_serial_port(
     serial_config: SerialPortConfig,
+    run: Callable[[SerialConnection], Awaitable[None]],
+    open_port: Optional[Callable[[SerialPortConfig], SerialConnection]] = None,
+):
+    open_port = open_port or open_serial_port
+    backoff = RestartBackoff(
+        initial_delay=serial_config.restart_delay,
+        maximum_delay=serial_config.maximum_restart_delay,
+    )
+
+    while True:
+        start_time = monotonic()
+
+        try:
+            with ExitStack() as serial_ports:
+                await run(serial_ports.enter_context(open_port(serial_config)))
+        except Exception:
+            # e.g. the device has been disconnected
+            logger.exception(f"Monitoring {serial_config.port_url} failed")
+
+        delay = backoff.get_delay(monotonic() - start_time)
+        logger.error(
+            f"Restarting the monitoring of {serial_config.port_url} in {delay}s "
+            f"(restart {backoff.restart_count})"
+        )
+        await asyncio.sleep(delay)
+
+
+async def monitor_meter(
+    meter_config: MeterConfig,
+    serial_port: SerialConnection,
+    mqtt_client: asyncio_mqtt.Client,
     mqtt_config: MqttConfig,
-    obis_config: ObisConfig,
 ):
-    data_blocks: PublishSubscribeTopic[DataBlock] = PublishSubscribeTopic()
+    (reader, sinks) = create_meter_pipeline(
+        meter_config=meter_config,
+        serial_port=serial_port,
+        mqtt_client=mqtt_client,
+        mqtt_config=mqtt_config,
+    )
+
+    await gather_or_cancel(reader, *sinks)
+
+
+def create_meter_pipeline(
+    meter_config: MeterConfig,
+    serial_port: SerialConnection,
+    mqtt_client: asyncio_mqtt.Client,
+    mqtt_config: MqttConfig,
+) -> tuple[Coroutine[Any, Any, None], list[Coroutine[Any, Any, None]]]:
+    # the reader is returned apart from the decoder and sinks it feeds, so that
+    # it can be stopped first
+    data_blocks: PublishSubscribeTopic[DataBlock] = PublishSubscribeTopic(
+        capacity=meter_config.serial_port.data_block_buffer_size
+    )
+    # blocks are decoded once and shared by all sinks
+    obis_data_blocks: PublishSubscribeTopic[ObisDataBlock] = ColumnarObisDataBlockTopic(
+        capacity=meter_config.serial_port.data_block_buffer_size
+    )
+    obis_data_set_configs_by_id = get_obis_data_set_configs_by_id(meter_config)
+    diagnostics = create_readout_diagnostics(mqtt_config)
+
+    return (
+        read_meter_data_blocks(
+            meter_config=meter_config,
+            serial_port=serial_port,
+            topic=data_blocks,
+            diagnostics=diagnostics,
+        ),
+        [
+            mqtt_log_iec_62056_obis_data_sets(
+                topic=obis_data_blocks,
+                mqtt_client=mqtt_client,
+                mqtt_config=get_meter_mqtt_config(mqtt_config, meter_config),
+                obis_data_set_configs_by_id=obis_data_set_configs_by_id,
+                diagnostics=diagnostics,
+            ),
+            decode_meter_data_blocks(
+                meter_config=meter_config,
+                obis_data_set_configs_by_id=obis_data_set_configs_by_id,
+                data_blocks=data_blocks,
+                obis_data_blocks=obis_data_blocks,
+                diagnostics=diagnostics,
+            ),
+            log_iec_62056_obis_data_sets(
+                topic=obis_data_blocks,
+                obis_data_set_configs_by_id=obis_data_set_configs_by_id,
+            )
+            if True
+            else async_noop(),
+        ],
+    )
+
+
+async def gather_or_cancel(*coroutines: Coroutine[Any, Any, None]):
+    # unlike `gather`, the remaining tasks are cancelled when one of them fails
+    tasks = [asyncio.create_task(coroutine) for coroutine in coroutines]
+
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
 
-    obis_data_set_configs_by_id = {
-        obis_data_set_config.id: obis_data_set_config
-        for obis_data_set_config in obis_config.data_sets
-    }
 
-    serial_port = AioSerial(
+async def decode_meter_data_blocks(
+    meter_config: MeterConfig,
+    obis_data_set_configs_by_id: dict[ObisId, ObisDataSetConfig],
+    data_blocks: PublishSubscribeTopic[DataBlock],
+    obis_data_blocks: PublishSubscribeTopic[ObisDataBlock],
+    diagnostics: Optional[ReadoutDiagnostics] = None,
+):
+    await decode_iec_62056_obis_data_blocks(
+        data_blocks=data_blocks,
+        obis_data_blocks=obis_data_blocks,
+        obis_data_set_configs_by_id=obis_data_set_configs_by_id,
+        obis_data_set_cache=create_decode_cache(
+            meter_config.serial_port, DecodeCacheKind.OBIS_DATA_SET, diagnostics
+        ),
+    )
+
+
+async def read_meter_data_blocks(
+    meter_config: MeterConfig,
+    serial_port: SerialConnection,
+    topic: PublishSubscribeTopic[DataBlock],
+    diagnostics: Optional[ReadoutDiagnostics] = None,
+):
+    serial_config = meter_config.serial_port
+
+    if serial_config.readout_mode == ReadoutMode.MODE_D:
+        await read_mode_d_data_from_serial(
+            topic=topic,
+            serial_port=serial_port,
+            read_timeout=serial_config.read_timeout,
+            data_set_cache=create_decode_cache(
+                serial_config, DecodeCacheKind.DATA_SET, diagnostics
+            ),
+        )
+        return
+    elif serial_config.readout_mode == ReadoutMode.SML:
+        await read_sml_data_from_serial(
+            topic=topic,
+            serial_port=serial_port,
+            read_timeout=serial_config.read_timeout,
+        )
+        return
+
+    await read_iec_62056_data_from_serial(
+        baud_rate=serial_config.baud_rate,
+        polling_delay=serial_config.polling_delay,
+        read_timeout=serial_config.read_timeout,
+        response_delay=serial_config.response_delay,
+        serial_port=serial_port,
+        topic=topic,
+        write_timeout=serial_config.write_timeout,
+        streaming_readout=serial_config.streaming_readout,
+        data_set_cache=create_decode_cache(
+            serial_config, DecodeCacheKind.DATA_SET, diagnostics
+        ),
+        readout_schedule=serial_config.readout_schedule,
+        baud_rate_negotiator=create_baud_rate_negotiator(serial_config),
+        register_addresses=get_register_addresses(meter_config),
+        keep_session=serial_config.keep_programming_session,
+        maximum_retransmissions=serial_config.maximum_retransmissions,
+        salvage_unverified_data=serial_config.salvage_unverified_data,
+        diagnostics=diagnostics,
+    )
+
+
+def get_register_addresses(meter_config: MeterConfig) -> list[str]:
+    if meter_config.serial_port.readout_mode != ReadoutMode.PROGRAMMING:
+        return []
+
+    return [
+        format_obis_id(obis_data_set_config.id)
+        for obis_data_set_config in meter_config.obis.data_sets
+    ]
+
+
+def create_decode_cache(
+    serial_config: SerialPortConfig,
+    cache_kind: DecodeCacheKind,
+    diagnostics: Optional[ReadoutDiagnostics] = None,
+) -> Optional[BoundedCache[Any, Any]]:
+    if serial_config.decode_cache_size <= 0:
+        return None
+
+    return BoundedCache(
+        maximum_size=serial_config.decode_cache_size,
+        statistics=diagnostics.decode_cache_statistics[cache_kind]
+        if diagnostics is not None
+        else None,
+    )
+
+
+def create_readout_diagnostics(
+    mqtt_config: MqttConfig,
+) -> Optional[ReadoutDiagnostics]:
+    if not mqtt_config.publish_diagnostics:
+        return None
+
+    return ReadoutDiagnostics()
+
+
+def create_baud_rate_negotiator(
+    serial_config: SerialPortConfig,
+) -> Optional[BaudRateNegotiator]:
+    if not serial_config.adaptive_baud_rate:
+        return None
+
+    return BaudRateNegotiator(state_file_path=serial_config.baud_rate_state_file)
+
+
+def open_serial_port(serial_config: SerialPortConfig) -> SerialConnection:
+    serial_port_type = (
+        AioSerial
+        if serial_config.transport == SerialPortTransport.AIOSERIAL
+        else serial.Serial
+    )
+    serial_port = serial_port_type(
         port=serial_config.port_url,
         baudrate=serial_config.baud_rate,
         bytesize=serial_config.byte_size,
@@ -41,36 +324,32 @@ async def run_monitor_serial(
         f"Opened serial connection {serial_config.port_url} with {serial_config.baud_rate} baud."
     )
 
-    with serial_port:
-        async with asyncio_mqtt.Client(
-            hostname=mqtt_config.broker.hostname,
-            port=mqtt_config.broker.port,
-            username=mqtt_config.broker.username,
-            password=mqtt_config.broker.password,
-        ) as mqtt_client:
-            await asyncio.gather(
-                mqtt_log_iec_62056_obis_data_sets(
-                    topic=data_blocks,
-                    mqtt_client=mqtt_client,
-                    mqtt_config=mqtt_config,
-                    obis_data_set_configs_by_id=obis_data_set_configs_by_id,
-                ),
-                read_iec_62056_data_from_serial(
-                    baud_rate=serial_config.baud_rate,
-                    polling_delay=serial_config.polling_delay,
-                    read_timeout=serial_config.read_timeout,
-                    response_delay=serial_config.response_delay,
-                    serial_port=serial_port,
-                    topic=data_blocks,
-                    write_timeout=serial_config.write_timeout,
-                ),
-                log_iec_62056_obis_data_sets(
-                    topic=data_blocks,
-                    obis_data_set_configs_by_id=obis_data_set_configs_by_id,
-                )
-                if True
-                else async_noop(),
-            )
+    if isinstance(serial_port, AioSerial):
+        if serial_config.capture_file is not None:
+            logger.warning("Sessions can't be captured with the aioserial transport.")
+
+        return serial_port
+
+    return SerialStream(
+        serial_port,
+        capture=SessionCaptureWriter(serial_config.capture_file)
+        if serial_config.capture_file is not None
+        else None,
+    )
+
+
+def get_obis_data_set_configs_by_id(
+    meter_config: MeterConfig,
+) -> dict[ObisId, ObisDataSetConfig]:
+    return {
+        obis_data_set_config.id: obis_data_set_config
+        for obis_data_set_config in meter_config.obis.data_sets
+    }
+
+
+def get_meter_mqtt_config(mqtt_config: MqttConfig, meter_config: MeterConfig):
+    # the entities of each meter are namespaced by its own device
+    return mqtt_config.copy(update={"device": meter_config.device})
 
 
 async def async_noop():
@@ -0,0 +1,73 @@
+import csv
+from datetime import datetime
+from logging import getLogger
+import math
+from typing import Optional, TextIO
+
+from ..config import MeterConfig
+from ..iec_62056_protocol.load_profile import (
+    LoadProfileChannel,
+    format_load_profile_request,
+)
+from ..workers.iec_62056_load_profile_serial_reader import (
+    read_iec_62056_load_profile_from_serial,
+)
+from .monitor_serial import open_serial_port
+
+logger = getLogger(__package__)
+
+
+async def run_read_load_profile(
+    meter_config: MeterConfig,
+    start: Optional[datetime],
+    end: Optional[datetime],
+    profile_address: str,
+    output: TextIO,
+):
+    serial_config = meter_config.serial_port
+    writer = csv.writer(output)
+    channels: Optional[tuple[LoadProfileChannel, ...]] = None
+    record_count = 0
+
+    with open_serial_port(serial_config) as serial_port:
+        async for load_profile_block in read_iec_62056_load_profile_from_serial(
+            serial_port=serial_port,
+            baud_rate=serial_config.baud_rate,
+            response_delay=serial_config.response_delay,
+            read_timeout=serial_config.read_timeout,
+            write_timeout=serial_config.write_timeout,
+            load_profile_request=format_load_profile_request(
+                start=start, end=end, profile_address=profile_address
+            ),
+            maximum_retransmissions=serial_config.maximum_retransmissions,
+        ):
+            if load_profile_block.channels != channels:
+                channels = load_profile_block.channels
+                writer.writerow(get_load_profile_header(channels))
+
+            for index, timestamp in enumerate(load_profile_block.timestamps):
+                writer.writerow(
+                    [
+                        datetime.fromtimestamp(timestamp).isoformat(),
+                        f"{load_profile_block.statuses[index]:02X}",
+                        *(
+                            "" if math.isnan(value) else value
+                            for value in load_profile_block.get_record_values(index)
+                        ),
+                    ]
+                )
+
+            record_count += len(load_profile_block)
+
+    logger.info(f"Read {record_count} load profile records.")
+
+
+def get_load_profile_header(channels: tuple[LoadProfileChannel, ...]) -> list[str]:
+    return [
+        "timestamp",
+        "status",
+        *(
+            f"{channel.address} [{channel.unit}]" if channel.unit else channel.address
+            for channel in channels
+        ),
+    ]
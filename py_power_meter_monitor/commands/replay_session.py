@@ -0,0 +1,97 @@
+import asyncio
+from logging import getLogger
+from pathlib import Path
+from time import monotonic
+from typing import Optional
+
+from ..config import MeterConfig
+from ..iec_62056_protocol.data_block import DataBlock
+from ..iec_62056_protocol.obis_data_block import ObisDataBlock
+from ..utils.publish_subscribe_topic import PublishSubscribeTopic
+from ..utils.readout_scheduler import ReadoutSchedule
+from ..utils.session_capture import ReplaySerialStream, read_session_records
+from ..workers.iec_62056_obis_data_set_logger import log_iec_62056_obis_data_sets
+from .monitor_serial import (
+    decode_meter_data_blocks,
+    get_obis_data_set_configs_by_id,
+    read_meter_data_blocks,
+)
+
+logger = getLogger(__package__)
+
+
+async def run_replay_session(
+    meter_config: MeterConfig,
+    capture_file: Path,
+    speed: Optional[float],
+):
+    # the pauses between readouts are part of the capture
+    replay_meter_config = meter_config.copy(
+        update={
+            "serial_port": meter_config.serial_port.copy(
+                update={
+                    "polling_delay": 0.0,
+                    "readout_schedule": ReadoutSchedule.CONTINUOUS,
+                    "response_delay": 0.0,
+                    "adaptive_baud_rate": False,
+                }
+            )
+        }
+    )
+    data_blocks: PublishSubscribeTopic[DataBlock] = PublishSubscribeTopic(
+        capacity=meter_config.serial_port.data_block_buffer_size
+    )
+    obis_data_blocks: PublishSubscribeTopic[ObisDataBlock] = PublishSubscribeTopic(
+        capacity=meter_config.serial_port.data_block_buffer_size
+    )
+    obis_data_set_configs_by_id = get_obis_data_set_configs_by_id(meter_config)
+    data_set_count = 0
+
+    async def count_data_sets():
+        nonlocal data_set_count
+
+        async for obis_data_block in obis_data_blocks.items():
+            data_set_count += len(obis_data_block.data_sets)
+
+    sinks = [
+        asyncio.create_task(coroutine)
+        for coroutine in (
+            count_data_sets(),
+            log_iec_62056_obis_data_sets(
+                topic=obis_data_blocks,
+                obis_data_set_configs_by_id=obis_data_set_configs_by_id,
+            ),
+            decode_meter_data_blocks(
+                meter_config=replay_meter_config,
+                obis_data_set_configs_by_id=obis_data_set_configs_by_id,
+                data_blocks=data_blocks,
+                obis_data_blocks=obis_data_blocks,
+            ),
+        )
+    ]
+    start_time = monotonic()
+
+    try:
+        with ReplaySerialStream(
+            records=read_session_records(capture_file), speed=speed
+        ) as serial_port:
+            await read_meter_data_blocks(
+                meter_config=replay_meter_config,
+                serial_port=serial_port,
+                topic=data_blocks,
+            )
+    except asyncio.IncompleteReadError:
+        # the readers only stop at the end of the capture
+        pass
+
+    # let the sinks catch up before stopping them
+    await data_blocks.join()
+    await obis_data_blocks.join()
+
+    for sink in sinks:
+        sink.cancel()
+
+    logger.info(
+        f"Replayed {data_blocks.head} data blocks with {data_set_count} data sets "
+        f"in {monotonic() - start_time:.3f} seconds."
+    )
@@ -0,0 +1,70 @@
+from pathlib import Path
+from typing import Optional, TextIO
+
+from ..benchmarks.benchmark_runner import (
+    compare_benchmark_result,
+    load_benchmark_baseline,
+    measure_benchmark,
+    save_benchmark_baseline,
+)
+from ..benchmarks.benchmark_suite import get_benchmarks
+from ..benchmarks.benchmark_workloads import (
+    create_synthetic_workload,
+    load_meter_workloads,
+)
+
+
+def run_benchmarks(
+    config_directory: Path,
+    baseline_file: Path,
+    save_baseline: bool,
+    threshold: float,
+    name_filter: Optional[str],
+    repeat_count: int,
+    output: TextIO,
+) -> bool:
+    if not save_baseline and not baseline_file.is_file():
+        # without a baseline, no regression could be detected
+        output.write(
+            f"The baseline {baseline_file} doesn't exist, "
+            "create it on this machine with --save-baseline.\n"
+        )
+        return False
+
+    baseline = load_benchmark_baseline(baseline_file)
+    benchmarks = [
+        benchmark
+        for benchmark in get_benchmarks(
+            [*load_meter_workloads(config_directory), create_synthetic_workload()]
+        )
+        if name_filter is None or name_filter in benchmark.name
+    ]
+    results = []
+    regression_count = 0
+
+    for benchmark in benchmarks:
+        result = measure_benchmark(benchmark, repeat_count=repeat_count)
+        results.append(result)
+        comparison = compare_benchmark_result(result, baseline)
+
+        if comparison.is_regression(threshold):
+            regression_count += 1
+
+        output.write(
+            f"{comparison.name:<64} {comparison.seconds_per_call * 1e6:14.3f} µs"
+            + (f" {comparison.change:+8.1%}" if comparison.change is not None else "")
+            + (" REGRESSION" if comparison.is_regression(threshold) else "")
+            + "\n"
+        )
+        output.flush()
+
+    if save_baseline:
+        save_benchmark_baseline(baseline_file, results)
+
+    if regression_count:
+        output.write(
+            f"{regression_count} of {len(results)} benchmarks are more than "
+            f"{threshold:.0%} slower than the baseline.\n"
+        )
+
+    return regression_count == 0
@@ -0,0 +1,76 @@
+# pyright: reportUnknownMemberType=false
+from typing import Optional, TextIO
+
+import asyncio_mqtt  # type: ignore
+
+from ..benchmarks.fleet_load_harness import (
+    PublicationRecorder,
+    run_load_test_step,
+)
+from ..benchmarks.mqtt_broker_stand_in import MqttBrokerStandIn
+from ..config import MeterConfig, MqttConfig
+from ..iec_62056_protocol.iec_62056_21_messages import IdentificationMessage
+
+
+async def run_load_test(
+    meter_config: MeterConfig,
+    mqtt_config: MqttConfig,
+    meter_counts: list[int],
+    identification: IdentificationMessage,
+    register_count: int,
+    polling_delay: float,
+    response_delay: float,
+    warm_up_duration: float,
+    step_duration: float,
+    seed: int,
+    output: TextIO,
+):
+    recorder = PublicationRecorder()
+    broker = MqttBrokerStandIn(on_publish=recorder.record)
+    port = await broker.start()
+
+    try:
+        async with asyncio_mqtt.Client(hostname="127.0.0.1", port=port) as mqtt_client:
+            output.write(
+                f"{'meters':>8} {'publishes/s':>12} {'states/s':>10} "
+                f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rss MiB':>9} "
+                f"{'lag p99 ms':>11} {'lag max ms':>11}\n"
+            )
+            output.flush()
+
+            for meter_count in meter_counts:
+                result = await run_load_test_step(
+                    meter_count=meter_count,
+                    meter_config=meter_config,
+                    mqtt_client=mqtt_client,
+                    mqtt_config=mqtt_config,
+                    recorder=recorder,
+                    identification=identification,
+                    register_count=register_count,
+                    polling_delay=polling_delay,
+                    response_delay=response_delay,
+                    warm_up_duration=warm_up_duration,
+                    step_duration=step_duration,
+                    seed=seed,
+                )
+                output.write(
+                    f"{result.meter_count:>8} {result.publish_rate:>12.1f} "
+                    f"{result.state_publish_rate:>10.1f} "
+                    + " ".join(
+                        format_milliseconds(latency, 9)
+                        for latency in result.latency_percentiles
+                    )
+                    + f" {result.resident_set_size / 2 ** 20:>9.1f} "
+                    f"{format_milliseconds(result.event_loop_lag_percentile, 11)} "
+                    f"{format_milliseconds(result.maximum_event_loop_lag, 11)}\n"
+                )
+                output.flush()
+    finally:
+        await broker.close()
+
+
+def format_milliseconds(seconds: Optional[float], width: int) -> str:
+    if seconds is None:
+        return f"{'-':>{width}}"
+
+    return f"{seconds * 1000:>{width}.1f}"
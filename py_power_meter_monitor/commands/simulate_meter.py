@@ -0,0 +1,82 @@
+import asyncio
+from contextlib import ExitStack
+import os
+from pathlib import Path
+from random import Random
+import tty
+from typing import Optional
+
+from ..iec_62056_protocol.iec_62056_21_messages import IdentificationMessage
+from ..iec_62056_protocol.transmission_speeds import mode_c_transmission_speeds
+from ..workers.mode_c_meter_simulator import (
+    PseudoTerminalStream,
+    create_synthetic_data_messages,
+    load_captured_data_message,
+    simulate_mode_c_meter,
+)
+
+
+async def run_simulate_meter(
+    meter_count: int,
+    identification: IdentificationMessage,
+    capture_file: Optional[Path],
+    register_count: int,
+    response_delay: float,
+    noise_rate: float,
+    seed: Optional[int],
+    link: Optional[str],
+):
+    if identification.baud_rate_id not in mode_c_transmission_speeds:
+        raise ValueError(f"Unknown baud rate id {identification.baud_rate_id}")
+
+    captured_data_message = (
+        load_captured_data_message(capture_file) if capture_file is not None else None
+    )
+
+    with ExitStack() as pseudo_terminals:
+        simulators = []
+
+        for index in range(meter_count):
+            (file_descriptor, port_path) = open_pseudo_terminal(pseudo_terminals)
+            random = Random(None if seed is None else seed + index)
+
+            if link is not None:
+                link_path = Path(link.format(index=index))
+                link_path.unlink(missing_ok=True)
+                link_path.symlink_to(port_path)
+                pseudo_terminals.callback(link_path.unlink, missing_ok=True)
+                port_path = str(link_path)
+
+            # the ports are printed for the scripts that start the monitor
+            print(port_path, flush=True)
+
+            stream = pseudo_terminals.enter_context(
+                PseudoTerminalStream(file_descriptor)
+            )
+            simulators.append(
+                simulate_mode_c_meter(
+                    reader=stream.reader,
+                    write=stream.write,
+                    identification=identification,
+                    get_data_message=(lambda: captured_data_message)
+                    if captured_data_message is not None
+                    else create_synthetic_data_messages(register_count, random),
+                    response_delay=response_delay,
+                    noise_rate=noise_rate,
+                    random=random,
+                )
+            )
+
+        await asyncio.gather(*simulators)
+
+
+def open_pseudo_terminal(exit_stack: ExitStack) -> tuple[int, str]:
+    (controller, port) = os.openpty()
+    # the port stays open, so that the controller keeps working while the
+    # monitor reopens it
+    exit_stack.callback(os.close, controller)
+    exit_stack.callback(os.close, port)
+    tty.setraw(controller)
+    tty.setraw(port)
+
+    return (controller, os.ttyname(port))
@@ -0,0 +1,323 @@
+# pyright: reportUnknownMemberType=false
+import asyncio
+from logging import basicConfig, getLogger
+import multiprocessing
+from multiprocessing.connection import Connection
+from time import monotonic
+from typing import Any, Callable, Optional
+
+import asyncio_mqtt  # type: ignore
+
+from ..config import (
+    LoggingLevel,
+    MeterConfig,
+    MqttConfig,
+    ObisDataSetConfig,
+    SerialPortConfig,
+)
+from ..iec_62056_protocol.columnar_obis_data_block import ColumnarObisDataBlockTopic
+from ..iec_62056_protocol.data_block import DataBlock, DataBlockStatus
+from ..iec_62056_protocol.obis_data_block import ObisDataBlock
+from ..iec_62056_protocol.obis_data_set import ObisId
+from ..utils.ipc_connection import (
+    iterate_connection_messages,
+    send_connection_messages,
+)
+from ..utils.publish_subscribe_topic import PublishSubscribeTopic
+from ..utils.readout_diagnostics import ReadoutDiagnostics
+from ..utils.restart_backoff import RestartBackoff
+from ..workers.iec_62056_data_serial_reader import SerialConnection
+from ..workers.iec_62056_obis_data_set_logger import log_iec_62056_obis_data_sets
+from ..workers.iec_62056_obis_data_set_mqtt_logger import (
+    mqtt_log_iec_62056_obis_data_sets,
+)
+from .monitor_serial import (
+    create_readout_diagnostics,
+    decode_meter_data_blocks,
+    get_meter_mqtt_config,
+    get_obis_data_set_configs_by_id,
+    read_meter_data_blocks,
+    supervise_serial_port,
+)
+
+logger = getLogger(__package__)
+
+# workers are spawned rather than forked to avoid inheriting the supervisor's
+# event loop and MQTT connection
+multiprocessing_context = multiprocessing.get_context("spawn")
+
+MeterShard = list[tuple[int, MeterConfig]]
+
+
+async def run_supervised_monitor_serial(
+    meter_configs: list[MeterConfig],
+    mqtt_config: MqttConfig,
+    worker_process_count: int,
+    logging_level: LoggingLevel,
+):
+    # the workers decode the data blocks before sending them to the supervisor
+    obis_data_blocks_by_meter: list[PublishSubscribeTopic[ObisDataBlock]] = [
+        ColumnarObisDataBlockTopic(
+            capacity=meter_config.serial_port.data_block_buffer_size
+        )
+        for meter_config in meter_configs
+    ]
+    # the readers measure their diagnostics in the workers, which send them
+    # along with the data blocks
+    diagnostics_by_meter = [
+        create_readout_diagnostics(mqtt_config) for _ in meter_configs
+    ]
+
+    async with asyncio_mqtt.Client(
+        hostname=mqtt_config.broker.hostname,
+        port=mqtt_config.broker.port,
+        username=mqtt_config.broker.username,
+        password=mqtt_config.broker.password,
+    ) as mqtt_client:
+        await asyncio.gather(
+            *[
+                publish_meter_data_blocks(
+                    meter_config=meter_config,
+                    obis_data_blocks=obis_data_blocks,
+                    mqtt_client=mqtt_client,
+                    mqtt_config=mqtt_config,
+                    diagnostics=diagnostics,
+                )
+                for meter_config, obis_data_blocks, diagnostics in zip(
+                    meter_configs, obis_data_blocks_by_meter, diagnostics_by_meter
+                )
+            ],
+            *[
+                supervise_worker_process(
+                    shard=shard,
+                    obis_data_blocks_by_meter=obis_data_blocks_by_meter,
+                    diagnostics_by_meter=diagnostics_by_meter,
+                    logging_level=logging_level,
+                )
+                for shard in shard_meter_configs(meter_configs, worker_process_count)
+            ],
+        )
+
+
+async def publish_meter_data_blocks(
+    meter_config: MeterConfig,
+    obis_data_blocks: PublishSubscribeTopic[ObisDataBlock],
+    mqtt_client: asyncio_mqtt.Client,
+    mqtt_config: MqttConfig,
+    diagnostics: Optional[ReadoutDiagnostics] = None,
+):
+    obis_data_set_configs_by_id = get_obis_data_set_configs_by_id(meter_config)
+
+    await asyncio.gather(
+        mqtt_log_iec_62056_obis_data_sets(
+            topic=obis_data_blocks,
+            mqtt_client=mqtt_client,
+            mqtt_config=get_meter_mqtt_config(mqtt_config, meter_config),
+            obis_data_set_configs_by_id=obis_data_set_configs_by_id,
+            diagnostics=diagnostics,
+        ),
+        log_iec_62056_obis_data_sets(
+            topic=obis_data_blocks,
+            obis_data_set_configs_by_id=obis_data_set_configs_by_id,
+        ),
+    )
+
+
+async def supervise_worker_process(
+    shard: MeterShard,
+    obis_data_blocks_by_meter: list[PublishSubscribeTopic[ObisDataBlock]],
+    diagnostics_by_meter: list[Optional[ReadoutDiagnostics]],
+    logging_level: LoggingLevel,
+):
+    publish_diagnostics = any(
+        diagnostics_by_meter[meter_index] is not None for meter_index, _ in shard
+    )
+    shard_name = ", ".join(
+        meter_config.serial_port.port_url for _, meter_config in shard
+    )
+    # the meters restart on their own within the worker, so a worker only
+    # exits when it crashes, which restarts all meters of its shard as
+    # cautiously as the most patient of them
+    backoff = RestartBackoff(
+        initial_delay=max(
+            meter_config.serial_port.restart_delay for _, meter_config in shard
+        ),
+        maximum_delay=max(
+            meter_config.serial_port.maximum_restart_delay for _, meter_config in shard
+        ),
+    )
+
+    while True:
+        start_time = monotonic()
+        receiving_connection, sending_connection = multiprocessing_context.Pipe(
+            duplex=False
+        )
+        worker_process = multiprocessing_context.Process(
+            target=run_worker_process,
+            args=(shard, sending_connection, logging_level, publish_diagnostics),
+            daemon=True,
+        )
+        worker_process.start()
+        # only the worker may hold the sending end, so that its exit closes the pipe
+        sending_connection.close()
+
+        logger.debug(f"Started worker process {worker_process.pid} for {shard_name}")
+
+        try:
+            async for meter_index, message in iterate_connection_messages(
+                receiving_connection
+            ):
+                if isinstance(message, ReadoutDiagnostics):
+                    diagnostics = diagnostics_by_meter[meter_index]
+
+                    if diagnostics is not None:
+                        diagnostics.add_reader_measurements(message)
+                else:
+                    await obis_data_blocks_by_meter[meter_index].put(message)
+        except EOFError:
+            pass
+        finally:
+            receiving_connection.close()
+
+            if worker_process.is_alive():
+                worker_process.terminate()
+            await asyncio.get_running_loop().run_in_executor(None, worker_process.join)
+
+        delay = backoff.get_delay(monotonic() - start_time)
+        logger.error(
+            f"Worker process {worker_process.pid} for {shard_name} exited with "
+            f"code {worker_process.exitcode}, restarting in {delay}s "
+            f"(restart {backoff.restart_count})"
+        )
+        await asyncio.sleep(delay)
+
+
+def shard_meter_configs(
+    meter_configs: list[MeterConfig], worker_process_count: int
+) -> list[MeterShard]:
+    shard_count = max(1, min(worker_process_count, len(meter_configs)))
+    indexed_meter_configs = list(enumerate(meter_configs))
+
+    return [
+        indexed_meter_configs[shard_index::shard_count]
+        for shard_index in range(shard_count)
+    ]
+
+
+def run_worker_process(
+    shard: MeterShard,
+    connection: Connection,
+    logging_level: LoggingLevel,
+    publish_diagnostics: bool = False,
+):
+    basicConfig(level=logging_level.value)
+
+    try:
+        asyncio.run(
+            read_meter_shard(
+                shard=shard,
+                connection=connection,
+                publish_diagnostics=publish_diagnostics,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+async def read_meter_shard(
+    shard: MeterShard,
+    connection: Connection,
+    publish_diagnostics: bool = False,
+    open_port: Optional[Callable[[SerialPortConfig], SerialConnection]] = None,
+):
+    # the readers wait for the supervisor once this many messages are pending
+    messages: "asyncio.Queue[tuple[int, Any]]" = asyncio.Queue(
+        maxsize=sum(
+            meter_config.serial_port.data_block_buffer_size for _, meter_config in shard
+        )
+    )
+
+    # like in `run_monitor_serial`, each meter fails and restarts on its own
+    await asyncio.gather(
+        send_connection_messages(connection, messages),
+        *[
+            supervise_shard_meter(
+                meter_index=meter_index,
+                meter_config=meter_config,
+                messages=messages,
+                diagnostics=ReadoutDiagnostics() if publish_diagnostics else None,
+                open_port=open_port,
+            )
+            for meter_index, meter_config in shard
+        ],
+    )
+
+
+async def supervise_shard_meter(
+    meter_index: int,
+    meter_config: MeterConfig,
+    messages: "asyncio.Queue[tuple[int, Any]]",
+    diagnostics: Optional[ReadoutDiagnostics] = None,
+    open_port: Optional[Callable[[SerialPortConfig], SerialConnection]] = None,
+):
+    obis_data_set_configs_by_id = get_obis_data_set_configs_by_id(meter_config)
+
+    async def run_meter(serial_port: SerialConnection):
+        await read_meter(
+            meter_index=meter_index,
+            meter_config=meter_config,
+            obis_data_set_configs_by_id=obis_data_set_configs_by_id,
+            serial_port=serial_port,
+            messages=messages,
+            diagnostics=diagnostics,
+        )
+
+    await supervise_serial_port(
+        serial_config=meter_config.serial_port, run=run_meter, open_port=open_port
+    )
+
+
+async def read_meter(
+    meter_index: int,
+    meter_config: MeterConfig,
+    obis_data_set_configs_by_id: dict[ObisId, ObisDataSetConfig],
+    serial_port: SerialConnection,
+    messages: "asyncio.Queue[tuple[int, Any]]",
+    diagnostics: Optional[ReadoutDiagnostics] = None,
+):
+    data_blocks: PublishSubscribeTopic[DataBlock] = PublishSubscribeTopic(
+        capacity=meter_config.serial_port.data_block_buffer_size
+    )
+    obis_data_blocks: PublishSubscribeTopic[ObisDataBlock] = PublishSubscribeTopic(
+        capacity=meter_config.serial_port.data_block_buffer_size
+    )
+
+    async def forward_obis_data_blocks():
+        async for obis_data_block in obis_data_blocks.items():
+            # the diagnostics measured during a readout precede its data block
+            if diagnostics is not None and obis_data_block.status in (
+                DataBlockStatus.CONFIRMED,
+                DataBlockStatus.UNVERIFIED,
+            ):
+                await messages.put(
+                    (meter_index, diagnostics.take_reader_measurements())
+                )
+
+            await messages.put((meter_index, obis_data_block))
+
+    await asyncio.gather(
+        forward_obis_data_blocks(),
+        decode_meter_data_blocks(
+            meter_config=meter_config,
+            obis_data_set_configs_by_id=obis_data_set_configs_by_id,
+            data_blocks=data_blocks,
+            obis_data_blocks=obis_data_blocks,
+            diagnostics=diagnostics,
+        ),
+        read_meter_data_blocks(
+            meter_config=meter_config,
+            serial_port=serial_port,
+            topic=data_blocks,
+            diagnostics=diagnostics,
+        ),
+    )
@@ -0,0 +1,79 @@
+import asyncio
+from unittest.mock import patch
+
+from ...config import MeterConfig, MqttConfig, SerialPortConfig
+from ...utils.memory_serial_stream import MemorySerialStream
+from ...utils.restart_backoff import RestartBackoff
+from ..monitor_serial import supervise_meter
+
+
+def test_restart_failed_meter_with_backoff():
+    async def supervise() -> tuple[int, list[float]]:
+        opened_count = 0
+        restart_delays: list[float] = []
+        sleep = asyncio.sleep
+
+        def open_disconnected_port(serial_config: SerialPortConfig):
+            nonlocal opened_count
+            opened_count += 1
+            serial_port = MemorySerialStream()
+            # the device is gone as soon as it has been opened
+            serial_port.close()
+
+            return serial_port
+
+        async def record_sleep(delay: float):
+            restart_delays.append(delay)
+            await sleep(0)
+
+        meter_config = MeterConfig(
+            serial_port=SerialPortConfig(
+                polling_delay=0,
+                response_delay=0,
+                restart_delay=1.0,
+                maximum_restart_delay=4.0,
+            )
+        )
+
+        with patch("asyncio.sleep", record_sleep):
+            supervisor = asyncio.create_task(
+                supervise_meter(
+                    meter_config=meter_config,
+                    mqtt_client=None,
+                    mqtt_config=MqttConfig(),
+                    open_port=open_disconnected_port,
+                )
+            )
+
+            while opened_count < 5:
+                await sleep(0.01)
+
+            supervisor.cancel()
+            await asyncio.gather(supervisor, return_exceptions=True)
+
+        return (opened_count, restart_delays)
+
+    (opened_count, restart_delays) = asyncio.run(supervise())
+
+    assert opened_count >= 5
+    # only the delays before reopening the port, not the pauses of the reader
+    assert [delay for delay in restart_delays if delay >= 1.0][:4] == [
+        1.0,
+        2.0,
+        4.0,
+        4.0,
+    ]
+
+
+def test_restart_backoff_starts_over_after_stable_run():
+    backoff = RestartBackoff(initial_delay=1.0, maximum_delay=8.0)
+
+    assert [backoff.get_delay(run_duration=0.5) for _ in range(5)] == [
+        1.0,
+        2.0,
+        4.0,
+        8.0,
+        8.0,
+    ]
+    assert backoff.get_delay(run_duration=60.0) == 1.0
+    assert backoff.restart_count == 6
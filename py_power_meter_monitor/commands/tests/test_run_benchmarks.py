@@ -0,0 +1,38 @@
+from io import StringIO
+from pathlib import Path
+
+from ..run_benchmarks import run_benchmarks
+
+config_directory = Path(__file__).parents[3] / "etc"
+
+
+def test_fail_without_baseline(tmp_path):
+    baseline_file = tmp_path / "baseline.json"
+    output = StringIO()
+
+    assert not run_benchmarks(
+        config_directory=config_directory,
+        baseline_file=baseline_file,
+        save_baseline=False,
+        threshold=0.2,
+        name_filter=None,
+        repeat_count=1,
+        output=output,
+    )
+    assert "--save-baseline" in output.getvalue()
+    assert not baseline_file.exists()
+
+
+def test_save_missing_baseline(tmp_path):
+    baseline_file = tmp_path / "baseline.json"
+
+    assert run_benchmarks(
+        config_directory=config_directory,
+        baseline_file=baseline_file,
+        save_baseline=True,
+        threshold=0.2,
+        name_filter="logarex/get_block_check_character",
+        repeat_count=1,
+        output=StringIO(),
+    )
+    assert baseline_file.is_file()
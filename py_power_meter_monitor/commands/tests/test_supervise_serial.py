@@ -0,0 +1,124 @@
+import asyncio
+from typing import Any
+from unittest.mock import patch
+
+from ...config import LoggingLevel, MeterConfig, SerialPortConfig
+from ...utils.memory_serial_stream import MemorySerialStream
+from .. import supervise_serial
+from ..supervise_serial import read_meter_shard, supervise_worker_process
+
+
+class RecordingProcessContext:
+    def __init__(self):
+        self.processes: list[Any] = []
+        self.context = supervise_serial.multiprocessing_context
+
+    def Pipe(self, duplex: bool):
+        return self.context.Pipe(duplex=duplex)
+
+    def Process(self, **kwargs: Any):
+        process = self.context.Process(**kwargs)
+        self.processes.append(process)
+        return process
+
+
+def test_restart_crashed_worker_process_with_backoff():
+    async def supervise() -> list[float]:
+        restart_delays: list[float] = []
+        sleep = asyncio.sleep
+        process_context = RecordingProcessContext()
+
+        async def record_sleep(delay: float):
+            restart_delays.append(delay)
+            await sleep(0)
+
+        meter_config = MeterConfig(
+            serial_port=SerialPortConfig(
+                port_url="/dev/non-existent-meter",
+                restart_delay=1.0,
+                maximum_restart_delay=100.0,
+            )
+        )
+
+        with patch("asyncio.sleep", record_sleep), patch.object(
+            supervise_serial, "multiprocessing_context", process_context
+        ):
+            supervisor = asyncio.create_task(
+                supervise_worker_process(
+                    shard=[(0, meter_config)],
+                    obis_data_blocks_by_meter=[],
+                    diagnostics_by_meter=[None],
+                    logging_level=LoggingLevel.critical,
+                )
+            )
+
+            try:
+                while len(restart_delays) < 3:
+                    # the worker keeps restarting the failing meter by itself,
+                    # so it is killed to simulate a crash
+                    for process in process_context.processes:
+                        if process.is_alive():
+                            process.kill()
+
+                    await sleep(0.01)
+            finally:
+                supervisor.cancel()
+                await asyncio.gather(supervisor, return_exceptions=True)
+
+        return restart_delays
+
+    assert asyncio.run(asyncio.wait_for(supervise(), timeout=60))[:3] == [
+        1.0,
+        2.0,
+        4.0,
+    ]
+
+
+def test_restart_failed_meter_without_its_shard():
+    async def read_shard() -> dict[str, int]:
+        opened_counts = {"failing": 0, "healthy": 0}
+        sleep = asyncio.sleep
+
+        def open_port(serial_config: SerialPortConfig):
+            opened_counts[serial_config.port_url] += 1
+            serial_port = MemorySerialStream()
+
+            # only the device of the failing meter is gone as soon as it's opened
+            if serial_config.port_url == "failing":
+                serial_port.close()
+
+            return serial_port
+
+        async def skip_sleep(delay: float):
+            await sleep(0)
+
+        shard = [
+            (
+                meter_index,
+                MeterConfig(
+                    serial_port=SerialPortConfig(
+                        port_url=port_url, polling_delay=0, response_delay=0
+                    )
+                ),
+            )
+            for meter_index, port_url in enumerate(("failing", "healthy"))
+        ]
+
+        with patch("asyncio.sleep", skip_sleep):
+            reader = asyncio.create_task(
+                read_meter_shard(shard=shard, connection=None, open_port=open_port)
+            )
+
+            try:
+                while opened_counts["failing"] < 5:
+                    await sleep(0.01)
+            finally:
+                reader.cancel()
+                await asyncio.gather(reader, return_exceptions=True)
+
+        return opened_counts
+
+    opened_counts = asyncio.run(asyncio.wait_for(read_shard(), timeout=60))
+
+    assert opened_counts["failing"] >= 5
+    assert opened_counts["healthy"] == 1
@@ -2,9 +2,11 @@ from enum import Enum, IntEnum
 from pathlib import Path
 from typing import List, Literal, Optional, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from tomlkit.api import parse
 
+from .utils.publish_subscribe_topic import OverflowPolicy
+from .utils.readout_scheduler import ReadoutSchedule
 from .iec_62056_protocol.obis_data_set import (
     ObisFloatDataSet,
     ObisId,
@@ -54,16 +56,49 @@ class SerialPortStopBits(Enum):
     TWO = 2
 
 
+class SerialPortTransport(Enum):
+    # pyserial watched by the asyncio event loop
+    NATIVE = "native"
+    # pyserial operated from a thread pool
+    AIOSERIAL = "aioserial"
+
+
+class ReadoutMode(Enum):
+    # read all registers in one data readout
+    DATA = "data"
+    # read only the configured registers one by one in programming mode
+    PROGRAMMING = "programming"
+    # listen to telegrams pushed by the meter in mode D
+    MODE_D = "mode_d"
+    # listen to binary SML telegrams pushed by the meter
+    SML = "sml"
+
+
 class SerialPortConfig(BaseModel):
     port_url: str = "/dev/ttyUSB0"
     baud_rate: int = 300
     byte_size: int = 7
     parity: SerialPortParity = SerialPortParity.EVEN
     stop_bits: SerialPortStopBits = SerialPortStopBits.ONE
-    polling_delay: float = 30.0
+    polling_delay: float = Field(30.0, ge=0)
+    readout_schedule: ReadoutSchedule = ReadoutSchedule.DELAY
     response_delay: float = 0.3
     read_timeout: float = 30.0
     write_timeout: float = 10.0
+    streaming_readout: bool = False
+    decode_cache_size: int = 256
+    data_block_buffer_size: int = Field(64, gt=0)
+    transport: SerialPortTransport = SerialPortTransport.NATIVE
+    adaptive_baud_rate: bool = False
+    baud_rate_state_file: Optional[Path] = None
+    readout_mode: ReadoutMode = ReadoutMode.DATA
+    keep_programming_session: bool = False
+    maximum_retransmissions: int = Field(0, ge=0)
+    salvage_unverified_data: bool = False
+    capture_file: Optional[Path] = None
+    # the delay before a failed meter is reopened doubles up to the maximum
+    restart_delay: float = Field(5.0, gt=0)
+    maximum_restart_delay: float = Field(300.0, gt=0)
 
     class Config:
         allow_mutation = False
@@ -83,18 +118,53 @@ class MqttDeviceConfig(BaseModel):
     model: str = "Unknown Model"
 
 
+class MqttStateMessageMode(Enum):
+    # one state message per data set
+    ENTITY = "entity"
+    # one state message per data block containing the values of all data sets
+    DEVICE = "device"
+
+
 class MqttConfig(BaseModel):
     enabled: bool = True
     configuration_topic_template: str = "homeassistant/sensor/{entity_id}/config"
     state_topic_template: str = "homeassistant/sensor/{entity_id}/state"
+    state_message_mode: MqttStateMessageMode = MqttStateMessageMode.ENTITY
+    device_state_topic_template: str = "py-power-meter-monitor/{device_id}/state"
+    maximum_in_flight_publishes: int = Field(32, gt=0)
+    # what happens to the data blocks of a meter when publishing falls behind
+    overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST
+    # readout timings and error counts as diagnostic entities of each meter
+    publish_diagnostics: bool = False
+    diagnostics_topic_template: str = "py-power-meter-monitor/{device_id}/diagnostics"
 
     broker: MqttBrokerConfig = MqttBrokerConfig()
     device: MqttDeviceConfig = MqttDeviceConfig()
 
 
+class PublishPolicyConfig(BaseModel):
+    # only publish values that differ from the last published value
+    on_change: bool = False
+    # only publish numbers that deviate from the last published value by more
+    # than the larger of both deadbands
+    absolute_deadband: float = Field(0.0, ge=0)
+    relative_deadband: float = Field(0.0, ge=0)
+    minimum_interval: float = Field(0.0, ge=0)
+    # re-publish unchanged values after this many seconds
+    maximum_interval: Optional[float] = Field(None, gt=0)
+
+    class Config:
+        allow_mutation = False
+
+    @property
+    def is_change_driven(self) -> bool:
+        return bool(self.on_change or self.absolute_deadband or self.relative_deadband)
+
+
 class ObisBaseDataSetConfig(BaseModel):
     id: ObisId
     name: str
+    publish_policy: PublishPolicyConfig = PublishPolicyConfig()
 
 
 class ObisIntegerDataSetConfig(ObisBaseDataSetConfig):
@@ -130,11 +200,35 @@ class ObisConfig(BaseModel):
     data_sets: List[ObisDataSetConfig] = []
 
 
+class MeterConfig(BaseModel):
+    serial_port: SerialPortConfig = SerialPortConfig()
+    device: MqttDeviceConfig = MqttDeviceConfig()
+    obis: ObisConfig = ObisConfig()
+
+    class Config:
+        allow_mutation = False
+
+
 class PyPowerMeterMonitorConfig(BaseModel):
     logging: LoggingConfig = LoggingConfig()
     serial_port: SerialPortConfig = SerialPortConfig()
     mqtt: MqttConfig = MqttConfig()
     obis: ObisConfig = ObisConfig()
+    meters: List[MeterConfig] = []
 
     class Config:
         allow_mutation = False
+
+    @property
+    def meter_configs(self) -> List[MeterConfig]:
+        # a configuration without a `meters` list describes a single meter
+        if self.meters:
+            return self.meters
+
+        return [
+            MeterConfig(
+                serial_port=self.serial_port,
+                device=self.mqtt.device,
+                obis=self.obis,
+            )
+        ]
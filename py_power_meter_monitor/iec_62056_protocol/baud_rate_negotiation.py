@@ -0,0 +1,186 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+import json
+from logging import getLogger
+import os
+from pathlib import Path
+from typing import Optional
+
+from .transmission_speeds import mode_c_transmission_speeds
+
+logger = getLogger(__package__)
+
+
+@dataclass
+class BaudRateStatistics:
+    readout_count: int = 0
+    success_count: int = 0
+    block_check_character_error_count: int = 0
+    timeout_count: int = 0
+    # exponentially weighted share of failed readouts
+    error_rate: float = 0.0
+
+
+def accept_proposed_baud_rate_id(proposed_baud_rate_id: str) -> str:
+    return proposed_baud_rate_id
+
+
+class BaudRateNegotiator:
+    def __init__(
+        self,
+        state_file_path: Optional[Path] = None,
+        maximum_error_rate: float = 0.2,
+        error_rate_weight: float = 0.5,
+        error_rate_decay: float = 0.9,
+    ):
+        self.state_file_path = state_file_path
+        self.maximum_error_rate = maximum_error_rate
+        self.error_rate_weight = error_rate_weight
+        # successful readouts at a lower rate let the error rates of higher
+        # rates decay, so that they are probed again over time
+        self.error_rate_decay = error_rate_decay
+        self.statistics: dict[str, BaudRateStatistics] = {}
+        self.proposed_baud_rate_id: Optional[str] = None
+        # without a state file, the statistics are learned again after restarts
+        self.state_writer: Optional[ThreadPoolExecutor] = None
+
+        if state_file_path is not None:
+            self.load_state()
+            # a single thread keeps the writes in order and off the event loop
+            self.state_writer = ThreadPoolExecutor(max_workers=1)
+
+    def get_statistics(self, baud_rate_id: str) -> BaudRateStatistics:
+        return self.statistics.setdefault(baud_rate_id, BaudRateStatistics())
+
+    def select_baud_rate_id(self, proposed_baud_rate_id: str) -> str:
+        self.proposed_baud_rate_id = proposed_baud_rate_id
+
+        return self.find_baud_rate_id(proposed_baud_rate_id)
+
+    def find_baud_rate_id(self, proposed_baud_rate_id: str) -> str:
+        proposed_speed = mode_c_transmission_speeds.get(proposed_baud_rate_id)
+
+        if proposed_speed is None:
+            return proposed_baud_rate_id
+
+        candidate_baud_rate_ids = sorted(
+            (
+                baud_rate_id
+                for baud_rate_id, speed in mode_c_transmission_speeds.items()
+                if speed <= proposed_speed
+            ),
+            key=mode_c_transmission_speeds.__getitem__,
+            reverse=True,
+        )
+
+        for baud_rate_id in candidate_baud_rate_ids:
+            statistics = self.statistics.get(baud_rate_id)
+
+            if statistics is None or statistics.error_rate <= self.maximum_error_rate:
+                return baud_rate_id
+
+        # the initial rate has to work anyway to receive the identification
+        return candidate_baud_rate_ids[-1]
+
+    def record_success(self, baud_rate_id: str):
+        selected_baud_rate_id = self.get_selected_baud_rate_id()
+        statistics = self.get_statistics(baud_rate_id)
+        statistics.readout_count += 1
+        statistics.success_count += 1
+        statistics.error_rate *= 1 - self.error_rate_weight
+
+        speed = mode_c_transmission_speeds.get(baud_rate_id, 0)
+
+        for other_baud_rate_id, other_statistics in self.statistics.items():
+            if mode_c_transmission_speeds.get(other_baud_rate_id, 0) > speed:
+                other_statistics.error_rate *= self.error_rate_decay
+
+        self.save_state_if_changed(selected_baud_rate_id)
+
+    def record_block_check_character_error(self, baud_rate_id: str):
+        selected_baud_rate_id = self.get_selected_baud_rate_id()
+        statistics = self.get_statistics(baud_rate_id)
+        statistics.block_check_character_error_count += 1
+        self.record_failure(statistics)
+        self.save_state_if_changed(selected_baud_rate_id)
+
+    def record_timeout(self, baud_rate_id: str):
+        selected_baud_rate_id = self.get_selected_baud_rate_id()
+        statistics = self.get_statistics(baud_rate_id)
+        statistics.timeout_count += 1
+        self.record_failure(statistics)
+        self.save_state_if_changed(selected_baud_rate_id)
+
+    def record_failure(self, statistics: BaudRateStatistics):
+        statistics.readout_count += 1
+        statistics.error_rate = (
+            statistics.error_rate * (1 - self.error_rate_weight)
+            + self.error_rate_weight
+        )
+
+    def get_selected_baud_rate_id(self) -> Optional[str]:
+        if self.proposed_baud_rate_id is None:
+            return None
+
+        return self.find_baud_rate_id(self.proposed_baud_rate_id)
+
+    def save_state_if_changed(self, previous_baud_rate_id: Optional[str]):
+        # the statistics are only persisted when the learned rate changes to
+        # avoid writing to the (often flash based) storage after every readout
+        if self.get_selected_baud_rate_id() != previous_baud_rate_id:
+            logger.info(
+                f"Changed the negotiated baud rate id from {previous_baud_rate_id} "
+                f"to {self.get_selected_baud_rate_id()}"
+            )
+            self.save_state()
+
+    def load_state(self):
+        assert self.state_file_path is not None
+
+        try:
+            state = json.loads(self.state_file_path.read_text())
+            self.statistics = {
+                baud_rate_id: BaudRateStatistics(**statistics)
+                for baud_rate_id, statistics in state["baud_rates"].items()
+            }
+        except FileNotFoundError:
+            pass
+        except (ValueError, TypeError, KeyError, AttributeError):
+            logger.exception(
+                f"Ignoring invalid baud rate state file {self.state_file_path}"
+            )
+
+    def save_state(self):
+        if self.state_file_path is None or self.state_writer is None:
+            return
+
+        # serialized right away, as the statistics keep changing meanwhile
+        state = json.dumps(
+            {
+                "baud_rates": {
+                    baud_rate_id: asdict(statistics)
+                    for baud_rate_id, statistics in self.statistics.items()
+                }
+            }
+        )
+        self.state_writer.submit(
+            write_state_file, self.state_file_path, state
+        ).add_done_callback(log_state_file_error)
+
+    def wait_for_saved_state(self):
+        if self.state_writer is not None:
+            self.state_writer.submit(lambda: None).result()
+
+
+def write_state_file(state_file_path: Path, state: str):
+    temporary_file_path = state_file_path.with_name(f"{state_file_path.name}.tmp")
+    temporary_file_path.write_text(state)
+    # replacing the file is atomic, so a crash never leaves a partial state
+    os.replace(temporary_file_path, state_file_path)
+
+
+def log_state_file_error(future: "Future[None]"):
+    error = future.exception()
+
+    if error is not None:
+        logger.error(f"Failed to save the baud rate state file: {error}")
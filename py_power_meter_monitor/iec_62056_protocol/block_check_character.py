@@ -1,7 +1,20 @@
-def get_block_check_character(data: bytes) -> bytes:
-    block_check_character = 0
+from typing import Union
 
-    for byte in data:
-        block_check_character ^= byte
+ByteString = Union[bytes, bytearray, memoryview]
 
-    return block_check_character.to_bytes(1, "big")
+
+def get_block_check_character(data: ByteString) -> bytes:
+    return update_block_check_character(0, data).to_bytes(1, "big")
+
+
+def update_block_check_character(block_check_character: int, data: ByteString) -> int:
+    # xor all bytes at once by repeatedly folding the halves of one large integer
+    folded = int.from_bytes(data, "little")
+    width = len(data)
+
+    while width > 1:
+        half_width = (width + 1) // 2
+        folded = (folded >> (half_width * 8)) ^ (folded & ((1 << (half_width * 8)) - 1))
+        width = half_width
+
+    return block_check_character ^ folded
@@ -0,0 +1,190 @@
+from array import array
+from dataclasses import dataclass
+from typing import Union, cast
+
+from ..utils.publish_subscribe_topic import PublishSubscribeTopic
+from ..utils.slotted_dataclass import add_slots
+from .data_block import DataBlockStatus
+from .obis_data_block import ObisDataBlock
+from .obis_data_set import (
+    ObisDataSet,
+    ObisFloatDataSet,
+    ObisId,
+    ObisIntegerDataSet,
+    ObisStringDataSet,
+    UnknownObisDataSet,
+)
+
+# the position in this tuple is the value kind stored per data set
+obis_data_set_types = (
+    UnknownObisDataSet,
+    ObisIntegerDataSet,
+    ObisFloatDataSet,
+    ObisStringDataSet,
+)
+obis_data_set_kinds = {
+    obis_data_set_type: value_kind
+    for value_kind, obis_data_set_type in enumerate(obis_data_set_types)
+}
+
+no_string_index = -1
+
+
+def intern_string(strings: list[str], indices: dict[str, int], string: str) -> int:
+    index = indices.get(string)
+
+    if index is None:
+        index = len(strings)
+        strings.append(string)
+        indices[string] = index
+
+    return index
+
+
+@add_slots
+@dataclass(frozen=True)
+class ColumnarObisDataBlock:
+    # all data sets share the timestamp of the block
+    timestamp: float
+    manufacturer_identification: str
+    status: DataBlockStatus
+    # the distinct units and string values of this block
+    strings: tuple[str, ...]
+    value_kinds: "array[int]"
+    packed_ids: "array[int]"
+    unit_indices: "array[int]"
+    # indices into `integers`, `floats` or `strings` depending on the kind
+    value_indices: "array[int]"
+    integers: "array[int]"
+    floats: "array[float]"
+
+    def __len__(self):
+        return len(self.value_kinds)
+
+    @classmethod
+    def from_obis_data_block(cls, obis_data_block: ObisDataBlock):
+        strings: list[str] = []
+        string_indices: dict[str, int] = {}
+        value_kinds = array("B")
+        packed_ids = array("Q")
+        unit_indices = array("l")
+        value_indices = array("L")
+        integers = array("q")
+        floats = array("d")
+
+        for obis_data_set in obis_data_block.data_sets:
+            value_kind = obis_data_set_kinds[type(obis_data_set)]
+            value_kinds.append(value_kind)
+            packed_ids.append(pack_obis_id(obis_data_set.id))
+            unit_indices.append(
+                intern_string(strings, string_indices, obis_data_set.unit)
+                if obis_data_set.unit is not None
+                else no_string_index
+            )
+
+            if isinstance(obis_data_set, ObisIntegerDataSet):
+                value_indices.append(len(integers))
+                integers.append(obis_data_set.value)
+            elif isinstance(obis_data_set, ObisFloatDataSet):
+                value_indices.append(len(floats))
+                floats.append(obis_data_set.value)
+            elif isinstance(obis_data_set, ObisStringDataSet):
+                value_indices.append(
+                    intern_string(strings, string_indices, obis_data_set.value)
+                )
+            else:
+                value_indices.append(0)
+
+        return cls(
+            timestamp=max(
+                (
+                    obis_data_set.timestamp
+                    for obis_data_set in obis_data_block.data_sets
+                ),
+                default=0.0,
+            ),
+            manufacturer_identification=obis_data_block.manufacturer_identification,
+            status=obis_data_block.status,
+            strings=tuple(strings),
+            value_kinds=value_kinds,
+            packed_ids=packed_ids,
+            unit_indices=unit_indices,
+            value_indices=value_indices,
+            integers=integers,
+            floats=floats,
+        )
+
+    def get_data_set(self, index: int) -> ObisDataSet:
+        value_kind = self.value_kinds[index]
+        obis_data_set_type = obis_data_set_types[value_kind]
+        unit_index = self.unit_indices[index]
+        unit = self.strings[unit_index] if unit_index != no_string_index else None
+        value_index = self.value_indices[index]
+        id = unpack_obis_id(self.packed_ids[index])
+
+        if obis_data_set_type is ObisIntegerDataSet:
+            value = self.integers[value_index]
+        elif obis_data_set_type is ObisFloatDataSet:
+            value = self.floats[value_index]
+        elif obis_data_set_type is ObisStringDataSet:
+            value = self.strings[value_index]
+        else:
+            return UnknownObisDataSet(timestamp=self.timestamp, id=id, unit=unit)
+
+        return obis_data_set_type(
+            timestamp=self.timestamp, id=id, value=value, unit=unit  # type: ignore
+        )
+
+    def to_obis_data_block(self) -> ObisDataBlock:
+        return ObisDataBlock(
+            data_sets=[self.get_data_set(index) for index in range(len(self))],
+            manufacturer_identification=self.manufacturer_identification,
+            status=self.status,
+        )
+
+
+class ColumnarObisDataBlockTopic(PublishSubscribeTopic[ObisDataBlock]):
+    # keeps the buffered blocks columnar, which takes a fraction of the memory
+    # while slow sinks fall behind, and rebuilds them for each subscriber
+    def pack_message(
+        self, message: ObisDataBlock
+    ) -> Union[ColumnarObisDataBlock, ObisDataBlock]:
+        try:
+            return ColumnarObisDataBlock.from_obis_data_block(message)
+        except (OverflowError, ValueError):
+            # ids or integers out of the range of the columns are kept as is
+            return message
+
+    def unpack_message(
+        self, packed_message: Union[ColumnarObisDataBlock, ObisDataBlock]
+    ) -> ObisDataBlock:
+        if isinstance(packed_message, ColumnarObisDataBlock):
+            return packed_message.to_obis_data_block()
+
+        return packed_message
+
+
+def pack_obis_id(id: ObisId) -> int:
+    # eight bits per value group followed by three bits for the group count
+    packed_id = 0
+
+    for group in id:
+        if not 0 <= group <= 255:
+            raise ValueError(f"Failed to pack {id} as an OBIS id.")
+
+        packed_id = packed_id << 8 | group
+
+    return packed_id << 3 | len(id)
+
+
+def unpack_obis_id(packed_id: int) -> ObisId:
+    group_count = packed_id & 0b111
+    packed_id >>= 3
+
+    return cast(
+        ObisId,
+        tuple(
+            packed_id >> (8 * (group_count - group_index - 1)) & 0xFF
+            for group_index in range(group_count)
+        ),
+    )
@@ -1,9 +1,19 @@
 from dataclasses import dataclass, replace
+from enum import Enum
 import re
-from typing import Optional
+from typing import Callable, Iterator, Optional, Union
+
+from ..utils.bounded_cache import BoundedCache
+from ..utils.slotted_dataclass import add_slots
 
 data_set_encoding = "iso-8859-1"
 
+data_line_separator = b"\r\n"
+
+DataBuffer = Union[bytes, bytearray]
+
+DataSetFields = tuple[str, Optional[str], Optional[str]]
+
 data_set_expression = re.compile(
     rb"""^
             (?P<address>[^(]+)
@@ -22,7 +32,8 @@ data_set_expression = re.compile(
 )
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class DataSet:
     timestamp: float
     address: str
@@ -37,7 +48,7 @@ class DataSet:
         )
 
     @classmethod
-    def from_bytes(cls, timestamp: float, line: bytes) -> "DataSet":
+    def from_bytes(cls, timestamp: float, line: DataBuffer) -> "DataSet":
         matches = data_set_expression.match(line)
 
         if matches is None:
@@ -60,24 +71,77 @@ class DataSet:
         )
 
 
-@dataclass
+class DataBlockStatus(Enum):
+    # the block check character has been verified
+    CONFIRMED = "confirmed"
+    # the lines have been received, but the block has not been verified yet
+    PROVISIONAL = "provisional"
+    # the lines previously published as provisional turned out to be invalid
+    RETRACTED = "retracted"
+    # the block check character was wrong, but the lines could be parsed
+    UNVERIFIED = "unverified"
+
+
+@add_slots
+@dataclass(frozen=True)
 class DataBlock:
     manufacturer_identification: str
     data_lines: list[DataSet]
+    status: DataBlockStatus = DataBlockStatus.CONFIRMED
 
     def __bytes__(self) -> bytes:
         return b"".join(b"%s\r\n" % bytes(line) for line in self.data_lines)
 
     @classmethod
-    def from_bytes(cls, timestamp: float, data: bytes) -> "DataBlock":
+    def from_bytes(
+        cls,
+        timestamp: float,
+        data: DataBuffer,
+        start: int = 0,
+        end: Optional[int] = None,
+        parse_data_set: Callable[[float, DataBuffer], DataSet] = DataSet.from_bytes,
+    ) -> "DataBlock":
         return cls(
             data_lines=[
-                DataSet.from_bytes(timestamp, line)
-                for line in data.split(b"\r\n")
-                if len(line) > 0
+                parse_data_set(timestamp, line)
+                for line in split_data_lines(data, start, end)
             ],
             manufacturer_identification="",
         )
 
     def with_manufacturer_identification(self, manufacturer_identification: str):
         return replace(self, manufacturer_identification=manufacturer_identification)
+
+
+def split_data_lines(
+    data: DataBuffer, start: int = 0, end: Optional[int] = None
+) -> Iterator[DataBuffer]:
+    # scan in place instead of splitting so that large buffers are not copied
+    end = len(data) if end is None else end
+
+    while start < end:
+        line_end = data.find(data_line_separator, start, end)
+
+        if line_end < 0:
+            line_end = end
+
+        if line_end > start:
+            yield data[start:line_end]
+
+        start = line_end + len(data_line_separator)
+
+
+def cache_data_set_parser(
+    parse_data_set: Callable[[float, DataBuffer], DataSet],
+    cache: BoundedCache[bytes, DataSetFields],
+) -> Callable[[float, DataBuffer], DataSet]:
+    def parse_data_set_fields(line: bytes) -> DataSetFields:
+        data_set = parse_data_set(0, line)
+        return (data_set.address, data_set.value, data_set.unit)
+
+    def parse_cached_data_set(timestamp: float, line: DataBuffer) -> DataSet:
+        return DataSet(
+            timestamp, *cache.get_or_compute(bytes(line), parse_data_set_fields)
+        )
+
+    return parse_cached_data_set
@@ -11,3 +11,7 @@ class ParsingError(Iec62056ProtocolError):
 
         self.frame_type = frame_type
         self.frame = frame
+
+
+class BlockCheckCharacterError(ParsingError):
+    pass
@@ -0,0 +1,177 @@
+from time import monotonic, time
+from typing import TYPE_CHECKING, Callable, Optional, Type, TypeVar
+
+from .block_check_character import ByteString, update_block_check_character
+from .data_block import DataBuffer, DataSet, data_line_separator
+
+if TYPE_CHECKING:
+    from .iec_62056_21_messages import BaseMessage
+
+DecodedMessageT = TypeVar("DecodedMessageT", bound="BaseMessage")
+
+
+data_block_end_line = b"!"
+
+
+class FrameDecoder:
+    def __init__(
+        self,
+        on_data_set: Optional[Callable[[DataSet], None]] = None,
+        parse_data_set: Callable[[float, DataBuffer], DataSet] = DataSet.from_bytes,
+    ):
+        self.buffer = bytearray()
+        self.on_data_set = on_data_set
+        self.parse_data_set = parse_data_set
+        # the size and parsing time of the last decoded frame
+        self.last_frame_length = 0
+        self.last_parse_duration = 0.0
+        self.reset()
+
+    def reset(self):
+        self.buffer.clear()
+        self.reset_frame()
+
+    def reset_frame(self):
+        self.message_type: Optional[Type["BaseMessage"]] = None
+        self.frame_started = False
+        self.scan_position = 0
+        self.frame_end: Optional[int] = None
+        self.block_check_character = 0
+        self.block_check_position = 0
+        self.line_position = 0
+        self.streamed_data_sets: Optional[list[DataSet]] = []
+
+    def feed(self, data: ByteString):
+        self.buffer += data
+
+    def decode(self, message_type: Type[DecodedMessageT]) -> Optional[DecodedMessageT]:
+        if message_type is not self.message_type:
+            self.reset_frame()
+            self.message_type = message_type
+
+        if not self.frame_started and not self.find_frame_start(message_type):
+            return None
+
+        if self.frame_end is None and not self.find_frame_end(message_type):
+            self.stream_data_sets(message_type)
+            return None
+
+        self.stream_data_sets(message_type)
+
+        assert self.frame_end is not None
+
+        frame_length = self.frame_end + message_type.extra_bytes_after_terminator
+
+        if len(self.buffer) < frame_length:
+            return None
+
+        parse_start_time = monotonic()
+
+        try:
+            return message_type.from_buffer(
+                timestamp=time(),
+                buffer=self.buffer,
+                end=frame_length,
+                block_check_character=self.block_check_character,
+                data_sets=self.streamed_data_sets if self.on_data_set else None,
+                parse_data_set=self.parse_data_set,
+            )
+        finally:
+            self.last_frame_length = frame_length
+            self.last_parse_duration = monotonic() - parse_start_time
+            del self.buffer[:frame_length]
+            self.reset_frame()
+
+    def find_frame_start(self, message_type: Type["BaseMessage"]) -> bool:
+        initiator = message_type.initiator or b""
+        frame_start = self.buffer.find(initiator)
+
+        if frame_start < 0:
+            # drain everything that can not be the beginning of an initiator
+            del self.buffer[: len(self.buffer) - len(initiator) + 1]
+            return False
+
+        del self.buffer[:frame_start]
+
+        self.frame_started = True
+        self.scan_position = len(initiator)
+        self.block_check_position = len(initiator)
+        self.line_position = len(initiator)
+
+        return True
+
+    def find_frame_end(self, message_type: Type["BaseMessage"]) -> bool:
+        terminator = message_type.terminator
+        terminator_start = self.buffer.find(terminator, self.scan_position)
+        partial_terminator = message_type.partial_terminator
+
+        if partial_terminator is not None:
+            # partial blocks of a longer transfer end before the actual terminator
+            partial_terminator_start = self.buffer.find(
+                partial_terminator, self.scan_position
+            )
+
+            if partial_terminator_start >= 0 and (
+                terminator_start < 0 or partial_terminator_start < terminator_start
+            ):
+                terminator = partial_terminator
+                terminator_start = partial_terminator_start
+
+        if terminator_start < 0:
+            # a terminator can only begin in the bytes that have not been scanned
+            self.scan_position = max(
+                self.scan_position,
+                len(self.buffer)
+                - max(len(terminator), len(partial_terminator or b""))
+                + 1,
+            )
+            self.update_block_check_character(message_type, self.scan_position)
+            return False
+
+        self.frame_end = terminator_start + len(terminator)
+        self.update_block_check_character(message_type, self.frame_end)
+
+        return True
+
+    def update_block_check_character(self, message_type: Type["BaseMessage"], end: int):
+        if not message_type.has_block_check_character:
+            return
+
+        with memoryview(self.buffer) as buffer_view:
+            with buffer_view[self.block_check_position : end] as new_bytes:
+                self.block_check_character = update_block_check_character(
+                    self.block_check_character, new_bytes
+                )
+
+        self.block_check_position = max(self.block_check_position, end)
+
+    def stream_data_sets(self, message_type: Type["BaseMessage"]):
+        if (
+            self.on_data_set is None
+            or not message_type.has_data_lines
+            or self.streamed_data_sets is None
+        ):
+            return
+
+        lines_end = len(self.buffer) if self.frame_end is None else self.frame_end
+
+        while (
+            line_end := self.buffer.find(
+                data_line_separator, self.line_position, lines_end
+            )
+        ) >= 0:
+            line = self.buffer[self.line_position : line_end]
+            self.line_position = line_end + len(data_line_separator)
+
+            if not line or line == data_block_end_line:
+                continue
+
+            try:
+                data_set = self.parse_data_set(time(), line)
+            except ValueError:
+                # leave it to the parser of the complete frame to report the error
+                self.streamed_data_sets = None
+                return
+
+            self.streamed_data_sets.append(data_set)
+            self.on_data_set(data_set)
@@ -2,80 +2,92 @@ import asyncio
 import re
 from abc import abstractmethod
 from asyncio.streams import StreamReader
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from logging import getLogger
-from time import time
-from typing import ClassVar, Optional, Pattern, Type, TypeVar, Union
+from typing import Callable, ClassVar, Optional, Pattern, Type, TypeVar, Union
 
-import async_timeout
 from aioserial import AioSerial  # type: ignore
 
+from ..utils.slotted_dataclass import add_slots
 from .block_check_character import get_block_check_character
-from .data_block import DataBlock
-from .errors import ParsingError
+from .data_block import DataBlock, DataBuffer, DataSet, split_data_lines
+from .errors import BlockCheckCharacterError, ParsingError
+from .frame_decoder import FrameDecoder
+from .obis_data_set import parse_obis_id_from_address
 
 message_encoding = "iso-8859-1"
 
+stream_read_size = 4096
+
 MessageT = TypeVar("MessageT", bound="BaseMessage")
 
 logger = getLogger(__package__)
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class BaseMessage:
     timestamp: float
     initiator: ClassVar[Optional[bytes]] = None
     terminator: ClassVar[bytes] = b"\r\n"
+    partial_terminator: ClassVar[Optional[bytes]] = None
     extra_bytes_after_terminator: ClassVar[int] = 0
+    has_block_check_character: ClassVar[bool] = False
+    has_data_lines: ClassVar[bool] = False
 
     @classmethod
     @abstractmethod
     def from_bytes(cls: Type[MessageT], timestamp: float, frame: bytes) -> MessageT:
         raise NotImplementedError()
 
+    @classmethod
+    def from_buffer(
+        cls: Type[MessageT],
+        timestamp: float,
+        buffer: bytearray,
+        end: int,
+        block_check_character: int,
+        data_sets: Optional[list[DataSet]] = None,
+        parse_data_set: Callable[[float, DataBuffer], DataSet] = DataSet.from_bytes,
+    ) -> MessageT:
+        return cls.from_bytes(timestamp=timestamp, frame=bytes(buffer[:end]))
+
     @classmethod
     async def read_from_serial_port(
-        cls: Type[MessageT], serial_port: AioSerial
+        cls: Type[MessageT],
+        serial_port: AioSerial,
+        decoder: Optional[FrameDecoder] = None,
     ) -> MessageT:
-        frame = b""
-        if cls.initiator is not None:
-            # drain the read buffer
-            try:
-                with async_timeout.timeout(30):
-                    logger.debug(f"Draining the read buffer up to {cls.initiator}")
-                    await serial_port.read_until_async(cls.initiator)
-                    frame += cls.initiator
-            except (asyncio.TimeoutError):
-                logger.debug("Gave up on draining the read buffer")
+        decoder = decoder or FrameDecoder()
+
         logger.debug(f"Reading up to {cls.terminator}")
-        frame += await serial_port.read_until_async(cls.terminator)
-        logger.debug(f"Reading {cls.extra_bytes_after_terminator} extra bytes")
-        frame += await serial_port.read_async(cls.extra_bytes_after_terminator)
-        timestamp = time()
-        logger.debug(f"Finished reading at {timestamp}")
+        while (message := decoder.decode(cls)) is None:
+            decoder.feed(await serial_port.read_async(max(1, serial_port.in_waiting)))
+        logger.debug(f"Finished reading at {message.timestamp}")
 
-        return cls.from_bytes(timestamp=timestamp, frame=frame)
+        return message
 
     @classmethod
-    async def read_from_stream(cls: Type[MessageT], reader: StreamReader) -> MessageT:
-        frame = b""
-        if cls.initiator is not None:
-            # drain the read buffer
-            try:
-                with async_timeout.timeout(30):
-                    logger.debug(f"Draining the read buffer up to {cls.initiator}")
-                    await reader.readuntil(cls.initiator)
-                    frame += cls.initiator
-            except BaseException:
-                logger.debug("Gave up on draining the read buffer")
+    async def read_from_stream(
+        cls: Type[MessageT],
+        reader: StreamReader,
+        decoder: Optional[FrameDecoder] = None,
+    ) -> MessageT:
+        decoder = decoder or FrameDecoder()
+
         logger.debug(f"Reading up to {cls.terminator}")
-        frame += await reader.readuntil(cls.terminator)
-        logger.debug(f"Reading {cls.extra_bytes_after_terminator} extra bytes")
-        frame += await reader.readexactly(cls.extra_bytes_after_terminator)
-        timestamp = time()
-        logger.debug(f"Finished reading at {timestamp}")
+        while (message := decoder.decode(cls)) is None:
+            chunk = await reader.read(stream_read_size)
 
-        return cls.from_bytes(timestamp=timestamp, frame=frame)
+            if not chunk:
+                raise asyncio.IncompleteReadError(
+                    partial=bytes(decoder.buffer), expected=None
+                )
+
+            decoder.feed(chunk)
+        logger.debug(f"Finished reading at {message.timestamp}")
+
+        return message
 
     @classmethod
     def match_frame_or_raise(
@@ -89,7 +101,8 @@ class BaseMessage:
         return matches
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class RequestMessage(BaseMessage):
     device_address: str = ""
     initiator: ClassVar[bytes] = b"/"
@@ -119,7 +132,8 @@ class RequestMessage(BaseMessage):
         )
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class IdentificationMessage(BaseMessage):
     manufacturer_id: str
     baud_rate_id: str
@@ -165,7 +179,8 @@ class IdentificationMessage(BaseMessage):
         )
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class AcknowledgementMessage(BaseMessage):
     protocol_control: str
     baud_rate_id: str
@@ -213,11 +228,14 @@ class AcknowledgementMessage(BaseMessage):
         )
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class DataMessage(BaseMessage):
     data: DataBlock
     terminator: ClassVar[bytes] = b"!\r\n\x03"
     extra_bytes_after_terminator: ClassVar[int] = 1
+    has_block_check_character: ClassVar[bool] = True
+    has_data_lines: ClassVar[bool] = True
     initiator: ClassVar[bytes] = b"\x02"
 
     frame_expression: ClassVar[Pattern[bytes]] = re.compile(
@@ -241,14 +259,336 @@ class DataMessage(BaseMessage):
         )
 
         if block_check_character != matches.group("block_check"):
-            raise ParsingError(frame_type=cls, frame=frame)
+            raise BlockCheckCharacterError(frame_type=cls, frame=frame)
 
         return cls(
             timestamp=timestamp,
             data=DataBlock.from_bytes(timestamp=timestamp, data=matches.group("data")),
         )
 
+    @classmethod
+    def from_buffer(
+        cls,
+        timestamp: float,
+        buffer: bytearray,
+        end: int,
+        block_check_character: int,
+        data_sets: Optional[list[DataSet]] = None,
+        parse_data_set: Callable[[float, DataBuffer], DataSet] = DataSet.from_bytes,
+    ) -> "DataMessage":
+        # the frame boundaries and the block check character have already been
+        # determined while decoding, so only the data lines remain to be parsed
+        if buffer[end - 1] != block_check_character:
+            raise BlockCheckCharacterError(frame_type=cls, frame=bytes(buffer[:end]))
+
+        if data_sets is not None:
+            # the lines have already been parsed one by one while streaming
+            return cls(
+                timestamp=timestamp,
+                data=DataBlock(manufacturer_identification="", data_lines=data_sets),
+            )
+
+        try:
+            data = DataBlock.from_bytes(
+                timestamp=timestamp,
+                data=buffer,
+                start=len(cls.initiator),
+                end=end - cls.extra_bytes_after_terminator - len(cls.terminator),
+                parse_data_set=parse_data_set,
+            )
+        except ValueError as error:
+            raise ParsingError(frame_type=cls, frame=bytes(buffer[:end])) from error
+
+        return cls(timestamp=timestamp, data=data)
+
+    @classmethod
+    def salvage_data_sets(cls, timestamp: float, frame: bytes) -> list[DataSet]:
+        # the lines of a frame with a wrong block check character that still
+        # parse, although any of them may contain the corrupted bytes
+        data_sets: list[DataSet] = []
+
+        for line in split_data_lines(
+            frame,
+            len(cls.initiator),
+            len(frame) - cls.extra_bytes_after_terminator - len(cls.terminator),
+        ):
+            try:
+                data_set = DataSet.from_bytes(timestamp, line)
+                # a corrupted address would fail to decode later on
+                parse_obis_id_from_address(data_set.address)
+            except ValueError:
+                continue
+
+            if not is_salvageable_value(data_set.value):
+                continue
+
+            data_sets.append(data_set)
+
+        return data_sets
+
+
+def is_salvageable_value(value: Optional[str]) -> bool:
+    # corrupted bytes often turn into control characters, whereas values only
+    # consist of printable characters
+    return value is None or all(" " <= character <= "~" for character in value)
+
+
+@add_slots
+@dataclass(frozen=True)
+class ModeDDataMessage(BaseMessage):
+    # mode D meters push the identification and the data without a request
+    identification: IdentificationMessage
+    data: DataBlock
+    initiator: ClassVar[bytes] = b"/"
+    terminator: ClassVar[bytes] = b"!\r\n"
+
+    def __bytes__(self) -> bytes:
+        return b"%s\r\n%s%s" % (
+            bytes(self.identification),
+            bytes(self.data),
+            self.terminator,
+        )
+
+    @classmethod
+    def from_bytes(cls, timestamp: float, frame: bytes) -> "ModeDDataMessage":
+        return cls.from_buffer(
+            timestamp=timestamp,
+            buffer=bytearray(frame),
+            end=len(frame),
+            block_check_character=0,
+        )
+
+    @classmethod
+    def from_buffer(
+        cls,
+        timestamp: float,
+        buffer: bytearray,
+        end: int,
+        block_check_character: int,
+        data_sets: Optional[list[DataSet]] = None,
+        parse_data_set: Callable[[float, DataBuffer], DataSet] = DataSet.from_bytes,
+    ) -> "ModeDDataMessage":
+        identification_end = buffer.find(b"\r\n", 0, end) + 2
+
+        if identification_end < 2:
+            raise ParsingError(frame_type=cls, frame=bytes(buffer[:end]))
+
+        try:
+            data = DataBlock.from_bytes(
+                timestamp=timestamp,
+                data=buffer,
+                start=identification_end,
+                end=end - len(cls.terminator),
+                parse_data_set=parse_data_set,
+            )
+        except ValueError as error:
+            raise ParsingError(frame_type=cls, frame=bytes(buffer[:end])) from error
+
+        identification = IdentificationMessage.from_bytes(
+            timestamp=timestamp, frame=bytes(buffer[:identification_end])
+        )
+
+        return cls(
+            timestamp=timestamp,
+            identification=identification,
+            data=data.with_manufacturer_identification(identification.identification),
+        )
+
+
+@add_slots
+@dataclass(frozen=True)
+class CommandMessage(BaseMessage):
+    # the command letter followed by the command type, e.g. P0, R5 or B0
+    command: str
+    data: Optional[str] = None
+    initiator: ClassVar[bytes] = b"\x01"
+    terminator: ClassVar[bytes] = b"\x03"
+    extra_bytes_after_terminator: ClassVar[int] = 1
+    has_block_check_character: ClassVar[bool] = True
+
+    frame_expression: ClassVar[Pattern[bytes]] = re.compile(
+        (
+            b"\\A"
+            b"\x01(?P<command>[A-Z][0-9])"
+            b"(?:\x02(?P<data>[^\x03]*))?"
+            b"\x03(?P<block_check>.)"
+            b"\\Z"
+        ),
+        re.DOTALL,
+    )
+
+    def __bytes__(self) -> bytes:
+        encoded_command = b"%s%s%s" % (
+            self.command.encode(message_encoding)[:2],
+            b"\x02%s" % self.data.encode(message_encoding)
+            if self.data is not None
+            else b"",
+            self.terminator,
+        )
+        block_check_character = get_block_check_character(encoded_command)
+        return b"%s%s%s" % (self.initiator, encoded_command, block_check_character)
+
+    @classmethod
+    def from_bytes(cls, timestamp: float, frame: bytes) -> "CommandMessage":
+        matches = cls.match_frame_or_raise(
+            cls.frame_expression,
+            frame,
+        )
+
+        if get_block_check_character(frame[1:-1]) != matches.group("block_check"):
+            raise BlockCheckCharacterError(frame_type=cls, frame=frame)
+
+        data = matches.group("data")
+
+        return cls(
+            timestamp=timestamp,
+            command=matches.group("command").decode(message_encoding),
+            data=data.decode(message_encoding) if data is not None else None,
+        )
+
+
+@add_slots
+@dataclass(frozen=True)
+class ProgrammingDataMessage(BaseMessage):
+    data: DataBlock
+    initiator: ClassVar[bytes] = b"\x02"
+    terminator: ClassVar[bytes] = b"\x03"
+    extra_bytes_after_terminator: ClassVar[int] = 1
+    has_block_check_character: ClassVar[bool] = True
+
+    frame_expression: ClassVar[Pattern[bytes]] = re.compile(
+        b"\\A\x02(?P<data>[^\x03]*)\x03(?P<block_check>.)\\Z", re.DOTALL
+    )
+
+    def __bytes__(self) -> bytes:
+        encoded_data = b"%s%s" % (
+            b"\r\n".join(bytes(line) for line in self.data.data_lines),
+            self.terminator,
+        )
+        block_check_character = get_block_check_character(encoded_data)
+        return b"%s%s%s" % (self.initiator, encoded_data, block_check_character)
+
+    @classmethod
+    def from_bytes(cls, timestamp: float, frame: bytes) -> "ProgrammingDataMessage":
+        matches = cls.match_frame_or_raise(
+            cls.frame_expression,
+            frame,
+        )
+
+        if get_block_check_character(frame[1:-1]) != matches.group("block_check"):
+            raise BlockCheckCharacterError(frame_type=cls, frame=frame)
+
+        try:
+            data = DataBlock.from_bytes(
+                timestamp=timestamp,
+                data=matches.group("data"),
+                parse_data_set=parse_programming_data_set,
+            )
+        except ValueError as error:
+            raise ParsingError(frame_type=cls, frame=frame) from error
+
+        return cls(timestamp=timestamp, data=data)
+
+
+@add_slots
+@dataclass(frozen=True)
+class PartialDataMessage(BaseMessage):
+    # the raw data lines, which may be split anywhere between blocks
+    data: bytes
+    # more blocks follow after acknowledging this one
+    is_partial: bool = False
+    initiator: ClassVar[bytes] = b"\x02"
+    terminator: ClassVar[bytes] = b"\x03"
+    partial_terminator: ClassVar[Optional[bytes]] = b"\x04"
+    extra_bytes_after_terminator: ClassVar[int] = 1
+    has_block_check_character: ClassVar[bool] = True
+
+    frame_expression: ClassVar[Pattern[bytes]] = re.compile(
+        b"\\A\x02(?P<data>[^\x03\x04]*)(?P<end>[\x03\x04])(?P<block_check>.)\\Z",
+        re.DOTALL,
+    )
+
+    def __bytes__(self) -> bytes:
+        encoded_data = b"%s%s" % (
+            self.data,
+            self.partial_terminator if self.is_partial else self.terminator,
+        )
+        block_check_character = get_block_check_character(encoded_data)
+        return b"%s%s%s" % (self.initiator, encoded_data, block_check_character)
+
+    @classmethod
+    def from_bytes(cls, timestamp: float, frame: bytes) -> "PartialDataMessage":
+        matches = cls.match_frame_or_raise(
+            cls.frame_expression,
+            frame,
+        )
+
+        if get_block_check_character(frame[1:-1]) != matches.group("block_check"):
+            raise BlockCheckCharacterError(frame_type=cls, frame=frame)
+
+        return cls(
+            timestamp=timestamp,
+            data=matches.group("data"),
+            is_partial=matches.group("end") == cls.partial_terminator,
+        )
+
+
+@add_slots
+@dataclass(frozen=True)
+class NegativeAcknowledgementMessage(BaseMessage):
+    # requests the repetition of the last message
+    initiator: ClassVar[bytes] = b"\x15"
+    terminator: ClassVar[bytes] = b""
+
+    def __bytes__(self) -> bytes:
+        return self.initiator
+
+    @classmethod
+    def from_bytes(
+        cls, timestamp: float, frame: bytes
+    ) -> "NegativeAcknowledgementMessage":
+        if frame != cls.initiator:
+            raise ParsingError(frame_type=cls, frame=frame)
+
+        return cls(timestamp=timestamp)
+
+
+@add_slots
+@dataclass(frozen=True)
+class PositiveAcknowledgementMessage(BaseMessage):
+    initiator: ClassVar[bytes] = b"\x06"
+    terminator: ClassVar[bytes] = b""
+
+    def __bytes__(self) -> bytes:
+        return self.initiator
+
+    @classmethod
+    def from_bytes(
+        cls, timestamp: float, frame: bytes
+    ) -> "PositiveAcknowledgementMessage":
+        if frame != cls.initiator:
+            raise ParsingError(frame_type=cls, frame=frame)
+
+        return cls(timestamp=timestamp)
+
+
+def parse_programming_data_set(timestamp: float, line: DataBuffer) -> DataSet:
+    # meters may omit the address of the register that has been read
+    if line.startswith(b"("):
+        return replace(DataSet.from_bytes(timestamp, b"0%s" % line), address="")
+
+    return DataSet.from_bytes(timestamp, line)
+
 
 Iec6205621Message = Union[
-    RequestMessage, IdentificationMessage, AcknowledgementMessage, DataMessage
+    RequestMessage,
+    IdentificationMessage,
+    AcknowledgementMessage,
+    DataMessage,
+    ModeDDataMessage,
+    CommandMessage,
+    ProgrammingDataMessage,
+    PartialDataMessage,
+    PositiveAcknowledgementMessage,
+    NegativeAcknowledgementMessage,
 ]
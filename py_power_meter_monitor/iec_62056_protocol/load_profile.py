@@ -0,0 +1,176 @@
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+import math
+import re
+from typing import Optional
+
+from ..utils.slotted_dataclass import add_slots
+from .data_block import data_line_separator, data_set_encoding
+from .errors import ParsingError
+
+load_profile_time_format = "%y%m%d%H%M"
+
+value_group_expression = re.compile(rb"\(([^()]*)\)")
+
+
+@add_slots
+@dataclass(frozen=True)
+class LoadProfileChannel:
+    address: str
+    unit: Optional[str]
+
+
+@add_slots
+@dataclass(frozen=True)
+class LoadProfileBlock:
+    channels: tuple[LoadProfileChannel, ...]
+    timestamps: "array[float]"
+    statuses: "array[int]"
+    # the values of all channels record by record, NaN if a value is missing
+    values: "array[float]"
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def get_record_values(self, index: int) -> "array[float]":
+        channel_count = len(self.channels)
+        return self.values[index * channel_count : (index + 1) * channel_count]
+
+
+class LoadProfileParser:
+    def __init__(self):
+        self.buffer = bytearray()
+        self.channels: tuple[LoadProfileChannel, ...] = ()
+        self.status = 0
+        self.interval = 0.0
+        self.next_timestamp: Optional[float] = None
+        self.completed_blocks: list[LoadProfileBlock] = []
+        self.reset_columns()
+
+    def reset_columns(self):
+        self.timestamps = array("d")
+        self.statuses = array("l")
+        self.values = array("d")
+
+    def feed(self, data: bytes) -> list[LoadProfileBlock]:
+        self.buffer += data
+        lines_end = self.buffer.rfind(data_line_separator)
+
+        # only complete lines are parsed, the rest may continue in the next block
+        if lines_end >= 0:
+            for line in self.buffer[:lines_end].split(data_line_separator):
+                self.parse_line(line)
+
+            del self.buffer[: lines_end + len(data_line_separator)]
+
+        return self.flush()
+
+    def finish(self) -> list[LoadProfileBlock]:
+        if self.buffer:
+            self.parse_line(self.buffer)
+            self.buffer.clear()
+
+        return self.flush()
+
+    def flush(self) -> list[LoadProfileBlock]:
+        # the records are handed out after every block to keep the memory usage
+        # independent of the length of the profile
+        self.complete_block()
+        completed_blocks = self.completed_blocks
+        self.completed_blocks = []
+
+        return completed_blocks
+
+    def complete_block(self):
+        if not self.timestamps:
+            return
+
+        self.completed_blocks.append(
+            LoadProfileBlock(
+                channels=self.channels,
+                timestamps=self.timestamps,
+                statuses=self.statuses,
+                values=self.values,
+            )
+        )
+        self.reset_columns()
+
+    def parse_line(self, line: bytearray):
+        header_end = line.find(b"(")
+
+        if header_end < 0:
+            if line.strip():
+                raise ParsingError(frame_type=LoadProfileBlock, frame=bytes(line))
+            return
+
+        groups = [
+            group.decode(data_set_encoding)
+            for group in value_group_expression.findall(line, header_end)
+        ]
+
+        if header_end > 0:
+            self.parse_header(line, groups)
+        else:
+            self.parse_record(line, groups)
+
+    def parse_header(self, line: bytearray, groups: list[str]):
+        # (time)(status)(interval in minutes)(channel count)(id)(unit)...
+        try:
+            channel_count = int(groups[3])
+            timestamp = datetime.strptime(
+                groups[0][-10:], load_profile_time_format
+            ).timestamp()
+            status = int(groups[1] or "0", 16)
+            interval = int(groups[2]) * 60.0
+        except (IndexError, ValueError) as error:
+            raise ParsingError(
+                frame_type=LoadProfileBlock, frame=bytes(line)
+            ) from error
+
+        if len(groups) != 4 + 2 * channel_count:
+            raise ParsingError(frame_type=LoadProfileBlock, frame=bytes(line))
+
+        channels = tuple(
+            LoadProfileChannel(address=address, unit=unit or None)
+            for address, unit in zip(groups[4::2], groups[5::2])
+        )
+
+        if channels != self.channels:
+            # a block only contains records of the same channels
+            self.complete_block()
+            self.channels = channels
+
+        self.status = status
+        self.interval = interval
+        self.next_timestamp = timestamp
+
+    def parse_record(self, line: bytearray, groups: list[str]):
+        if self.next_timestamp is None or len(groups) != len(self.channels):
+            raise ParsingError(frame_type=LoadProfileBlock, frame=bytes(line))
+
+        self.timestamps.append(self.next_timestamp)
+        self.statuses.append(self.status)
+        self.values.extend(parse_load_profile_value(group) for group in groups)
+        self.next_timestamp += self.interval
+
+
+def parse_load_profile_value(group: str) -> float:
+    # values may repeat the unit of the channel
+    try:
+        return float(group.partition("*")[0])
+    except ValueError:
+        return math.nan
+
+
+def format_load_profile_request(
+    start: Optional[datetime],
+    end: Optional[datetime],
+    profile_address: str = "P.01",
+) -> str:
+    # omitting a boundary requests all records from the beginning or up to the end
+    return "%s(%s;%s)" % (
+        profile_address,
+        start.strftime(load_profile_time_format) if start is not None else "",
+        end.strftime(load_profile_time_format) if end is not None else "",
+    )
@@ -1,93 +1,185 @@
 # pyright: reportUnnecessaryIsInstance=false
-from dataclasses import dataclass
-from typing import Tuple, Type, Union
+from dataclasses import dataclass, replace
+from typing import Callable, Optional, Sequence, Tuple, Type, Union
 
-from .data_block import DataBlock
+from ..utils.slotted_dataclass import add_slots
+from .baud_rate_negotiation import accept_proposed_baud_rate_id
+from .data_block import DataBlock, DataBlockStatus, DataSet
 from .iec_62056_21_messages import (
     AcknowledgementMessage,
+    CommandMessage,
     DataMessage,
     IdentificationMessage,
     Iec6205621Message,
+    NegativeAcknowledgementMessage,
+    PartialDataMessage,
+    PositiveAcknowledgementMessage,
+    ProgrammingDataMessage,
     RequestMessage,
 )
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class InitialState:
     pass
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class IdentifiedState:
     manufacturer_id: str
     baud_rate_id: str
     identification: str
+    retransmission_count: int = 0
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
+class ProgrammingModeState:
+    manufacturer_id: str
+    baud_rate_id: str
+    identification: str
+    register_addresses: tuple[str, ...]
+    data_sets: tuple[DataSet, ...] = ()
+    retransmission_count: int = 0
+
+    @property
+    def next_register_address(self) -> str:
+        return self.register_addresses[len(self.data_sets)]
+
+
+@add_slots
+@dataclass(frozen=True)
+class LoadProfileState:
+    manufacturer_id: str
+    baud_rate_id: str
+    identification: str
+    request: str
+    # the data of the most recently received partial block
+    data: bytes = b""
+    retransmission_count: int = 0
+
+
+@add_slots
+@dataclass(frozen=True)
+class LoadProfileReadoutSuccessState:
+    # the data of the last block
+    data: bytes
+
+
+@add_slots
+@dataclass(frozen=True)
 class DataReadoutSuccessState:
     data: DataBlock
+    # the programming mode session that can be resumed without signing on again
+    session: Optional[ProgrammingModeState] = None
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class ProtocolErrorState:
     message: str
 
 
 ModeCState = Union[
-    InitialState, IdentifiedState, DataReadoutSuccessState, ProtocolErrorState
+    InitialState,
+    IdentifiedState,
+    ProgrammingModeState,
+    LoadProfileState,
+    DataReadoutSuccessState,
+    LoadProfileReadoutSuccessState,
+    ProtocolErrorState,
 ]
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class ResetEvent:
     pass
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class ReceiveMessageEvent:
     message: Iec6205621Message
 
 
-ModeCEvent = Union[ResetEvent, ReceiveMessageEvent]
+@add_slots
+@dataclass(frozen=True)
+class ReceiveInvalidMessageEvent:
+    # a frame of the expected type with a wrong block check character
+    timestamp: float
+    message_type: Type[Iec6205621Message]
+    frame: bytes
+
+
+@add_slots
+@dataclass(frozen=True)
+class ResumeSessionEvent:
+    pass
+
+
+ModeCEvent = Union[
+    ResetEvent, ReceiveMessageEvent, ReceiveInvalidMessageEvent, ResumeSessionEvent
+]
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class SendMessageEffect:
     message: Iec6205621Message
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class AwaitMessageEffect:
     message_type: Type[Iec6205621Message]
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class ResetEffect:
     pass
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class ResetSpeedEffect:
     pass
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class ChangeSpeedEffect:
     baud_rate_id: str
 
 
+@add_slots
+@dataclass(frozen=True)
+class KeepSessionEffect:
+    pass
+
+
 ModeCEffect = Union[
     SendMessageEffect,
     AwaitMessageEffect,
     ResetEffect,
     ResetSpeedEffect,
     ChangeSpeedEffect,
+    KeepSessionEffect,
 ]
 
 
 def get_next_state(
-    state: ModeCState, event: ModeCEvent
+    state: ModeCState,
+    event: ModeCEvent,
+    select_baud_rate_id: Callable[[str], str] = accept_proposed_baud_rate_id,
+    register_addresses: Sequence[str] = (),
+    keep_session: bool = False,
+    load_profile_request: Optional[str] = None,
+    maximum_retransmissions: int = 0,
+    salvage_unverified_data: bool = False,
 ) -> Tuple[ModeCState, list[ModeCEffect]]:
     if isinstance(event, ResetEvent):
         return (
@@ -97,12 +189,78 @@ def get_next_state(
                 AwaitMessageEffect(message_type=IdentificationMessage),
             ],
         )
+    elif isinstance(event, ResumeSessionEvent):
+        if isinstance(state, DataReadoutSuccessState) and state.session is not None:
+            return read_next_register(
+                replace(state.session, data_sets=(), retransmission_count=0)
+            )
+        else:
+            return (
+                ProtocolErrorState(message=f"No session to resume in state {state}"),
+                [ResetEffect()],
+            )
+    elif isinstance(event, ReceiveInvalidMessageEvent):
+        if (
+            isinstance(state, (IdentifiedState, ProgrammingModeState, LoadProfileState))
+            and state.retransmission_count < maximum_retransmissions
+        ):
+            return request_retransmission(state, event.message_type)
+        elif (
+            isinstance(state, IdentifiedState)
+            and event.message_type is DataMessage
+            and salvage_unverified_data
+            and (
+                data_sets := DataMessage.salvage_data_sets(event.timestamp, event.frame)
+            )
+        ):
+            return (
+                DataReadoutSuccessState(
+                    data=DataBlock(
+                        manufacturer_identification=state.identification,
+                        data_lines=data_sets,
+                        status=DataBlockStatus.UNVERIFIED,
+                    )
+                ),
+                [ResetEffect()],
+            )
+        else:
+            return (
+                ProtocolErrorState(
+                    message=f"Received {event.message_type.__name__} with an invalid block check character in state {state}"
+                ),
+                [ResetEffect()],
+            )
     elif isinstance(state, InitialState):
         if isinstance(event.message, IdentificationMessage):
+            # the meter switches to any rate up to the one it proposed
+            baud_rate_id = select_baud_rate_id(event.message.baud_rate_id)
+
+            if load_profile_request is not None:
+                return (
+                    LoadProfileState(
+                        manufacturer_id=event.message.manufacturer_id,
+                        baud_rate_id=baud_rate_id,
+                        identification=event.message.identification,
+                        request=load_profile_request,
+                    ),
+                    get_programming_mode_sign_on_effects(baud_rate_id),
+                )
+            elif register_addresses:
+                # sign on in programming mode to read only the given registers
+                return (
+                    ProgrammingModeState(
+                        manufacturer_id=event.message.manufacturer_id,
+                        baud_rate_id=baud_rate_id,
+                        identification=event.message.identification,
+                        register_addresses=tuple(register_addresses),
+                    ),
+                    get_programming_mode_sign_on_effects(baud_rate_id),
+                )
+
             return (
                 IdentifiedState(
                     manufacturer_id=event.message.manufacturer_id,
-                    baud_rate_id=event.message.baud_rate_id,
+                    baud_rate_id=baud_rate_id,
                     identification=event.message.identification,
                 ),
                 [
@@ -110,11 +268,11 @@ def get_next_state(
                         message=AcknowledgementMessage(
                             timestamp=0,
                             protocol_control="0",
-                            baud_rate_id=event.message.baud_rate_id,
+                            baud_rate_id=baud_rate_id,
                             mode_control="0",
                         )
                     ),
-                    ChangeSpeedEffect(baud_rate_id=event.message.baud_rate_id),
+                    ChangeSpeedEffect(baud_rate_id=baud_rate_id),
                     AwaitMessageEffect(message_type=DataMessage),
                 ],
             )
@@ -125,6 +283,94 @@ def get_next_state(
                 ),
                 [ResetEffect()],
             )
+    elif isinstance(state, ProgrammingModeState):
+        if (
+            isinstance(event.message, CommandMessage)
+            and event.message.command == "P0"
+            and not state.data_sets
+        ):
+            # the password prompt is answered by reading right away, which
+            # meters without password protection accept
+            return read_next_register(state)
+        elif (
+            isinstance(event.message, ProgrammingDataMessage)
+            and event.message.data.data_lines
+        ):
+            # the response may omit the address of the register or use a
+            # shorter notation than the configured one
+            data_set = replace(
+                event.message.data.data_lines[0], address=state.next_register_address
+            )
+            next_state = replace(state, data_sets=state.data_sets + (data_set,))
+
+            if len(next_state.data_sets) < len(next_state.register_addresses):
+                return read_next_register(next_state)
+
+            data = DataBlock(
+                manufacturer_identification=state.identification,
+                data_lines=list(next_state.data_sets),
+            )
+
+            if keep_session:
+                return (
+                    DataReadoutSuccessState(data=data, session=next_state),
+                    [KeepSessionEffect()],
+                )
+            else:
+                return (
+                    DataReadoutSuccessState(data=data),
+                    [
+                        SendMessageEffect(message=CommandMessage(0, command="B0")),
+                        ResetEffect(),
+                    ],
+                )
+        else:
+            return (
+                ProtocolErrorState(
+                    message=f"Expected programming mode message, but received {event.message}"
+                ),
+                [ResetEffect()],
+            )
+    elif isinstance(state, LoadProfileState):
+        if isinstance(event.message, CommandMessage) and event.message.command == "P0":
+            return (
+                state,
+                [
+                    SendMessageEffect(
+                        message=CommandMessage(
+                            timestamp=0, command="R5", data=state.request
+                        )
+                    ),
+                    AwaitMessageEffect(message_type=PartialDataMessage),
+                ],
+            )
+        elif isinstance(event.message, PartialDataMessage):
+            if event.message.is_partial:
+                # the meter sends the next block once this one is acknowledged
+                return (
+                    replace(state, data=event.message.data),
+                    [
+                        SendMessageEffect(
+                            message=PositiveAcknowledgementMessage(timestamp=0)
+                        ),
+                        AwaitMessageEffect(message_type=PartialDataMessage),
+                    ],
+                )
+            else:
+                return (
+                    LoadProfileReadoutSuccessState(data=event.message.data),
+                    [
+                        SendMessageEffect(message=CommandMessage(0, command="B0")),
+                        ResetEffect(),
+                    ],
+                )
+        else:
+            return (
+                ProtocolErrorState(
+                    message=f"Expected load profile block, but received {event.message}"
+                ),
+                [ResetEffect()],
+            )
     elif isinstance(state, IdentifiedState):
         if isinstance(event.message, DataMessage):
             return (
@@ -147,3 +393,55 @@ def get_next_state(
             ProtocolErrorState(message=f"Invalid state and event: {state}, {event}"),
             [ResetEffect()],
         )
+
+
+def get_programming_mode_sign_on_effects(baud_rate_id: str) -> list[ModeCEffect]:
+    return [
+        SendMessageEffect(
+            message=AcknowledgementMessage(
+                timestamp=0,
+                protocol_control="0",
+                baud_rate_id=baud_rate_id,
+                mode_control="1",
+            )
+        ),
+        ChangeSpeedEffect(baud_rate_id=baud_rate_id),
+        AwaitMessageEffect(message_type=CommandMessage),
+    ]
+
+
+def request_retransmission(
+    state: Union[IdentifiedState, ProgrammingModeState, LoadProfileState],
+    message_type: Type[Iec6205621Message],
+) -> Tuple[ModeCState, list[ModeCEffect]]:
+    next_state = replace(state, retransmission_count=state.retransmission_count + 1)
+
+    if isinstance(next_state, LoadProfileState):
+        # the block that has already been parsed must not be parsed twice
+        next_state = replace(next_state, data=b"")
+
+    return (
+        next_state,
+        [
+            SendMessageEffect(message=NegativeAcknowledgementMessage(timestamp=0)),
+            AwaitMessageEffect(message_type=message_type),
+        ],
+    )
+
+
+def read_next_register(
+    state: ProgrammingModeState,
+) -> Tuple[ModeCState, list[ModeCEffect]]:
+    return (
+        state,
+        [
+            SendMessageEffect(
+                message=CommandMessage(
+                    timestamp=0,
+                    command="R5",
+                    data=f"{state.next_register_address}()",
+                )
+            ),
+            AwaitMessageEffect(message_type=ProgrammingDataMessage),
+        ],
+    )
@@ -1,7 +1,10 @@
 from dataclasses import dataclass
+from typing import Any, Optional, Type
 
 from ..config import ObisDataSetConfig
-from .data_block import DataBlock, DataSet
+from ..utils.bounded_cache import BoundedCache
+from ..utils.slotted_dataclass import add_slots
+from .data_block import DataBlock, DataBlockStatus, DataSet
 from .obis_data_set import (
     ObisDataSet,
     ObisId,
@@ -11,6 +14,9 @@ from .obis_data_set import (
 )
 
 
+ObisDataSetCacheKey = tuple[str, Optional[str], Optional[str]]
+ObisDataSetCacheEntry = tuple[Type[ObisDataSet], ObisId, Any, Optional[str]]
+
 METERING_POINT_ID_OBIS_IDS: list[ObisId] = [
     (1, 0, 0, 0, 0),
     (1, 1, 0, 0, 0),
@@ -18,10 +24,12 @@ METERING_POINT_ID_OBIS_IDS: list[ObisId] = [
 ]
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class ObisDataBlock:
     data_sets: list[ObisDataSet]
     manufacturer_identification: str
+    status: DataBlockStatus = DataBlockStatus.CONFIRMED
 
     @property
     def device_id(self):
@@ -40,8 +48,11 @@ class ObisDataBlock:
         cls,
         obis_data_set_configs: dict[ObisId, ObisDataSetConfig],
         data_block: DataBlock,
+        cache: Optional[
+            BoundedCache[ObisDataSetCacheKey, ObisDataSetCacheEntry]
+        ] = None,
     ):
-        def parse_data_set(data_set: DataSet):
+        def parse_data_set(data_set: DataSet) -> ObisDataSet:
             data_set_id = parse_obis_id_from_address(data_set.address)
             obis_data_set_config = obis_data_set_configs.get(data_set_id)
             obis_data_set_type = (
@@ -50,11 +61,53 @@ class ObisDataBlock:
                 else UnknownObisDataSet
             )
 
-            obis_data_set = obis_data_set_type.from_iec_62056_21_data_set(data_set)
+            obis_data_set = obis_data_set_type.from_iec_62056_21_data_set(
+                data_set, id=data_set_id
+            )
 
             return obis_data_set
 
+        def parse_cache_entry(key: ObisDataSetCacheKey) -> ObisDataSetCacheEntry:
+            address, value, unit = key
+            obis_data_set = parse_data_set(
+                DataSet(timestamp=0, address=address, value=value, unit=unit)
+            )
+
+            return (
+                type(obis_data_set),
+                obis_data_set.id,
+                obis_data_set.value,
+                obis_data_set.unit,
+            )
+
+        def parse_cached_data_set(data_set: DataSet) -> ObisDataSet:
+            assert cache is not None
+
+            (obis_data_set_type, data_set_id, value, unit,) = cache.get_or_compute(
+                (data_set.address, data_set.value, data_set.unit), parse_cache_entry
+            )
+
+            return obis_data_set_type(
+                timestamp=data_set.timestamp, id=data_set_id, value=value, unit=unit
+            )
+
+        parse = parse_cached_data_set if cache is not None else parse_data_set
+
+        if data_block.status == DataBlockStatus.UNVERIFIED:
+            # salvaged lines whose corrupted value doesn't fit their config are
+            # dropped instead of failing the whole block
+            data_sets: list[ObisDataSet] = []
+
+            for data_set in data_block.data_lines:
+                try:
+                    data_sets.append(parse(data_set))
+                except ValueError:
+                    continue
+        else:
+            data_sets = [parse(data_set) for data_set in data_block.data_lines]
+
         return cls(
-            data_sets=[parse_data_set(data_set) for data_set in data_block.data_lines],
+            data_sets=data_sets,
             manufacturer_identification=data_block.manufacturer_identification,
+            status=data_block.status,
         )
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 import re
 from typing import Optional, Tuple, Union
 
+from ..utils.slotted_dataclass import add_slots
 from .data_block import DataSet
 
 
@@ -12,64 +13,69 @@ ObisId = Union[
 ]
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class BaseObisDataSet:
     timestamp: float
     id: ObisId
     unit: Optional[str]
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class ObisIntegerDataSet(BaseObisDataSet):
     value: int
 
     @classmethod
-    def from_iec_62056_21_data_set(cls, data_set: DataSet):
+    def from_iec_62056_21_data_set(cls, data_set: DataSet, id: Optional[ObisId] = None):
         return cls(
             timestamp=data_set.timestamp,
-            id=parse_obis_id_from_address(data_set.address),
+            id=parse_obis_id_from_address(data_set.address) if id is None else id,
             value=int(data_set.value or "0", 10),
             unit=data_set.unit,
         )
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class ObisFloatDataSet(BaseObisDataSet):
     value: float
 
     @classmethod
-    def from_iec_62056_21_data_set(cls, data_set: DataSet):
+    def from_iec_62056_21_data_set(cls, data_set: DataSet, id: Optional[ObisId] = None):
         return cls(
             timestamp=data_set.timestamp,
-            id=parse_obis_id_from_address(data_set.address),
+            id=parse_obis_id_from_address(data_set.address) if id is None else id,
             value=float(data_set.value or "0.0"),
             unit=data_set.unit,
         )
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class ObisStringDataSet(BaseObisDataSet):
     value: str
 
     @classmethod
-    def from_iec_62056_21_data_set(cls, data_set: DataSet):
+    def from_iec_62056_21_data_set(cls, data_set: DataSet, id: Optional[ObisId] = None):
         return cls(
             timestamp=data_set.timestamp,
-            id=parse_obis_id_from_address(data_set.address),
+            id=parse_obis_id_from_address(data_set.address) if id is None else id,
             value=data_set.value or "",
             unit=None,
         )
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class UnknownObisDataSet(BaseObisDataSet):
     value: None = None
 
     @classmethod
-    def from_iec_62056_21_data_set(cls, data_set: DataSet):
+    def from_iec_62056_21_data_set(cls, data_set: DataSet, id: Optional[ObisId] = None):
         return cls(
             timestamp=data_set.timestamp,
-            id=parse_obis_id_from_address(data_set.address),
+            id=parse_obis_id_from_address(data_set.address) if id is None else id,
             unit=data_set.unit,
         )
 
@@ -138,6 +144,18 @@ def parse_obis_id_from_address(address: str) -> ObisId:
         )
 
 
+def format_obis_id(id: ObisId) -> str:
+    # the reduced id notation, e.g. 1-0:1.8.0*255
+    formatted_id = f"{id[0]}-{id[1]}:{id[2]}.{id[3]}"
+
+    if len(id) > 4:
+        formatted_id += f".{id[4]}"
+    if len(id) > 5:
+        formatted_id += f"*{id[5]}"
+
+    return formatted_id
+
+
 def parse_id_code(code: Optional[str]) -> int:
     if code is None:
         return 0
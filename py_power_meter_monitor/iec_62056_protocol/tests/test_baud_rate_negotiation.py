@@ -0,0 +1,133 @@
+from ..baud_rate_negotiation import BaudRateNegotiator
+from ..iec_62056_21_messages import AcknowledgementMessage, IdentificationMessage
+from ..mode_c_state_machine import (
+    ChangeSpeedEffect,
+    IdentifiedState,
+    InitialState,
+    ReceiveMessageEvent,
+    SendMessageEffect,
+    get_next_state,
+)
+
+
+def test_select_proposed_baud_rate_without_errors():
+    negotiator = BaudRateNegotiator()
+
+    assert negotiator.select_baud_rate_id("5") == "5"
+    assert negotiator.select_baud_rate_id("unknown") == "unknown"
+
+
+def test_fall_back_to_slower_baud_rates_after_errors():
+    negotiator = BaudRateNegotiator()
+
+    negotiator.record_block_check_character_error("5")
+    assert negotiator.select_baud_rate_id("5") == "4"
+
+    negotiator.record_timeout("4")
+    assert negotiator.select_baud_rate_id("5") == "3"
+
+    for baud_rate_id in ["3", "2", "1", "0"]:
+        negotiator.record_timeout(baud_rate_id)
+
+    # the initial rate is used as the last resort
+    assert negotiator.select_baud_rate_id("5") == "0"
+
+    statistics = negotiator.get_statistics("5")
+    assert statistics.readout_count == 1
+    assert statistics.block_check_character_error_count == 1
+    assert statistics.timeout_count == 0
+
+
+def test_probe_faster_baud_rate_after_successes():
+    negotiator = BaudRateNegotiator()
+    negotiator.record_block_check_character_error("5")
+
+    success_count = 0
+
+    while negotiator.select_baud_rate_id("5") == "4":
+        negotiator.record_success("4")
+        success_count += 1
+
+    assert success_count > 1
+    assert negotiator.select_baud_rate_id("5") == "5"
+
+    # a repeated failure backs off for longer
+    negotiator.record_block_check_character_error("5")
+    repeated_success_count = 0
+
+    while negotiator.select_baud_rate_id("5") == "4":
+        negotiator.record_success("4")
+        repeated_success_count += 1
+
+    assert repeated_success_count > success_count
+
+
+def test_persist_statistics_when_the_baud_rate_changes(tmp_path):
+    state_file_path = tmp_path / "baud_rates.json"
+    negotiator = BaudRateNegotiator(state_file_path=state_file_path)
+
+    negotiator.select_baud_rate_id("5")
+    negotiator.record_success("5")
+    negotiator.wait_for_saved_state()
+    assert not state_file_path.exists()
+
+    negotiator.record_block_check_character_error("5")
+    negotiator.wait_for_saved_state()
+    assert state_file_path.exists()
+
+    restored_negotiator = BaudRateNegotiator(state_file_path=state_file_path)
+    assert restored_negotiator.statistics == negotiator.statistics
+    assert restored_negotiator.select_baud_rate_id("5") == "4"
+
+
+def test_get_selected_baud_rate_without_side_effects():
+    negotiator = BaudRateNegotiator()
+
+    assert negotiator.get_selected_baud_rate_id() is None
+
+    negotiator.record_timeout("4")
+    assert negotiator.select_baud_rate_id("5") == "5"
+    assert negotiator.find_baud_rate_id("4") == "3"
+    assert negotiator.get_selected_baud_rate_id() == "5"
+    # neither the lookups nor the selection add statistics of other rates
+    assert list(negotiator.statistics) == ["4"]
+    assert negotiator.proposed_baud_rate_id == "5"
+
+
+def test_ignore_invalid_state_file(tmp_path):
+    state_file_path = tmp_path / "baud_rates.json"
+    state_file_path.write_text("{")
+
+    negotiator = BaudRateNegotiator(state_file_path=state_file_path)
+
+    assert negotiator.statistics == {}
+
+
+def test_state_machine_acknowledges_selected_baud_rate():
+    (state, effects) = get_next_state(
+        state=InitialState(),
+        event=ReceiveMessageEvent(
+            message=IdentificationMessage(
+                timestamp=0,
+                manufacturer_id="LOG",
+                baud_rate_id="5",
+                mode_ids="",
+                identification="LK123",
+            )
+        ),
+        select_baud_rate_id=lambda proposed_baud_rate_id: "3",
+    )
+
+    assert isinstance(state, IdentifiedState)
+    assert state.baud_rate_id == "3"
+    assert effects[:2] == [
+        SendMessageEffect(
+            message=AcknowledgementMessage(
+                timestamp=0,
+                protocol_control="0",
+                baud_rate_id="3",
+                mode_control="0",
+            )
+        ),
+        ChangeSpeedEffect(baud_rate_id="3"),
+    ]
@@ -0,0 +1,105 @@
+import asyncio
+from dataclasses import replace
+
+from hypothesis import given
+from hypothesis import strategies as st
+
+from ..columnar_obis_data_block import (
+    ColumnarObisDataBlock,
+    ColumnarObisDataBlockTopic,
+    pack_obis_id,
+    unpack_obis_id,
+)
+from ..data_block import DataBlock, DataBlockStatus
+from ..obis_data_block import ObisDataBlock
+from ..obis_data_set import ObisIntegerDataSet
+from .test_iec_62056_21_messages import sample_logarex_data_block
+from .test_obis_data_block import obis_data_set_configs
+
+group_strategy = st.integers(min_value=0, max_value=255)
+
+
+@given(
+    obis_id=st.one_of(
+        st.tuples(*[group_strategy] * 4),  # type: ignore
+        st.tuples(*[group_strategy] * 5),  # type: ignore
+        st.tuples(*[group_strategy] * 6),  # type: ignore
+    )
+)
+def test_pack_obis_id(obis_id):
+    assert unpack_obis_id(pack_obis_id(obis_id)) == obis_id
+
+
+def test_columnar_obis_data_block_round_trip():
+    obis_data_block = ObisDataBlock.from_iec_62056_21_data_block(
+        obis_data_set_configs=obis_data_set_configs,
+        data_block=replace(
+            DataBlock.from_bytes(timestamp=1, data=sample_logarex_data_block),
+            status=DataBlockStatus.PROVISIONAL,
+        ),
+    )
+
+    columnar_obis_data_block = ColumnarObisDataBlock.from_obis_data_block(
+        obis_data_block
+    )
+
+    assert len(columnar_obis_data_block) == 24
+    assert columnar_obis_data_block.to_obis_data_block() == obis_data_block
+
+
+def test_columnar_obis_data_block_interns_strings():
+    obis_data_block = ObisDataBlock.from_iec_62056_21_data_block(
+        obis_data_set_configs=obis_data_set_configs,
+        data_block=DataBlock.from_bytes(timestamp=1, data=sample_logarex_data_block),
+    )
+
+    columnar_obis_data_block = ColumnarObisDataBlock.from_obis_data_block(
+        obis_data_block
+    )
+
+    assert len(set(columnar_obis_data_block.strings)) == len(
+        columnar_obis_data_block.strings
+    )
+
+
+def test_columnar_obis_data_block_topic():
+    obis_data_block = ObisDataBlock.from_iec_62056_21_data_block(
+        obis_data_set_configs=obis_data_set_configs,
+        data_block=DataBlock.from_bytes(timestamp=1, data=sample_logarex_data_block),
+    )
+    # too large for the integer column, so the block is buffered as is
+    oversized_obis_data_block = ObisDataBlock(
+        data_sets=[
+            ObisIntegerDataSet(
+                timestamp=1, id=(1, 0, 0, 0, 0), value=2**64, unit=None
+            )
+        ],
+        manufacturer_identification="",
+        status=DataBlockStatus.CONFIRMED,
+    )
+    topic = ColumnarObisDataBlockTopic(capacity=4)
+
+    async def receive() -> list[ObisDataBlock]:
+        received_obis_data_blocks = []
+
+        async for message in topic.items():
+            received_obis_data_blocks.append(message)
+
+            if len(received_obis_data_blocks) == 2:
+                return received_obis_data_blocks
+
+        return received_obis_data_blocks
+
+    async def publish_and_receive() -> list[ObisDataBlock]:
+        task = asyncio.create_task(receive())
+        await asyncio.sleep(0)
+        topic.publish(obis_data_block)
+        topic.publish(oversized_obis_data_block)
+        return await task
+
+    assert asyncio.run(publish_and_receive()) == [
+        obis_data_block,
+        oversized_obis_data_block,
+    ]
+    assert isinstance(topic.messages[0], ColumnarObisDataBlock)
+    assert topic.messages[1] is oversized_obis_data_block
@@ -0,0 +1,127 @@
+import asyncio
+
+from pytest import raises
+
+from ..data_block import DataSet
+from ..errors import ParsingError
+from ..frame_decoder import FrameDecoder
+from ..iec_62056_21_messages import (
+    AcknowledgementMessage,
+    DataMessage,
+    IdentificationMessage,
+    PartialDataMessage,
+)
+from .test_iec_62056_21_messages import (
+    sample_landis_gyr_data_message_frame,
+    sample_logarex_data_block,
+)
+
+sample_logarex_data_message_frame = b"\x02%s!\r\n\x03\x67" % sample_logarex_data_block
+
+
+def test_decode_data_message_fed_byte_by_byte():
+    decoder = FrameDecoder()
+
+    for index in range(len(sample_landis_gyr_data_message_frame) - 1):
+        decoder.feed(sample_landis_gyr_data_message_frame[index : index + 1])
+        assert decoder.decode(DataMessage) is None
+
+    decoder.feed(sample_landis_gyr_data_message_frame[-1:])
+    message = decoder.decode(DataMessage)
+
+    assert message == DataMessage.from_bytes(
+        timestamp=message.timestamp, frame=sample_landis_gyr_data_message_frame
+    )
+    assert decoder.buffer == b""
+
+
+def test_decode_data_message_fed_at_once():
+    decoder = FrameDecoder()
+    decoder.feed(sample_logarex_data_message_frame)
+    message = decoder.decode(DataMessage)
+
+    assert message is not None
+    assert bytes(message) == sample_logarex_data_message_frame
+
+
+def test_decode_skips_bytes_before_the_initiator():
+    decoder = FrameDecoder()
+    decoder.feed(b"\x00garbage\r\n/LOG5LK123\r\n")
+    message = decoder.decode(IdentificationMessage)
+
+    assert message == IdentificationMessage(
+        timestamp=message.timestamp,
+        manufacturer_id="LOG",
+        baud_rate_id="5",
+        mode_ids="",
+        identification="LK123",
+    )
+
+
+def test_decode_keeps_bytes_after_the_frame():
+    decoder = FrameDecoder()
+    decoder.feed(b"/LOG5LK123\r\n\x06050\r\n")
+
+    assert isinstance(decoder.decode(IdentificationMessage), IdentificationMessage)
+    assert isinstance(decoder.decode(AcknowledgementMessage), AcknowledgementMessage)
+    assert decoder.decode(AcknowledgementMessage) is None
+
+
+def test_decode_raises_on_block_check_character_mismatch():
+    decoder = FrameDecoder()
+    decoder.feed(sample_logarex_data_message_frame[:-1] + b"\x00" + b"\x02")
+
+    with raises(ParsingError):
+        decoder.decode(DataMessage)
+
+    # the invalid frame is discarded
+    assert decoder.buffer == b"\x02"
+
+
+def test_read_from_stream_in_chunks():
+    async def read_message():
+        reader = asyncio.StreamReader()
+        for index in range(0, len(sample_logarex_data_message_frame), 7):
+            reader.feed_data(sample_logarex_data_message_frame[index : index + 7])
+        reader.feed_eof()
+
+        return await DataMessage.read_from_stream(reader)
+
+    message = asyncio.run(read_message())
+
+    assert bytes(message) == sample_logarex_data_message_frame
+
+
+def test_stream_data_sets_before_the_end_of_the_block():
+    streamed_data_sets: list[DataSet] = []
+    decoder = FrameDecoder(on_data_set=streamed_data_sets.append)
+
+    first_line_end = sample_logarex_data_message_frame.index(b"\r\n") + 2
+    decoder.feed(sample_logarex_data_message_frame[:first_line_end])
+
+    assert decoder.decode(DataMessage) is None
+    assert [data_set.address for data_set in streamed_data_sets] == ["1-0:96.1.0*255"]
+
+    decoder.feed(sample_logarex_data_message_frame[first_line_end:])
+    message = decoder.decode(DataMessage)
+
+    assert message is not None
+    assert message.data.data_lines == streamed_data_sets
+    assert len(streamed_data_sets) == 24
+
+
+def test_decode_partial_data_messages():
+    decoder = FrameDecoder()
+    decoder.feed(
+        bytes(PartialDataMessage(timestamp=0, data=b"(0.0", is_partial=True))
+        + bytes(PartialDataMessage(timestamp=0, data=b"29)\r\n"))
+    )
+
+    first_message = decoder.decode(PartialDataMessage)
+    second_message = decoder.decode(PartialDataMessage)
+
+    assert first_message is not None and first_message.is_partial
+    assert first_message.data == b"(0.0"
+    assert second_message is not None and not second_message.is_partial
+    assert second_message.data == b"29)\r\n"
+    assert decoder.buffer == b""
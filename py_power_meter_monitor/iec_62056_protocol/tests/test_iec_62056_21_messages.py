@@ -1,11 +1,14 @@
 from pytest import raises
 
-from ..data_block import DataBlock
-from ..errors import ParsingError
+from ..data_block import DataBlock, DataSet
+from ..errors import BlockCheckCharacterError, ParsingError
 from ..iec_62056_21_messages import (
     AcknowledgementMessage,
+    CommandMessage,
     DataMessage,
     IdentificationMessage,
+    ModeDDataMessage,
+    ProgrammingDataMessage,
     RequestMessage,
 )
 
@@ -89,6 +92,47 @@ def test_landis_gyr_data_message():
     DataMessage.from_bytes(timestamp=0, frame=sample_landis_gyr_data_message_frame)
 
 
+def test_mode_d_data_message():
+    frame = b"/LOG5LK123\r\n\r\n%s!\r\n" % sample_logarex_data_block
+    message = ModeDDataMessage.from_bytes(timestamp=0, frame=frame)
+
+    assert message.identification.manufacturer_id == "LOG"
+    assert message.data == DataBlock.from_bytes(
+        timestamp=0, data=sample_logarex_data_block
+    ).with_manufacturer_identification("LK123")
+    assert bytes(message) == frame
+
+
+def test_read_command_message():
+    frame = b"\x01R5\x021-0:1.8.0*255()\x03P"
+    message = CommandMessage(timestamp=0, command="R5", data="1-0:1.8.0*255()")
+
+    assert bytes(message) == frame
+    assert CommandMessage.from_bytes(timestamp=0, frame=frame) == message
+
+
+def test_break_command_message():
+    frame = b"\x01B0\x03q"
+    message = CommandMessage(timestamp=0, command="B0")
+
+    assert bytes(message) == frame
+    assert CommandMessage.from_bytes(timestamp=0, frame=frame) == message
+
+
+def test_command_message_with_invalid_block_check_character_raises():
+    with raises(BlockCheckCharacterError):
+        CommandMessage.from_bytes(timestamp=0, frame=b"\x01P0\x02(1234567)\x03Q")
+
+
+def test_programming_data_message_without_address():
+    frame = b"\x02(015882.6927*kWh)\x03^"
+    message = ProgrammingDataMessage.from_bytes(timestamp=0, frame=frame)
+
+    assert message.data.data_lines == [
+        DataSet(timestamp=0, address="", value="015882.6927", unit="kWh")
+    ]
+
+
 sample_logarex_data_block = (
     b"1-0:96.1.0*255(001LOG0065282495)\r\n"
     b"1-0:1.8.0*255(015882.6927*kWh)\r\n"
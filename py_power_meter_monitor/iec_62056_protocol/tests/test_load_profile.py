@@ -0,0 +1,97 @@
+from datetime import datetime
+import math
+
+from hypothesis import given, strategies as st
+from pytest import raises
+
+from ..errors import ParsingError
+from ..load_profile import (
+    LoadProfileChannel,
+    LoadProfileParser,
+    format_load_profile_request,
+)
+
+sample_load_profile = (
+    b"P.01(2210010000)(00)(15)(2)(1.5.0)(kW)(2.5.0)(kW)\r\n"
+    b"(0.029)(0.000)\r\n"
+    b"(0.028*kW)(0.001)\r\n"
+    b"P.01(2210010100)(08)(15)(2)(1.5.0)(kW)(2.5.0)(kW)\r\n"
+    b"(0.030)()\r\n"
+    b"P.01(2210010115)(00)(15)(1)(1.5.0)(kW)\r\n"
+    b"(0.031)\r\n"
+)
+
+
+def parse_load_profile(chunks: list[bytes]):
+    parser = LoadProfileParser()
+    load_profile_blocks = [
+        load_profile_block
+        for chunk in chunks
+        for load_profile_block in parser.feed(chunk)
+    ]
+    load_profile_blocks.extend(parser.finish())
+
+    records = [
+        (
+            load_profile_block.channels,
+            load_profile_block.timestamps[index],
+            load_profile_block.statuses[index],
+            list(load_profile_block.get_record_values(index)),
+        )
+        for load_profile_block in load_profile_blocks
+        for index in range(len(load_profile_block))
+    ]
+
+    return (load_profile_blocks, records)
+
+
+def test_parse_load_profile():
+    (load_profile_blocks, records) = parse_load_profile([sample_load_profile])
+    start = datetime(2022, 10, 1).timestamp()
+    two_channels = (
+        LoadProfileChannel(address="1.5.0", unit="kW"),
+        LoadProfileChannel(address="2.5.0", unit="kW"),
+    )
+
+    assert len(load_profile_blocks) == 2
+    assert records[:2] == [
+        (two_channels, start, 0, [0.029, 0.0]),
+        (two_channels, start + 900, 0, [0.028, 0.001]),
+    ]
+    assert records[2][:3] == (two_channels, start + 3600, 8)
+    assert math.isnan(records[2][3][1])
+    assert records[3] == (
+        (LoadProfileChannel(address="1.5.0", unit="kW"),),
+        start + 4500,
+        0,
+        [0.031],
+    )
+
+
+@given(st.lists(st.integers(min_value=1, max_value=len(sample_load_profile) - 1)))
+def test_parse_load_profile_split_into_blocks(split_positions: list[int]):
+    positions = [0, *sorted(split_positions), len(sample_load_profile)]
+    chunks = [
+        sample_load_profile[start:end] for start, end in zip(positions, positions[1:])
+    ]
+
+    assert repr(parse_load_profile(chunks)[1]) == repr(
+        parse_load_profile([sample_load_profile])[1]
+    )
+
+
+def test_parse_load_profile_record_without_header_raises():
+    with raises(ParsingError):
+        LoadProfileParser().feed(b"(0.029)(0.000)\r\n")
+
+
+def test_parse_load_profile_with_invalid_header_raises():
+    with raises(ParsingError):
+        LoadProfileParser().feed(b"P.01(2210010000)(00)(15)(2)(1.5.0)(kW)\r\n")
+
+
+def test_format_load_profile_request():
+    assert (
+        format_load_profile_request(start=datetime(2022, 10, 1, 12, 15), end=None)
+        == "P.01(2210011215;)"
+    )
@@ -0,0 +1,330 @@
+from ..data_block import DataBlock, DataBlockStatus, DataSet
+from ..iec_62056_21_messages import (
+    AcknowledgementMessage,
+    CommandMessage,
+    DataMessage,
+    IdentificationMessage,
+    NegativeAcknowledgementMessage,
+    PartialDataMessage,
+    PositiveAcknowledgementMessage,
+    ProgrammingDataMessage,
+)
+from ..mode_c_state_machine import (
+    AwaitMessageEffect,
+    ChangeSpeedEffect,
+    DataReadoutSuccessState,
+    IdentifiedState,
+    InitialState,
+    KeepSessionEffect,
+    LoadProfileReadoutSuccessState,
+    LoadProfileState,
+    ProgrammingModeState,
+    ProtocolErrorState,
+    ReceiveInvalidMessageEvent,
+    ReceiveMessageEvent,
+    ResetEffect,
+    ResumeSessionEvent,
+    SendMessageEffect,
+    get_next_state,
+)
+
+register_addresses = ["1-0:1.8.0*255", "1-0:16.7.0*255"]
+
+identification_event = ReceiveMessageEvent(
+    message=IdentificationMessage(
+        timestamp=0,
+        manufacturer_id="LOG",
+        baud_rate_id="5",
+        mode_ids="",
+        identification="LK123",
+    )
+)
+
+
+def get_register_event(value: str, unit: str):
+    return ReceiveMessageEvent(
+        message=ProgrammingDataMessage(
+            timestamp=0,
+            data=DataBlock(
+                manufacturer_identification="",
+                data_lines=[DataSet(timestamp=0, address="", value=value, unit=unit)],
+            ),
+        )
+    )
+
+
+def get_read_effects(register_address: str):
+    return [
+        SendMessageEffect(
+            message=CommandMessage(
+                timestamp=0, command="R5", data=f"{register_address}()"
+            )
+        ),
+        AwaitMessageEffect(message_type=ProgrammingDataMessage),
+    ]
+
+
+def test_sign_on_in_programming_mode():
+    (state, effects) = get_next_state(
+        state=InitialState(),
+        event=identification_event,
+        register_addresses=register_addresses,
+    )
+
+    assert isinstance(state, ProgrammingModeState)
+    assert effects == [
+        SendMessageEffect(
+            message=AcknowledgementMessage(
+                timestamp=0, protocol_control="0", baud_rate_id="5", mode_control="1"
+            )
+        ),
+        ChangeSpeedEffect(baud_rate_id="5"),
+        AwaitMessageEffect(message_type=CommandMessage),
+    ]
+
+
+def test_read_registers_and_break():
+    (state, effects) = get_next_state(
+        state=InitialState(),
+        event=identification_event,
+        register_addresses=register_addresses,
+    )
+    (state, effects) = get_next_state(
+        state=state,
+        event=ReceiveMessageEvent(
+            message=CommandMessage(timestamp=0, command="P0", data="(1234567)")
+        ),
+        register_addresses=register_addresses,
+    )
+    assert effects == get_read_effects(register_addresses[0])
+
+    (state, effects) = get_next_state(
+        state=state,
+        event=get_register_event("015882.6927", "kWh"),
+        register_addresses=register_addresses,
+    )
+    assert effects == get_read_effects(register_addresses[1])
+
+    (state, effects) = get_next_state(
+        state=state,
+        event=get_register_event("000028", "W"),
+        register_addresses=register_addresses,
+    )
+
+    assert state == DataReadoutSuccessState(
+        data=DataBlock(
+            manufacturer_identification="LK123",
+            data_lines=[
+                DataSet(
+                    timestamp=0,
+                    address="1-0:1.8.0*255",
+                    value="015882.6927",
+                    unit="kWh",
+                ),
+                DataSet(
+                    timestamp=0, address="1-0:16.7.0*255", value="000028", unit="W"
+                ),
+            ],
+        )
+    )
+    assert effects == [
+        SendMessageEffect(message=CommandMessage(timestamp=0, command="B0")),
+        ResetEffect(),
+    ]
+
+
+def test_resume_session_without_signing_on_again():
+    session = ProgrammingModeState(
+        manufacturer_id="LOG",
+        baud_rate_id="5",
+        identification="LK123",
+        register_addresses=tuple(register_addresses[:1]),
+    )
+    (state, effects) = get_next_state(
+        state=session,
+        event=get_register_event("015882.6927", "kWh"),
+        register_addresses=register_addresses[:1],
+        keep_session=True,
+    )
+
+    assert isinstance(state, DataReadoutSuccessState)
+    assert effects == [KeepSessionEffect()]
+
+    (state, effects) = get_next_state(
+        state=state,
+        event=ResumeSessionEvent(),
+        register_addresses=register_addresses[:1],
+        keep_session=True,
+    )
+
+    assert state == session
+    assert effects == get_read_effects(register_addresses[0])
+
+
+def test_resume_without_session_fails():
+    (state, effects) = get_next_state(state=InitialState(), event=ResumeSessionEvent())
+
+    assert isinstance(state, ProtocolErrorState)
+    assert effects == [ResetEffect()]
+
+
+def test_read_load_profile_in_partial_blocks():
+    (state, effects) = get_next_state(
+        state=InitialState(),
+        event=identification_event,
+        load_profile_request="P.01(2210010000;)",
+    )
+    assert isinstance(state, LoadProfileState)
+
+    (state, effects) = get_next_state(
+        state=state,
+        event=ReceiveMessageEvent(
+            message=CommandMessage(timestamp=0, command="P0", data="(1234567)")
+        ),
+    )
+    assert effects == [
+        SendMessageEffect(
+            message=CommandMessage(timestamp=0, command="R5", data="P.01(2210010000;)")
+        ),
+        AwaitMessageEffect(message_type=PartialDataMessage),
+    ]
+
+    (state, effects) = get_next_state(
+        state=state,
+        event=ReceiveMessageEvent(
+            message=PartialDataMessage(timestamp=0, data=b"(0.0", is_partial=True)
+        ),
+    )
+    assert isinstance(state, LoadProfileState)
+    assert state.data == b"(0.0"
+    assert effects == [
+        SendMessageEffect(message=PositiveAcknowledgementMessage(timestamp=0)),
+        AwaitMessageEffect(message_type=PartialDataMessage),
+    ]
+
+    (state, effects) = get_next_state(
+        state=state,
+        event=ReceiveMessageEvent(
+            message=PartialDataMessage(timestamp=0, data=b"29)\r\n")
+        ),
+    )
+    assert state == LoadProfileReadoutSuccessState(data=b"29)\r\n")
+    assert effects == [
+        SendMessageEffect(message=CommandMessage(timestamp=0, command="B0")),
+        ResetEffect(),
+    ]
+
+
+def test_request_retransmission_until_limit():
+    corrupted_data_event = ReceiveInvalidMessageEvent(
+        timestamp=0, message_type=DataMessage, frame=b"\x02!\r\n\x03\x00"
+    )
+    (state, _) = get_next_state(InitialState(), identification_event)
+
+    for retransmission_count in range(1, 3):
+        (state, effects) = get_next_state(
+            state, corrupted_data_event, maximum_retransmissions=2
+        )
+
+        assert isinstance(state, IdentifiedState)
+        assert state.retransmission_count == retransmission_count
+        assert effects == [
+            SendMessageEffect(message=NegativeAcknowledgementMessage(timestamp=0)),
+            AwaitMessageEffect(message_type=DataMessage),
+        ]
+
+    (state, effects) = get_next_state(
+        state, corrupted_data_event, maximum_retransmissions=2
+    )
+
+    assert isinstance(state, ProtocolErrorState)
+    assert effects == [ResetEffect()]
+
+
+def test_salvage_unverified_data_lines():
+    frame = bytearray(
+        bytes(
+            DataMessage(
+                timestamp=0,
+                data=DataBlock(
+                    manufacturer_identification="",
+                    data_lines=[
+                        DataSet(timestamp=0, address="1.8.0", value="1.5", unit="kWh"),
+                        DataSet(timestamp=0, address="2.8.0", value="0.5", unit="kWh"),
+                    ],
+                ),
+            )
+        )
+    )
+    # corrupt the second line beyond recognition
+    frame[frame.index(b"(0.5")] = ord("?")
+    frame[-1] ^= 0x01
+    (state, _) = get_next_state(InitialState(), identification_event)
+
+    (state, effects) = get_next_state(
+        state,
+        ReceiveInvalidMessageEvent(
+            timestamp=1, message_type=DataMessage, frame=bytes(frame)
+        ),
+        salvage_unverified_data=True,
+    )
+
+    assert state == DataReadoutSuccessState(
+        data=DataBlock(
+            manufacturer_identification="LK123",
+            data_lines=[DataSet(timestamp=1, address="1.8.0", value="1.5", unit="kWh")],
+            status=DataBlockStatus.UNVERIFIED,
+        )
+    )
+    assert effects == [ResetEffect()]
+
+
+def test_salvage_skips_lines_with_corrupted_address_or_value():
+    frame = bytearray(
+        bytes(
+            DataMessage(
+                timestamp=0,
+                data=DataBlock(
+                    manufacturer_identification="",
+                    data_lines=[
+                        DataSet(
+                            timestamp=0,
+                            address="1-0:1.8.0*255",
+                            value="1.5",
+                            unit="kWh",
+                        ),
+                        DataSet(
+                            timestamp=0,
+                            address="1-0:2.8.0*255",
+                            value="0.5",
+                            unit="kWh",
+                        ),
+                        DataSet(
+                            timestamp=0,
+                            address="1-0:3.8.0*255",
+                            value="2.5",
+                            unit="kWh",
+                        ),
+                    ],
+                ),
+            )
+        )
+    )
+    # a corrupted address that still looks like one, and a corrupted value
+    frame[frame.index(b"2.8.0")] = ord("x")
+    frame[frame.index(b"2.5")] = 0x12
+    frame[-1] ^= 0x01
+    (state, _) = get_next_state(InitialState(), identification_event)
+
+    (state, _) = get_next_state(
+        state,
+        ReceiveInvalidMessageEvent(
+            timestamp=1, message_type=DataMessage, frame=bytes(frame)
+        ),
+        salvage_unverified_data=True,
+    )
+
+    assert isinstance(state, DataReadoutSuccessState)
+    assert state.data.data_lines == [
+        DataSet(timestamp=1, address="1-0:1.8.0*255", value="1.5", unit="kWh")
+    ]
@@ -0,0 +1,116 @@
+from ...config import ObisFloatDataSetConfig, ObisStringDataSetConfig
+from ...utils.bounded_cache import BoundedCache
+from ..data_block import DataBlock, DataBlockStatus, DataSet, cache_data_set_parser
+from ..obis_data_block import ObisDataBlock
+from .test_iec_62056_21_messages import sample_logarex_data_block
+
+obis_data_set_configs = {
+    (1, 0, 96, 1, 0, 255): ObisStringDataSetConfig(
+        id=(1, 0, 96, 1, 0, 255), name="Meter Id", value_type="string"
+    ),
+    (1, 0, 1, 8, 0, 255): ObisFloatDataSetConfig(
+        id=(1, 0, 1, 8, 0, 255),
+        name="Positive Active Power Integral Total",
+        value_type="float",
+    ),
+}
+
+
+def test_cached_obis_data_block_equals_uncached():
+    cache = BoundedCache(maximum_size=64)
+
+    for timestamp in range(3):
+        data_block = DataBlock.from_bytes(
+            timestamp=timestamp, data=sample_logarex_data_block
+        )
+
+        assert ObisDataBlock.from_iec_62056_21_data_block(
+            obis_data_set_configs=obis_data_set_configs,
+            data_block=data_block,
+            cache=cache,
+        ) == ObisDataBlock.from_iec_62056_21_data_block(
+            obis_data_set_configs=obis_data_set_configs,
+            data_block=data_block,
+        )
+
+    assert cache.statistics.misses == 24
+    assert cache.statistics.hits == 48
+
+
+def test_cached_data_set_parser_keeps_the_timestamp():
+    cache = BoundedCache(maximum_size=64)
+    parse_data_set = cache_data_set_parser(DataSet.from_bytes, cache)
+
+    assert parse_data_set(1, b"1-0:16.7.0*255(000028*W)") == DataSet(
+        timestamp=1, address="1-0:16.7.0*255", value="000028", unit="W"
+    )
+    assert parse_data_set(2, b"1-0:16.7.0*255(000028*W)") == DataSet(
+        timestamp=2, address="1-0:16.7.0*255", value="000028", unit="W"
+    )
+    assert (cache.statistics.hits, cache.statistics.misses) == (1, 1)
+
+
+def test_cached_data_set_parser_reuses_the_fields_of_identical_lines():
+    cache = BoundedCache(maximum_size=64)
+    parse_data_set = cache_data_set_parser(DataSet.from_bytes, cache)
+
+    data_set = parse_data_set(1, b"1-0:16.7.0*255(000028*W)")
+    repeated_data_set = parse_data_set(2, bytearray(b"1-0:16.7.0*255(000028*W)"))
+
+    assert (cache.statistics.hits, cache.statistics.misses) == (1, 1)
+    assert repeated_data_set.address is data_set.address
+    assert repeated_data_set.value is data_set.value
+
+
+def test_cached_obis_data_block_reuses_the_values_of_identical_lines():
+    cache = BoundedCache(maximum_size=64)
+    obis_data_blocks = [
+        ObisDataBlock.from_iec_62056_21_data_block(
+            obis_data_set_configs=obis_data_set_configs,
+            data_block=DataBlock.from_bytes(
+                timestamp=timestamp, data=sample_logarex_data_block
+            ),
+            cache=cache,
+        )
+        for timestamp in range(2)
+    ]
+
+    for data_set, repeated_data_set in zip(
+        obis_data_blocks[0].data_sets, obis_data_blocks[1].data_sets
+    ):
+        assert repeated_data_set.id is data_set.id
+        assert repeated_data_set.value is data_set.value
+        assert repeated_data_set.timestamp == 1
+
+
+def test_cache_evicts_the_least_recently_used_entry():
+    cache = BoundedCache(maximum_size=2)
+    parse_data_set = cache_data_set_parser(DataSet.from_bytes, cache)
+
+    parse_data_set(0, b"1.1(1)")
+    parse_data_set(0, b"1.2(2)")
+    parse_data_set(0, b"1.1(1)")
+    parse_data_set(0, b"1.3(3)")
+
+    assert list(cache.entries) == [b"1.1(1)", b"1.3(3)"]
+    assert cache.statistics.evictions == 1
+
+
+def test_unverified_block_drops_values_that_fail_to_convert():
+    data_block = DataBlock(
+        manufacturer_identification="LOG",
+        data_lines=[
+            DataSet(timestamp=0, address="1-0:96.1.0*255", value="1LOG", unit=None),
+            DataSet(timestamp=0, address="1-0:1.8.0*255", value="12u45.6", unit="kWh"),
+        ],
+        status=DataBlockStatus.UNVERIFIED,
+    )
+
+    obis_data_block = ObisDataBlock.from_iec_62056_21_data_block(
+        obis_data_set_configs=obis_data_set_configs, data_block=data_block
+    )
+
+    assert [data_set.id for data_set in obis_data_block.data_sets] == [
+        (1, 0, 96, 1, 0, 255)
+    ]
+    assert obis_data_block.status == DataBlockStatus.UNVERIFIED
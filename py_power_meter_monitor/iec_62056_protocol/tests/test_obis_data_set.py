@@ -5,6 +5,7 @@ from ..obis_data_set import (
     ObisFloatDataSet,
     ObisIntegerDataSet,
     ObisStringDataSet,
+    format_obis_id,
     parse_obis_id_from_address,
 )
 
@@ -13,6 +14,13 @@ def test_parse_obis_id_from_address():
     assert parse_obis_id_from_address("1-0:96.1.0*255") == (1, 0, 96, 1, 0, 255)
 
 
+@pytest.mark.parametrize(
+    "obis_id", [(1, 0, 96, 1, 0, 255), (1, 1, 0, 1, 0), (0, 0, 96, 97)]
+)
+def test_format_obis_id(obis_id):
+    assert parse_obis_id_from_address(format_obis_id(obis_id)) == obis_id
+
+
 def test_parse_obis_integer_data_set():
     obis_data_set = ObisIntegerDataSet.from_iec_62056_21_data_set(
         DataSet(timestamp=0, address="1-0:16.7.0*255", value="000028", unit="W")
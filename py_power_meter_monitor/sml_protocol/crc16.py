@@ -0,0 +1,34 @@
+from typing import Union
+
+ByteString = Union[bytes, bytearray, memoryview]
+
+# CRC-16/X-25 as used by the SML transport protocol
+crc16_polynomial = 0x8408
+crc16_initial_value = 0xFFFF
+
+
+def get_crc16_table_entry(byte: int) -> int:
+    crc = byte
+
+    for _ in range(8):
+        crc = (crc >> 1) ^ crc16_polynomial if crc & 1 else crc >> 1
+
+    return crc
+
+
+crc16_table = tuple(get_crc16_table_entry(byte) for byte in range(256))
+
+
+def update_crc16(crc: int, data: ByteString) -> int:
+    for byte in data:
+        crc = (crc >> 8) ^ crc16_table[(crc ^ byte) & 0xFF]
+
+    return crc
+
+
+def finish_crc16(crc: int) -> int:
+    return crc ^ 0xFFFF
+
+
+def get_crc16(data: ByteString) -> int:
+    return finish_crc16(update_crc16(crc16_initial_value, data))
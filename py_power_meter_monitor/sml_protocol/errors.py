@@ -0,0 +1,13 @@
+class SmlProtocolError(Exception):
+    pass
+
+
+class SmlParsingError(SmlProtocolError):
+    def __init__(self, message: str, frame: bytes):
+        super().__init__(message, frame)
+
+        self.frame = frame
+
+
+class SmlChecksumError(SmlParsingError):
+    pass
@@ -0,0 +1,115 @@
+from typing import Optional
+
+from .crc16 import ByteString, crc16_initial_value, finish_crc16, update_crc16
+from .errors import SmlChecksumError, SmlParsingError
+
+escape_sequence = b"\x1b\x1b\x1b\x1b"
+start_sequence = b"\x01\x01\x01\x01"
+end_marker = 0x1A
+
+# the transport protocol escapes sequences on boundaries of four bytes
+word_size = 4
+
+
+class SmlFrameDecoder:
+    def __init__(self):
+        self.buffer = bytearray()
+        self.payload = bytearray()
+        self.reset()
+
+    def reset(self):
+        self.buffer.clear()
+        self.reset_frame()
+
+    def reset_frame(self):
+        self.frame_started = False
+        self.payload.clear()
+        self.crc = crc16_initial_value
+
+    def feed(self, data: ByteString):
+        self.buffer += data
+
+    def decode(self) -> Optional[bytes]:
+        if not self.frame_started and not self.find_frame_start():
+            return None
+
+        # the buffer always starts at a word boundary of the current frame, and
+        # every consumed byte is checksummed exactly once
+        search_position = 0
+
+        while (escape_start := self.buffer.find(escape_sequence, search_position)) >= 0:
+            if escape_start % word_size:
+                search_position = escape_start + 1
+                continue
+
+            self.consume_payload(escape_start)
+            search_position = 0
+
+            if len(self.buffer) < 2 * word_size:
+                return None
+
+            escaped_word = bytes(self.buffer[word_size : 2 * word_size])
+
+            if escaped_word == escape_sequence:
+                # an escape sequence within the payload is sent twice
+                self.consume_escape_sequence(2 * word_size)
+                self.payload += escape_sequence
+            elif escaped_word[0] == end_marker:
+                return self.finish_frame(escaped_word)
+            elif escaped_word == start_sequence:
+                # the previous frame has been interrupted by a new one
+                self.reset_frame()
+                return self.decode()
+            else:
+                frame = bytes(self.payload)
+                del self.buffer[: 2 * word_size]
+                self.reset_frame()
+                raise SmlParsingError(
+                    f"Invalid escape sequence {escaped_word.hex()}", frame
+                )
+
+        self.consume_payload(len(self.buffer) - len(self.buffer) % word_size)
+
+        return None
+
+    def find_frame_start(self) -> bool:
+        frame_start = self.buffer.find(escape_sequence + start_sequence)
+
+        if frame_start < 0:
+            # keep what could be the beginning of a start sequence
+            del self.buffer[: max(0, len(self.buffer) - 2 * word_size + 1)]
+            return False
+
+        del self.buffer[:frame_start]
+        self.consume_escape_sequence(2 * word_size)
+        self.frame_started = True
+
+        return True
+
+    def consume_payload(self, end: int):
+        with memoryview(self.buffer) as buffer_view:
+            with buffer_view[:end] as payload:
+                self.crc = update_crc16(self.crc, payload)
+                self.payload += payload
+
+        del self.buffer[:end]
+
+    def consume_escape_sequence(self, end: int):
+        with memoryview(self.buffer) as buffer_view:
+            with buffer_view[:end] as escape:
+                self.crc = update_crc16(self.crc, escape)
+
+        del self.buffer[:end]
+
+    def finish_frame(self, end_word: bytes) -> bytes:
+        # the checksum covers the frame up to the number of padding bytes
+        crc = finish_crc16(update_crc16(self.crc, self.buffer[: word_size + 2]))
+        padding_length = end_word[1]
+        payload = bytes(self.payload[: len(self.payload) - padding_length])
+        del self.buffer[: 2 * word_size]
+        self.reset_frame()
+
+        if crc != int.from_bytes(end_word[2:], "little"):
+            raise SmlChecksumError("Invalid frame checksum", payload)
+
+        return payload
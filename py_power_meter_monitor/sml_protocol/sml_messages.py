@@ -0,0 +1,166 @@
+from decimal import Decimal
+from typing import Optional, Union, cast
+
+from ..iec_62056_protocol.data_block import DataBlock, DataSet
+from ..iec_62056_protocol.obis_data_set import ObisId, format_obis_id
+from .errors import SmlParsingError
+
+SmlValue = Union[None, bool, int, bytes, list["SmlValue"]]
+
+sml_octet_string_type = 0x00
+sml_boolean_type = 0x40
+sml_signed_integer_type = 0x50
+sml_unsigned_integer_type = 0x60
+sml_list_type = 0x70
+
+sml_get_list_response_tag = 0x0701
+
+# the DLMS unit codes of common meter readings
+sml_units: dict[int, str] = {
+    8: "deg",
+    9: "°C",
+    13: "m3",
+    27: "W",
+    28: "VA",
+    29: "var",
+    30: "Wh",
+    31: "VAh",
+    32: "varh",
+    33: "A",
+    34: "C",
+    35: "V",
+    44: "Hz",
+}
+
+
+def parse_sml_values(payload: bytes) -> list[SmlValue]:
+    values: list[SmlValue] = []
+    position = 0
+
+    try:
+        while position < len(payload):
+            (value, position) = parse_sml_value(payload, position)
+            values.append(value)
+    except IndexError as error:
+        raise SmlParsingError("Unexpected end of payload", payload) from error
+
+    return values
+
+
+def parse_sml_value(payload: bytes, position: int) -> tuple[SmlValue, int]:
+    type_length = payload[position]
+
+    # the end of a message or an omitted optional value
+    if type_length == 0x00 or type_length == 0x01:
+        return (None, position + 1)
+
+    value_type = type_length & 0x70
+    length = type_length & 0x0F
+    header_length = 1
+
+    while type_length & 0x80:
+        type_length = payload[position + header_length]
+        length = length << 4 | type_length & 0x0F
+        header_length += 1
+
+    if value_type == sml_list_type:
+        # the length of a list is the number of its elements
+        elements: list[SmlValue] = []
+        position += header_length
+
+        for _ in range(length):
+            (element, position) = parse_sml_value(payload, position)
+            elements.append(element)
+
+        return (elements, position)
+
+    end = position + length
+
+    if length < header_length or end > len(payload):
+        raise SmlParsingError(f"Invalid length at position {position}", payload)
+
+    data = payload[position + header_length : end]
+
+    if value_type == sml_octet_string_type:
+        return (data, end)
+    elif value_type == sml_boolean_type:
+        return (any(data), end)
+    elif value_type == sml_signed_integer_type:
+        return (int.from_bytes(data, "big", signed=True), end)
+    elif value_type == sml_unsigned_integer_type:
+        return (int.from_bytes(data, "big"), end)
+    else:
+        raise SmlParsingError(f"Unknown type at position {position}", payload)
+
+
+def get_sml_data_block(timestamp: float, payload: bytes) -> DataBlock:
+    server_id: Optional[bytes] = None
+    data_sets: list[DataSet] = []
+
+    for message in parse_sml_values(payload):
+        if not isinstance(message, list) or len(message) < 4:
+            continue
+
+        message_body = message[3]
+
+        if (
+            not isinstance(message_body, list)
+            or len(message_body) != 2
+            or message_body[0] != sml_get_list_response_tag
+            or not isinstance(message_body[1], list)
+            or len(message_body[1]) < 5
+        ):
+            continue
+
+        # clientId, serverId, listName, actSensorTime, valList, ...
+        get_list_response = message_body[1]
+
+        if isinstance(get_list_response[1], bytes):
+            server_id = get_list_response[1]
+
+        for list_entry in cast(list[SmlValue], get_list_response[4] or []):
+            data_set = get_sml_data_set(timestamp, list_entry)
+
+            if data_set is not None:
+                data_sets.append(data_set)
+
+    return DataBlock(
+        manufacturer_identification=server_id.hex() if server_id else "",
+        data_lines=data_sets,
+    )
+
+
+def get_sml_data_set(timestamp: float, list_entry: SmlValue) -> Optional[DataSet]:
+    # objName, status, valTime, unit, scaler, value, valueSignature
+    if not isinstance(list_entry, list) or len(list_entry) < 6:
+        return None
+
+    (object_name, _, _, unit, scaler, value) = list_entry[:6]
+
+    if not isinstance(object_name, bytes) or len(object_name) != 6:
+        return None
+
+    return DataSet(
+        timestamp=timestamp,
+        address=format_obis_id(cast(ObisId, tuple(object_name))),
+        value=format_sml_value(value, scaler if isinstance(scaler, int) else 0),
+        unit=sml_units.get(unit) if isinstance(unit, int) else None,
+    )
+
+
+def format_sml_value(value: SmlValue, scaler: int) -> Optional[str]:
+    if isinstance(value, bool):
+        return str(int(value))
+    elif isinstance(value, int):
+        # scale without the rounding errors of binary floats
+        return (
+            str(Decimal(value).scaleb(scaler))
+            if scaler < 0
+            else str(value * 10**scaler)
+        )
+    elif isinstance(value, bytes):
+        # e.g. manufacturer ids are text, but device ids are binary
+        text = value.decode("iso-8859-1")
+        return text if text.isprintable() else value.hex()
+    else:
+        return None
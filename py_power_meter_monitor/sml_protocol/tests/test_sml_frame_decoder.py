@@ -0,0 +1,110 @@
+from hypothesis import given, strategies as st
+from pytest import raises
+
+from ...iec_62056_protocol.data_block import DataSet
+from ..crc16 import get_crc16
+from ..errors import SmlChecksumError
+from ..sml_frame_decoder import SmlFrameDecoder
+from ..sml_messages import get_sml_data_block, parse_sml_values
+
+
+def encode_sml_value(value) -> bytes:
+    if value is None:
+        return b"\x01"
+    elif isinstance(value, list):
+        return bytes([0x70 | len(value)]) + b"".join(map(encode_sml_value, value))
+    elif isinstance(value, bytes):
+        return bytes([len(value) + 1]) + value
+    elif value < 0:
+        return b"\x53" + value.to_bytes(2, "big", signed=True)
+    else:
+        return b"\x65" + value.to_bytes(4, "big")
+
+
+def encode_sml_message(body_tag: int, body) -> bytes:
+    # transactionId, groupNo, abortOnError, messageBody, crc16, endOfSmlMsg
+    return (
+        b"\x76"
+        + encode_sml_value(b"\x00\x01")
+        + b"\x62\x00\x62\x00"
+        + encode_sml_value([body_tag, body])
+        + b"\x63\x00\x00\x00"
+    )
+
+
+def encode_sml_frame(payload: bytes) -> bytes:
+    padding_length = -len(payload) % 4
+    padded_payload = payload + b"\x00" * padding_length
+    # escape sequences are only recognized on word boundaries
+    words = [
+        padded_payload[index : index + 4] for index in range(0, len(padded_payload), 4)
+    ]
+    frame = (
+        b"\x1b\x1b\x1b\x1b\x01\x01\x01\x01"
+        + b"".join(word * 2 if word == b"\x1b\x1b\x1b\x1b" else word for word in words)
+        + b"\x1b\x1b\x1b\x1b\x1a"
+        + bytes([padding_length])
+    )
+    return frame + get_crc16(frame).to_bytes(2, "little")
+
+
+sample_sml_payload = encode_sml_message(0x0101, [None, None, b"\x01", b"\x02"])
+sample_sml_payload += encode_sml_message(
+    0x0701,
+    [
+        None,
+        b"\x0a\x01\x49\x53\x4b",
+        None,
+        None,
+        [
+            [b"\x01\x00\x01\x08\x00\xff", None, None, 30, -1, 123456789],
+            [b"\x01\x00\x10\x07\x00\xff", None, None, 27, 0, -42],
+            [b"\x01\x00\x60\x01\x00\xff", None, None, None, None, b"\x1b" * 7],
+        ],
+        None,
+        None,
+    ],
+)
+sample_sml_frame = encode_sml_frame(sample_sml_payload)
+
+
+@given(st.lists(st.integers(min_value=1, max_value=len(sample_sml_frame) - 1)))
+def test_decode_sml_frame_fed_in_chunks(split_positions: list[int]):
+    assert b"\x1b" * 8 in sample_sml_frame
+    positions = [0, *sorted(split_positions), len(sample_sml_frame)]
+    decoder = SmlFrameDecoder()
+    decoder.feed(b"\x00\x1b\x1b")
+    payloads = []
+
+    for start, end in zip(positions, positions[1:]):
+        decoder.feed(sample_sml_frame[start:end])
+
+        if (payload := decoder.decode()) is not None:
+            payloads.append(payload)
+
+    # the payload is padded to a multiple of four bytes
+    assert payloads == [sample_sml_payload]
+
+
+def test_decode_sml_frame_with_invalid_checksum_raises():
+    decoder = SmlFrameDecoder()
+    decoder.feed(sample_sml_frame[:-1] + bytes([sample_sml_frame[-1] ^ 0xFF]))
+
+    with raises(SmlChecksumError):
+        decoder.decode()
+
+    decoder.feed(sample_sml_frame)
+    assert decoder.decode() == sample_sml_payload
+
+
+def test_get_sml_data_block():
+    assert len(parse_sml_values(sample_sml_payload)) == 2
+
+    data_block = get_sml_data_block(timestamp=0, payload=sample_sml_payload)
+
+    assert data_block.manufacturer_identification == "0a0149534b"
+    assert data_block.data_lines == [
+        DataSet(timestamp=0, address="1-0:1.8.0*255", value="12345678.9", unit="Wh"),
+        DataSet(timestamp=0, address="1-0:16.7.0*255", value="-42", unit="W"),
+        DataSet(timestamp=0, address="1-0:96.1.0*255", value="1b" * 7, unit=None),
+    ]
@@ -0,0 +1,57 @@
+from ..config import load_configuration_from_text
+
+
+def test_single_meter_configuration():
+    configuration = load_configuration_from_text(
+        """
+[serial_port]
+port_url = "/dev/ttyUSB1"
+
+[mqtt.device]
+id = "meter-1"
+name = "Meter 1"
+
+[[obis.data_sets]]
+id = [1, 0, 1, 8, 0, 255]
+name = "Energy"
+value_type = "float"
+"""
+    )
+
+    (meter_config,) = configuration.meter_configs
+
+    assert meter_config.serial_port.port_url == "/dev/ttyUSB1"
+    assert meter_config.device.id == "meter-1"
+    assert [data_set.id for data_set in meter_config.obis.data_sets] == [
+        (1, 0, 1, 8, 0, 255)
+    ]
+
+
+def test_multiple_meter_configuration():
+    configuration = load_configuration_from_text(
+        """
+[serial_port]
+port_url = "/dev/ttyUSB9"
+
+[[meters]]
+serial_port = { port_url = "/dev/ttyUSB0" }
+device = { id = "heat-pump", name = "Heat Pump" }
+
+[[meters]]
+serial_port = { port_url = "/dev/ttyUSB1", baud_rate = 9600 }
+device = { id = "household", name = "Household" }
+"""
+    )
+
+    meter_configs = configuration.meter_configs
+
+    # the top-level serial port only describes a meter without a `meters` list
+    assert [meter_config.serial_port.port_url for meter_config in meter_configs] == [
+        "/dev/ttyUSB0",
+        "/dev/ttyUSB1",
+    ]
+    assert [meter_config.device.id for meter_config in meter_configs] == [
+        "heat-pump",
+        "household",
+    ]
+    assert meter_configs[1].serial_port.baud_rate == 9600
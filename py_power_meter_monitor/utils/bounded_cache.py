@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Optional, TypeVar
+
+CacheKey = TypeVar("CacheKey", bound=Hashable)
+CacheValue = TypeVar("CacheValue")
+
+
+class CacheStatistics:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def add(self, statistics: "CacheStatistics"):
+        self.hits += statistics.hits
+        self.misses += statistics.misses
+        self.evictions += statistics.evictions
+
+    def take(self) -> "CacheStatistics":
+        # the cache keeps counting into this instance, so it's reset in place
+        statistics = CacheStatistics()
+        statistics.add(self)
+        self.hits = self.misses = self.evictions = 0
+
+        return statistics
+
+    def get_summary(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / (self.hits + self.misses)
+            if self.hits + self.misses
+            else None,
+        }
+
+
+class BoundedCache(Generic[CacheKey, CacheValue]):
+    def __init__(self, maximum_size: int, statistics: Optional[CacheStatistics] = None):
+        self.maximum_size = maximum_size
+        self.entries: "OrderedDict[CacheKey, CacheValue]" = OrderedDict()
+        # kept apart from the entries, so that they can be reported elsewhere
+        self.statistics = statistics or CacheStatistics()
+
+    def get_or_compute(
+        self, key: CacheKey, compute: Callable[[CacheKey], CacheValue]
+    ) -> CacheValue:
+        try:
+            value = self.entries[key]
+        except KeyError:
+            pass
+        else:
+            self.statistics.hits += 1
+            self.entries.move_to_end(key)
+            return value
+
+        self.statistics.misses += 1
+        # failures are not cached, so that they are raised again on every attempt
+        value = compute(key)
+        self.entries[key] = value
+
+        if len(self.entries) > self.maximum_size:
+            # evict the least recently used entry
+            self.entries.popitem(last=False)
+            self.statistics.evictions += 1
+
+        return value
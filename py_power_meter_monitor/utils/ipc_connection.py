@@ -0,0 +1,32 @@
+import asyncio
+from multiprocessing.connection import Connection
+from typing import Any, AsyncIterator
+
+
+async def iterate_connection_messages(connection: Connection) -> AsyncIterator[Any]:
+    loop = asyncio.get_running_loop()
+    readable = asyncio.Event()
+
+    loop.add_reader(connection.fileno(), readable.set)
+
+    try:
+        while True:
+            await readable.wait()
+            readable.clear()
+
+            # raises an EOFError once the sending end has been closed
+            while connection.poll():
+                yield connection.recv()
+    finally:
+        loop.remove_reader(connection.fileno())
+
+
+async def send_connection_messages(
+    connection: Connection, messages: "asyncio.Queue[Any]"
+):
+    loop = asyncio.get_running_loop()
+
+    while True:
+        message = await messages.get()
+        # sending blocks while the pipe is full, which must not stall the loop
+        await loop.run_in_executor(None, connection.send, message)
@@ -0,0 +1,35 @@
+import asyncio
+from typing import Optional
+
+from .serial_stream import SerialStream
+
+
+class MemorySerialStream(SerialStream):
+    # connects the monitor to a meter simulated in the same process, the data
+    # written by either side is fed into the reader of the other one
+    def __init__(self):
+        self.reader = asyncio.StreamReader()
+        self.meter_reader = asyncio.StreamReader()
+        self.capture = None
+        self.baud_rate: Optional[int] = None
+        self.closed = False
+
+    async def write(self, data: bytes):
+        if not self.closed:
+            self.meter_reader.feed_data(data)
+
+    async def send_from_meter(self, data: bytes):
+        if not self.closed:
+            self.reader.feed_data(data)
+
+    async def switch_baud_rate(self, baud_rate: int):
+        # the simulated meter paces its own transmissions
+        self.baud_rate = baud_rate
+
+    def close(self):
+        if self.closed:
+            return
+
+        self.closed = True
+        self.reader.feed_eof()
+        self.meter_reader.feed_eof()
@@ -0,0 +1,85 @@
+# pyright: reportUnknownMemberType=false
+import asyncio
+from logging import getLogger
+from time import monotonic
+from typing import Union, cast
+
+import asyncio_mqtt  # type: ignore
+
+logger = getLogger(__package__)
+
+
+class PipelinedPublisher:
+    def __init__(self, mqtt_client: asyncio_mqtt.Client, maximum_in_flight: int):
+        self.mqtt_client = mqtt_client
+        self.in_flight_slots = asyncio.Semaphore(maximum_in_flight)
+        self.in_flight: set["asyncio.Task[None]"] = set()
+        # kept until the next flush, so that no failed publish goes unnoticed
+        self.failures: list[BaseException] = []
+        self.published_count = 0
+        self.total_latency = 0.0
+        self.maximum_latency = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        if self.published_count == 0:
+            return 0.0
+
+        return self.total_latency / self.published_count
+
+    async def publish(self, topic: str, payload: Union[bytes, str], retain: bool):
+        # only waits when the window is full, so that the messages of a block
+        # are handed to the client back to back and flushed together
+        await self.in_flight_slots.acquire()
+
+        # tasks start in creation order, so the client receives the messages
+        # (and preserves the order per topic) in the order they were published
+        task = asyncio.create_task(
+            self.publish_and_measure(topic=topic, payload=payload, retain=retain)
+        )
+        self.in_flight.add(task)
+        task.add_done_callback(self.complete_publish)
+
+    def complete_publish(self, task: "asyncio.Task[None]"):
+        self.in_flight.discard(task)
+
+        if not task.cancelled() and task.exception() is not None:
+            self.failures.append(cast(BaseException, task.exception()))
+
+    async def flush(self):
+        # unlike `gather`, `wait` doesn't cancel the publishes when cancelled
+        if self.in_flight:
+            await asyncio.wait(set(self.in_flight))
+
+        if self.failures:
+            failures = self.failures
+            self.failures = []
+
+            if len(failures) > 1:
+                logger.error(f"{len(failures)} publishes failed")
+
+            raise failures[0]
+
+    async def drain(self):
+        # unlike `flush`, only logs failures, so that it can run on shutdown
+        if self.in_flight:
+            await asyncio.wait(set(self.in_flight))
+
+        if self.failures:
+            logger.error(f"{len(self.failures)} publishes failed on shutdown")
+            self.failures = []
+
+    async def publish_and_measure(
+        self, topic: str, payload: Union[bytes, str], retain: bool
+    ):
+        start_time = monotonic()
+
+        try:
+            await self.mqtt_client.publish(topic=topic, payload=payload, retain=retain)
+        finally:
+            self.in_flight_slots.release()
+
+        latency = monotonic() - start_time
+        self.published_count += 1
+        self.total_latency += latency
+        self.maximum_latency = max(self.maximum_latency, latency)
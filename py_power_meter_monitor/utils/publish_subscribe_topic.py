@@ -1,28 +1,119 @@
-from asyncio import gather, Queue
-from typing import Generic, Set, TypeVar
+from asyncio import Event
+from enum import Enum
+from logging import getLogger
+from typing import Any, Generic, TypeVar
 
 
+logger = getLogger(__package__)
+
 PublishSubscribeMessage = TypeVar("PublishSubscribeMessage")
 
 
+class OverflowPolicy(Enum):
+    # `put` waits until the subscriber has caught up
+    BLOCK = "block"
+    # the oldest messages not yet received by the subscriber are skipped
+    DROP_OLDEST = "drop_oldest"
+    # the subscriber only receives the most recent message
+    LATEST = "latest"
+
+
+class PublishSubscribeCursor:
+    def __init__(self, position: int, overflow_policy: OverflowPolicy):
+        # the sequence number of the next message to receive
+        self.position = position
+        self.overflow_policy = overflow_policy
+        self.dropped_count = 0
+        self.message_available = Event()
+
+
 class PublishSubscribeTopic(Generic[PublishSubscribeMessage]):
-    def __init__(self):
-        self.queues = set()  # type: Set[Queue[PublishSubscribeMessage]]
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        # the stored form of each message, see `pack_message`
+        self.messages: list[Any] = [None] * capacity
+        # the sequence number of the next message to publish
+        self.head = 0
+        self.cursors: set[PublishSubscribeCursor] = set()
+        self.messages_consumed = Event()
+
+    @property
+    def depth(self) -> int:
+        return max((self.get_depth(cursor) for cursor in self.cursors), default=0)
+
+    @property
+    def dropped_count(self) -> int:
+        return sum(cursor.dropped_count for cursor in self.cursors)
+
+    def get_depth(self, cursor: PublishSubscribeCursor) -> int:
+        return min(self.head - cursor.position, self.capacity)
+
+    def pack_message(self, message: PublishSubscribeMessage) -> Any:
+        # subclasses may keep messages in a more compact form until received
+        return message
+
+    def unpack_message(self, packed_message: Any) -> PublishSubscribeMessage:
+        return packed_message
 
     def publish(self, message: PublishSubscribeMessage):
-        for queue in self.queues:
-            queue.put_nowait(message)
+        # never waits, so subscribers that fall behind by more than the
+        # capacity miss the oldest messages regardless of their policy
+        self.messages[self.head % self.capacity] = self.pack_message(message)
+        self.head += 1
+
+        for cursor in self.cursors:
+            cursor.message_available.set()
+
+    async def put(self, message: PublishSubscribeMessage):
+        while any(
+            cursor.overflow_policy == OverflowPolicy.BLOCK
+            and self.get_depth(cursor) >= self.capacity
+            for cursor in self.cursors
+        ):
+            self.messages_consumed.clear()
+            await self.messages_consumed.wait()
+
+        self.publish(message)
 
     async def join(self):
-        await gather(*[queue.join() for queue in self.queues])
+        while any(self.get_depth(cursor) > 0 for cursor in self.cursors):
+            self.messages_consumed.clear()
+            await self.messages_consumed.wait()
 
-    async def items(self):
-        queue: Queue[PublishSubscribeMessage] = Queue()
-        self.queues.add(queue)
+    async def items(self, overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST):
+        cursor = PublishSubscribeCursor(self.head, overflow_policy)
+        self.cursors.add(cursor)
 
         try:
             while True:
-                yield await queue.get()
-                queue.task_done()
+                while cursor.position == self.head:
+                    cursor.message_available.clear()
+                    await cursor.message_available.wait()
+
+                self.skip_overflowed_messages(cursor)
+
+                yield self.unpack_message(
+                    self.messages[cursor.position % self.capacity]
+                )
+
+                cursor.position += 1
+                self.messages_consumed.set()
         finally:
-            self.queues.remove(queue)
+            self.cursors.remove(cursor)
+
+    def skip_overflowed_messages(self, cursor: PublishSubscribeCursor):
+        if cursor.overflow_policy == OverflowPolicy.LATEST:
+            oldest_position = self.head - 1
+        else:
+            oldest_position = self.head - self.capacity
+
+        if cursor.position < oldest_position:
+            skipped_count = oldest_position - cursor.position
+            cursor.dropped_count += skipped_count
+            cursor.position = oldest_position
+
+            if cursor.overflow_policy != OverflowPolicy.LATEST:
+                logger.warning(
+                    f"A subscriber fell behind and skipped {skipped_count} messages "
+                    f"({cursor.dropped_count} in total)"
+                )
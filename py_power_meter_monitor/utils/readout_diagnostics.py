@@ -0,0 +1,182 @@
+from bisect import bisect_left
+from enum import Enum
+from math import ceil
+from typing import Any, Optional
+
+from .bounded_cache import CacheStatistics
+
+# bucket bounds from a millisecond to about four minutes, growing by a factor
+# of the square root of two
+latency_histogram_bounds = tuple(0.001 * 2 ** (index / 2) for index in range(36))
+
+
+class ReadoutPhase(Enum):
+    # waiting for the identification after the request
+    SIGN_ON = "sign_on"
+    # the pauses after sending a message
+    RESPONSE_DELAY = "response_delay"
+    # receiving any other message, e.g. the data after the speed change
+    TRANSFER = "transfer"
+    # parsing a received frame
+    PARSE = "parse"
+    # from the start of a readout to its data block
+    READOUT = "readout"
+    # handing the messages of a data block to the MQTT client
+    PUBLISH = "publish"
+
+
+class ReadoutErrorKind(Enum):
+    PARSING = "parsing"
+    TIMEOUT = "timeout"
+    BLOCK_CHECK_CHARACTER = "block_check_character"
+
+
+class DecodeCacheKind(Enum):
+    # the fields of received data lines
+    DATA_SET = "data_set"
+    # the OBIS data sets decoded from those fields
+    OBIS_DATA_SET = "obis_data_set"
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.bucket_counts = [0] * (len(latency_histogram_bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    @property
+    def mean(self) -> float:
+        if self.count == 0:
+            return 0.0
+
+        return self.total / self.count
+
+    def record(self, duration: float):
+        self.bucket_counts[bisect_left(latency_histogram_bounds, duration)] += 1
+        self.count += 1
+        self.total += duration
+        self.maximum = max(self.maximum, duration)
+
+    def add(self, histogram: "LatencyHistogram"):
+        for index, bucket_count in enumerate(histogram.bucket_counts):
+            self.bucket_counts[index] += bucket_count
+
+        self.count += histogram.count
+        self.total += histogram.total
+        self.maximum = max(self.maximum, histogram.maximum)
+
+    def get_percentile(self, fraction: float) -> float:
+        # the upper bound of the bucket containing the nearest rank
+        rank = max(1, ceil(fraction * self.count))
+        cumulative_count = 0
+
+        for bound, bucket_count in zip(latency_histogram_bounds, self.bucket_counts):
+            cumulative_count += bucket_count
+
+            if cumulative_count >= rank:
+                return min(bound, self.maximum)
+
+        return self.maximum
+
+    def get_summary(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "median": self.get_percentile(0.5),
+            "p95": self.get_percentile(0.95),
+            "maximum": self.maximum,
+        }
+
+
+class ReadoutDiagnostics:
+    def __init__(self):
+        self.phase_histograms = {phase: LatencyHistogram() for phase in ReadoutPhase}
+        self.error_counts = {error_kind: 0 for error_kind in ReadoutErrorKind}
+        self.received_byte_count = 0
+        # the bytes per second of the last transfer
+        self.transfer_rate: Optional[float] = None
+        # the data blocks skipped by sinks that fell behind
+        self.dropped_data_block_count = 0
+        self.decode_cache_statistics = {
+            cache_kind: CacheStatistics() for cache_kind in DecodeCacheKind
+        }
+
+    def record_phase(self, phase: ReadoutPhase, duration: float):
+        self.phase_histograms[phase].record(duration)
+
+    def record_error(self, error_kind: ReadoutErrorKind):
+        self.error_counts[error_kind] += 1
+
+    def record_transfer(self, byte_count: int, duration: float):
+        self.received_byte_count += byte_count
+
+        if duration > 0:
+            self.transfer_rate = byte_count / duration
+
+    def take_reader_measurements(self) -> "ReadoutDiagnostics":
+        # hands out what has been measured since the last call and starts over,
+        # so that a worker process only sends the changes to the supervisor
+        measurements = ReadoutDiagnostics()
+        measurements.phase_histograms = {
+            phase: histogram
+            for phase, histogram in self.phase_histograms.items()
+            if histogram.count
+        }
+        measurements.error_counts = {
+            error_kind: error_count
+            for error_kind, error_count in self.error_counts.items()
+            if error_count
+        }
+        measurements.received_byte_count = self.received_byte_count
+        measurements.transfer_rate = self.transfer_rate
+        measurements.decode_cache_statistics = {
+            cache_kind: statistics.take()
+            for cache_kind, statistics in self.decode_cache_statistics.items()
+        }
+
+        for phase in measurements.phase_histograms:
+            self.phase_histograms[phase] = LatencyHistogram()
+
+        self.error_counts = {error_kind: 0 for error_kind in ReadoutErrorKind}
+        self.received_byte_count = 0
+        self.transfer_rate = None
+
+        return measurements
+
+    def add_reader_measurements(self, measurements: "ReadoutDiagnostics"):
+        # the reader of a worker process measures everything but the publishing
+        for phase, histogram in measurements.phase_histograms.items():
+            self.phase_histograms[phase].add(histogram)
+
+        for error_kind, error_count in measurements.error_counts.items():
+            self.error_counts[error_kind] += error_count
+
+        self.received_byte_count += measurements.received_byte_count
+
+        if measurements.transfer_rate is not None:
+            self.transfer_rate = measurements.transfer_rate
+
+        for cache_kind, statistics in measurements.decode_cache_statistics.items():
+            self.decode_cache_statistics[cache_kind].add(statistics)
+
+    def get_summary(self) -> dict[str, Any]:
+        return {
+            "phases": {
+                phase.value: histogram.get_summary()
+                for phase, histogram in self.phase_histograms.items()
+                if histogram.count
+            },
+            "errors": {
+                error_kind.value: error_count
+                for error_kind, error_count in self.error_counts.items()
+            },
+            "decode_caches": {
+                cache_kind.value: statistics.get_summary()
+                for cache_kind, statistics in self.decode_cache_statistics.items()
+                if statistics.hits or statistics.misses
+            },
+            "dropped_data_blocks": self.dropped_data_block_count,
+            "received_bytes": self.received_byte_count,
+            "transfer_rate": self.transfer_rate,
+        }
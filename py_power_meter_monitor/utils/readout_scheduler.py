@@ -0,0 +1,68 @@
+import asyncio
+from enum import Enum
+from logging import getLogger
+from math import floor
+from time import monotonic, time
+from typing import Optional
+
+logger = getLogger(__package__)
+
+
+class ReadoutSchedule(Enum):
+    # wait for the interval after each readout
+    DELAY = "delay"
+    # start readouts on multiples of the interval since the epoch
+    ALIGNED = "aligned"
+    # start the next readout as soon as the previous one has finished
+    CONTINUOUS = "continuous"
+
+
+class ReadoutScheduler:
+    def __init__(self, schedule: ReadoutSchedule, interval: float):
+        if schedule == ReadoutSchedule.ALIGNED and interval <= 0:
+            raise ValueError("Aligned readouts require a positive interval.")
+
+        self.schedule = schedule
+        self.interval = interval
+        self.last_slot: Optional[float] = None
+        self.skipped_slot_count = 0
+
+    async def wait_for_first_readout(self):
+        if self.schedule == ReadoutSchedule.ALIGNED:
+            await self.wait_for_next_slot()
+
+    async def wait_for_next_readout(self):
+        if self.schedule == ReadoutSchedule.ALIGNED:
+            await self.wait_for_next_slot()
+        elif self.schedule == ReadoutSchedule.CONTINUOUS:
+            # yield to the other tasks between readouts
+            await asyncio.sleep(0)
+        else:
+            await asyncio.sleep(self.interval)
+
+    async def wait_after_error(self):
+        # retrying continuously could flood a meter that keeps failing
+        if self.schedule == ReadoutSchedule.CONTINUOUS:
+            await asyncio.sleep(self.interval)
+        else:
+            await self.wait_for_next_readout()
+
+    async def wait_for_next_slot(self):
+        wall_clock_time = time()
+        # the next slot is derived from the current time, so slots that have
+        # passed during a long readout are skipped rather than caught up on
+        slot = (floor(wall_clock_time / self.interval) + 1) * self.interval
+        # the wall clock may be adjusted while waiting, the monotonic clock not
+        deadline = monotonic() + (slot - wall_clock_time)
+
+        if self.last_slot is not None:
+            skipped_slot_count = round((slot - self.last_slot) / self.interval) - 1
+
+            if skipped_slot_count > 0:
+                logger.debug(f"Skipped {skipped_slot_count} missed readout slots")
+                self.skipped_slot_count += skipped_slot_count
+
+        self.last_slot = slot
+
+        while (remaining_time := deadline - monotonic()) > 0:
+            await asyncio.sleep(remaining_time)
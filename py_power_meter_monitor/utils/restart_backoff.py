@@ -0,0 +1,20 @@
+class RestartBackoff:
+    # doubles the delay after each failure up to the maximum, and starts over
+    # once a run has lasted longer than the maximum delay
+    def __init__(self, initial_delay: float, maximum_delay: float):
+        self.initial_delay = initial_delay
+        self.maximum_delay = maximum_delay
+        self.consecutive_failure_count = 0
+        self.restart_count = 0
+
+    def get_delay(self, run_duration: float) -> float:
+        if run_duration > self.maximum_delay:
+            self.consecutive_failure_count = 0
+
+        delay = min(
+            self.initial_delay * 2**self.consecutive_failure_count, self.maximum_delay
+        )
+        self.consecutive_failure_count += 1
+        self.restart_count += 1
+
+        return delay
@@ -0,0 +1,129 @@
+import asyncio
+import os
+from types import TracebackType
+from typing import TYPE_CHECKING, Optional, Type
+
+import serial  # type: ignore
+
+if TYPE_CHECKING:
+    from .session_capture import SessionCaptureWriter
+
+serial_read_size = 4096
+
+
+class SerialStream:
+    def __init__(
+        self,
+        serial_port: serial.Serial,
+        capture: Optional["SessionCaptureWriter"] = None,
+    ):
+        self.serial_port = serial_port
+        self.capture = capture
+        self.loop = asyncio.get_running_loop()
+        self.reader = asyncio.StreamReader()
+        # pyserial opens the port in non-blocking mode, so the file descriptor can
+        # be watched by the event loop instead of polling it from a thread
+        self.file_descriptor: int = serial_port.fileno()
+        self.loop.add_reader(self.file_descriptor, self.read_available)
+
+        if capture is not None:
+            capture.record_baud_rate(serial_port.baudrate)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ):
+        self.close()
+
+    @property
+    def character_time(self) -> float:
+        bit_count = (
+            1
+            + self.serial_port.bytesize
+            + (self.serial_port.parity != serial.PARITY_NONE)
+            + self.serial_port.stopbits
+        )
+
+        return bit_count / self.serial_port.baudrate
+
+    def read_available(self):
+        try:
+            data = os.read(self.file_descriptor, serial_read_size)
+        except BlockingIOError:
+            return
+        except OSError as error:
+            self.loop.remove_reader(self.file_descriptor)
+            self.reader.set_exception(error)
+            return
+
+        if data:
+            if self.capture is not None:
+                self.capture.record_read(data)
+
+            self.reader.feed_data(data)
+        else:
+            # the device has been disconnected
+            self.loop.remove_reader(self.file_descriptor)
+            self.reader.feed_eof()
+
+    async def write(self, data: bytes):
+        if self.capture is not None:
+            self.capture.record_write(data)
+
+        remaining_data = memoryview(data)
+
+        while remaining_data:
+            try:
+                written_size = os.write(self.file_descriptor, remaining_data)
+            except BlockingIOError:
+                written_size = 0
+
+            remaining_data = remaining_data[written_size:]
+
+            if remaining_data:
+                await self.wait_writable()
+
+    async def wait_writable(self):
+        writable = self.loop.create_future()
+        self.loop.add_writer(
+            self.file_descriptor,
+            lambda: writable.done() or writable.set_result(None),
+        )
+
+        try:
+            await writable
+        finally:
+            self.loop.remove_writer(self.file_descriptor)
+
+    async def drain(self):
+        # like `flush`, but without blocking the event loop until the output
+        # has been transmitted
+        while (out_waiting := self.serial_port.out_waiting) > 0:
+            await asyncio.sleep(out_waiting * self.character_time)
+
+        # the last character may still be in the transmit shift register
+        await asyncio.sleep(self.character_time)
+
+    async def switch_baud_rate(self, baud_rate: int):
+        await self.drain()
+
+        # reconfiguring a port to its current baud rate fails on pseudo terminals
+        if self.serial_port.baudrate == baud_rate:
+            return
+
+        self.serial_port.baudrate = baud_rate
+
+        if self.capture is not None:
+            self.capture.record_baud_rate(baud_rate)
+
+    def close(self):
+        self.loop.remove_reader(self.file_descriptor)
+        self.serial_port.close()
+
+        if self.capture is not None:
+            self.capture.close()
@@ -0,0 +1,155 @@
+import asyncio
+from dataclasses import dataclass
+from enum import IntEnum
+from pathlib import Path
+import struct
+from time import monotonic
+from types import TracebackType
+from typing import Iterable, Iterator, Optional, Type
+
+from .serial_stream import SerialStream
+from .slotted_dataclass import add_slots
+
+session_capture_header = b"PMSC\x01"
+# the kind, the monotonic time and the data length precede the data of a record
+session_record_header = struct.Struct("<BdI")
+baud_rate_record_data = struct.Struct("<I")
+
+
+class SessionRecordKind(IntEnum):
+    READ = 0
+    WRITE = 1
+    BAUD_RATE = 2
+
+
+@add_slots
+@dataclass(frozen=True)
+class SessionRecord:
+    kind: SessionRecordKind
+    timestamp: float
+    data: bytes
+
+    @property
+    def baud_rate(self) -> int:
+        return baud_rate_record_data.unpack(self.data)[0]
+
+
+class SessionCaptureWriter:
+    def __init__(self, file_path: Path):
+        # the sessions of several runs are appended to the same file
+        self.file = file_path.open("ab")
+
+        if self.file.tell() == 0:
+            self.file.write(session_capture_header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ):
+        self.close()
+
+    def record_read(self, data: bytes):
+        self.write_record(SessionRecordKind.READ, data)
+
+    def record_write(self, data: bytes):
+        self.write_record(SessionRecordKind.WRITE, data)
+
+    def record_baud_rate(self, baud_rate: int):
+        self.write_record(
+            SessionRecordKind.BAUD_RATE, baud_rate_record_data.pack(baud_rate)
+        )
+
+    def write_record(self, kind: SessionRecordKind, data: bytes):
+        self.file.write(session_record_header.pack(kind, monotonic(), len(data)))
+        self.file.write(data)
+        # keep the records up to a crash of the monitor
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def read_session_records(file_path: Path) -> Iterator[SessionRecord]:
+    with file_path.open("rb") as file:
+        if file.read(len(session_capture_header)) != session_capture_header:
+            raise ValueError(f"{file_path} is not a session capture")
+
+        while (
+            len(record_header := file.read(session_record_header.size))
+            == session_record_header.size
+        ):
+            (kind, timestamp, length) = session_record_header.unpack(record_header)
+            data = file.read(length)
+
+            # the last record of an interrupted capture may be incomplete
+            if len(data) < length:
+                break
+
+            yield SessionRecord(
+                kind=SessionRecordKind(kind), timestamp=timestamp, data=data
+            )
+
+
+async def replay_session_reads(
+    records: Iterable[SessionRecord],
+    reader: asyncio.StreamReader,
+    speed: Optional[float] = 1.0,
+):
+    # the reads are replayed in real time at a speed of 1, faster or slower at
+    # other speeds and as fast as possible without a speed
+    replay_start_time = monotonic()
+    session_time = 0.0
+    previous_timestamp: Optional[float] = None
+
+    for record in records:
+        if record.kind != SessionRecordKind.READ:
+            continue
+
+        if previous_timestamp is not None:
+            # the monotonic clock restarts between the runs of a capture
+            session_time += max(0.0, record.timestamp - previous_timestamp)
+
+        previous_timestamp = record.timestamp
+
+        # yields at least once, even when behind schedule, so that the reader
+        # consumes each chunk like it would have been received instead of
+        # several at once
+        if speed:
+            deadline = replay_start_time + session_time / speed
+            await asyncio.sleep(max(0.0, deadline - monotonic()))
+
+            while (remaining_time := deadline - monotonic()) > 0:
+                await asyncio.sleep(remaining_time)
+        else:
+            await asyncio.sleep(0)
+
+        reader.feed_data(record.data)
+
+    reader.feed_eof()
+
+
+class ReplaySerialStream(SerialStream):
+    # stands in for the serial stream of a meter by replaying the data read
+    # from it, while the data written to it is discarded
+    def __init__(self, records: Iterable[SessionRecord], speed: Optional[float] = 1.0):
+        self.loop = asyncio.get_running_loop()
+        self.reader = asyncio.StreamReader()
+        self.capture = None
+        self.baud_rate: Optional[int] = None
+        self.replay_task = self.loop.create_task(
+            replay_session_reads(records, self.reader, speed)
+        )
+
+    async def write(self, data: bytes):
+        pass
+
+    async def switch_baud_rate(self, baud_rate: int):
+        self.baud_rate = baud_rate
+
+    def close(self):
+        self.replay_task.cancel()
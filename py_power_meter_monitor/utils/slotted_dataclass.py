@@ -0,0 +1,38 @@
+from dataclasses import fields
+from typing import Any, TypeVar
+
+DataClass = TypeVar("DataClass", bound=type)
+
+
+def add_slots(data_class: DataClass) -> DataClass:
+    # like `dataclass(slots=True)`, which requires python 3.10
+    field_names = tuple(field.name for field in fields(data_class))
+    inherited_slots = {
+        slot
+        for base_class in data_class.__mro__[1:]
+        for slot in getattr(base_class, "__slots__", ())
+    }
+
+    # field defaults are kept by `__init__`, but would conflict with the slots
+    class_dict = {
+        key: value
+        for key, value in data_class.__dict__.items()
+        if key not in field_names and key not in ("__dict__", "__weakref__")
+    }
+    class_dict["__slots__"] = tuple(
+        field_name for field_name in field_names if field_name not in inherited_slots
+    )
+    # frozen instances can't be unpickled via `setattr`
+    class_dict["__getstate__"] = get_slotted_state
+    class_dict["__setstate__"] = set_slotted_state
+
+    return type(data_class)(data_class.__name__, data_class.__bases__, class_dict)
+
+
+def get_slotted_state(instance: Any) -> list[Any]:
+    return [getattr(instance, field.name) for field in fields(instance)]
+
+
+def set_slotted_state(instance: Any, state: list[Any]):
+    for field, value in zip(fields(instance), state):
+        object.__setattr__(instance, field.name, value)
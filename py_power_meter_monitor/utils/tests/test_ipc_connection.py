@@ -0,0 +1,50 @@
+import asyncio
+from multiprocessing import Pipe
+from threading import Thread
+from time import sleep
+
+from ..ipc_connection import send_connection_messages
+
+
+def test_send_messages_without_blocking_the_loop():
+    async def send() -> tuple[int, list[int]]:
+        receiving_connection, sending_connection = Pipe(duplex=False)
+        messages: "asyncio.Queue[bytes]" = asyncio.Queue()
+        tick_count = 0
+        tick_count_before_receiving = -1
+        received_messages: list[int] = []
+
+        def receive():
+            nonlocal tick_count_before_receiving
+            sleep(0.2)
+            tick_count_before_receiving = tick_count
+
+            while len(received_messages) < 4:
+                received_messages.append(receiving_connection.recv()[0])
+
+        # more than the pipe can hold until the other end receives
+        for index in range(4):
+            messages.put_nowait(bytes([index]) * 1_000_000)
+
+        receiver = Thread(target=receive)
+        receiver.start()
+        sender = asyncio.create_task(
+            send_connection_messages(sending_connection, messages)
+        )
+
+        while len(received_messages) < 4:
+            await asyncio.sleep(0.01)
+            tick_count += 1
+
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+        receiver.join()
+
+        return (tick_count_before_receiving, received_messages)
+
+    (tick_count_before_receiving, received_messages) = asyncio.run(
+        asyncio.wait_for(send(), timeout=10)
+    )
+
+    assert tick_count_before_receiving > 0
+    assert received_messages == [0, 1, 2, 3]
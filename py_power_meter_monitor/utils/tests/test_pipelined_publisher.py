@@ -0,0 +1,93 @@
+import asyncio
+from typing import Union
+
+from pytest import raises
+
+from ..pipelined_publisher import PipelinedPublisher
+
+
+class SlowMqttClient:
+    def __init__(self, failing_topics: frozenset[str] = frozenset()):
+        self.failing_topics = failing_topics
+        self.published_topics: list[str] = []
+        self.in_flight_count = 0
+        self.maximum_in_flight_count = 0
+
+    async def publish(self, topic: str, payload: Union[bytes, str], retain: bool):
+        self.in_flight_count += 1
+        self.maximum_in_flight_count = max(
+            self.maximum_in_flight_count, self.in_flight_count
+        )
+
+        try:
+            await asyncio.sleep(0.001)
+
+            if topic in self.failing_topics:
+                raise ConnectionError(f"Failed to publish to {topic}")
+
+            self.published_topics.append(topic)
+        finally:
+            self.in_flight_count -= 1
+
+
+def test_limit_publishes_in_flight():
+    async def publish():
+        mqtt_client = SlowMqttClient()
+        publisher = PipelinedPublisher(
+            mqtt_client=mqtt_client, maximum_in_flight=4  # type: ignore
+        )
+
+        for index in range(20):
+            await publisher.publish(topic=f"meter/{index}", payload=b"", retain=False)
+
+        await publisher.flush()
+        return mqtt_client, publisher
+
+    mqtt_client, publisher = asyncio.run(publish())
+
+    assert mqtt_client.maximum_in_flight_count == 4
+    # the client receives the messages in the order they were published
+    assert mqtt_client.published_topics == [f"meter/{index}" for index in range(20)]
+    assert publisher.published_count == 20
+
+
+def test_raise_failed_publish_on_flush():
+    async def publish():
+        mqtt_client = SlowMqttClient(failing_topics=frozenset({"meter/0"}))
+        publisher = PipelinedPublisher(
+            mqtt_client=mqtt_client, maximum_in_flight=4  # type: ignore
+        )
+
+        await publisher.publish(topic="meter/0", payload=b"", retain=False)
+        # the failed publish completes before the flush
+        await asyncio.sleep(0.01)
+        await publisher.publish(topic="meter/1", payload=b"", retain=False)
+
+        with raises(ConnectionError):
+            await publisher.flush()
+
+        # a failure is only raised once
+        await publisher.flush()
+        return mqtt_client
+
+    assert asyncio.run(publish()).published_topics == ["meter/1"]
+
+
+def test_drain_pending_publishes_on_shutdown():
+    async def publish():
+        mqtt_client = SlowMqttClient(failing_topics=frozenset({"meter/1"}))
+        publisher = PipelinedPublisher(
+            mqtt_client=mqtt_client, maximum_in_flight=4  # type: ignore
+        )
+
+        for index in range(3):
+            await publisher.publish(topic=f"meter/{index}", payload=b"", retain=False)
+
+        await publisher.drain()
+        return mqtt_client, publisher
+
+    mqtt_client, publisher = asyncio.run(publish())
+
+    assert mqtt_client.published_topics == ["meter/0", "meter/2"]
+    assert not publisher.in_flight
+    assert not publisher.failures
@@ -0,0 +1,112 @@
+import asyncio
+
+from ..publish_subscribe_topic import OverflowPolicy, PublishSubscribeTopic
+
+
+async def receive(
+    topic: PublishSubscribeTopic[int], overflow_policy: OverflowPolicy, count: int
+) -> list[int]:
+    messages = []
+
+    async for message in topic.items(overflow_policy):
+        messages.append(message)
+
+        if len(messages) == count:
+            break
+
+    return messages
+
+
+async def start_subscriber(
+    topic: PublishSubscribeTopic[int], overflow_policy: OverflowPolicy, count: int
+) -> "asyncio.Task[list[int]]":
+    task = asyncio.create_task(receive(topic, overflow_policy, count))
+
+    # lets the subscriber register its cursor
+    await asyncio.sleep(0)
+    return task
+
+
+def test_wrap_around_ring_buffer():
+    async def publish_and_receive():
+        topic: PublishSubscribeTopic[int] = PublishSubscribeTopic(capacity=4)
+        subscriber = await start_subscriber(topic, OverflowPolicy.DROP_OLDEST, 10)
+
+        for message in range(10):
+            topic.publish(message)
+            await asyncio.sleep(0)
+
+        return await subscriber, topic.head
+
+    messages, head = asyncio.run(publish_and_receive())
+
+    assert messages == list(range(10))
+    assert head == 10
+
+
+def test_skip_oldest_messages_of_lagging_subscriber():
+    async def publish_and_receive():
+        topic: PublishSubscribeTopic[int] = PublishSubscribeTopic(capacity=4)
+        subscriber = await start_subscriber(topic, OverflowPolicy.DROP_OLDEST, 4)
+        cursor = next(iter(topic.cursors))
+
+        for message in range(10):
+            topic.publish(message)
+
+        depth = topic.depth
+        messages = await subscriber
+        return messages, depth, cursor.dropped_count
+
+    messages, depth, dropped_count = asyncio.run(publish_and_receive())
+
+    assert messages == [6, 7, 8, 9]
+    assert depth == 4
+    assert dropped_count == 6
+
+
+def test_receive_only_latest_message():
+    async def publish_and_receive():
+        topic: PublishSubscribeTopic[int] = PublishSubscribeTopic(capacity=4)
+        subscriber = await start_subscriber(topic, OverflowPolicy.LATEST, 2)
+
+        for message in range(3):
+            topic.publish(message)
+
+        await asyncio.sleep(0)
+
+        for message in range(3, 6):
+            topic.publish(message)
+
+        return await subscriber
+
+    assert asyncio.run(publish_and_receive()) == [2, 5]
+
+
+def test_block_put_until_subscriber_catches_up():
+    async def publish_and_receive():
+        topic: PublishSubscribeTopic[int] = PublishSubscribeTopic(capacity=4)
+        blocking_subscriber = await start_subscriber(topic, OverflowPolicy.BLOCK, 10)
+        dropping_subscriber = await start_subscriber(
+            topic, OverflowPolicy.DROP_OLDEST, 10
+        )
+        maximum_depth = 0
+
+        for message in range(10):
+            await topic.put(message)
+            maximum_depth = max(maximum_depth, topic.depth)
+
+        return (
+            await blocking_subscriber,
+            await dropping_subscriber,
+            maximum_depth,
+            topic.dropped_count,
+        )
+
+    blocking_messages, dropping_messages, maximum_depth, dropped_count = asyncio.run(
+        publish_and_receive()
+    )
+
+    assert blocking_messages == list(range(10))
+    assert dropping_messages == list(range(10))
+    assert maximum_depth <= 4
+    assert dropped_count == 0
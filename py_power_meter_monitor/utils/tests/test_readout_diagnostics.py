@@ -0,0 +1,90 @@
+import pickle
+
+from ..bounded_cache import BoundedCache
+from ..readout_diagnostics import (
+    DecodeCacheKind,
+    LatencyHistogram,
+    ReadoutDiagnostics,
+    ReadoutErrorKind,
+    ReadoutPhase,
+)
+
+
+def test_estimate_latency_percentiles():
+    histogram = LatencyHistogram()
+
+    for _ in range(90):
+        histogram.record(0.01)
+
+    for _ in range(10):
+        histogram.record(2.5)
+
+    assert histogram.count == 100
+    assert abs(histogram.mean - 0.259) < 1e-9
+    # percentiles are bounded by their bucket, which is at most ~41% wider
+    assert 0.01 <= histogram.get_percentile(0.5) < 0.01 * 1.42
+    assert 2.5 <= histogram.get_percentile(0.95) < 2.5 * 1.42
+    assert histogram.get_percentile(1.0) == 2.5
+
+
+def test_summarize_measured_phases():
+    diagnostics = ReadoutDiagnostics()
+    diagnostics.record_phase(ReadoutPhase.SIGN_ON, 0.5)
+    diagnostics.record_error(ReadoutErrorKind.TIMEOUT)
+    diagnostics.record_transfer(byte_count=960, duration=1.0)
+
+    summary = diagnostics.get_summary()
+
+    assert list(summary["phases"]) == ["sign_on"]
+    assert summary["phases"]["sign_on"]["p95"] == 0.5
+    assert summary["errors"] == {
+        "parsing": 0,
+        "timeout": 1,
+        "block_check_character": 0,
+    }
+    assert summary["received_bytes"] == 960
+    assert summary["transfer_rate"] == 960.0
+
+
+def test_summarize_decode_caches():
+    diagnostics = ReadoutDiagnostics()
+    cache: BoundedCache[str, str] = BoundedCache(
+        maximum_size=1,
+        statistics=diagnostics.decode_cache_statistics[DecodeCacheKind.DATA_SET],
+    )
+
+    for key in ("a", "a", "a", "b"):
+        cache.get_or_compute(key, str.upper)
+
+    # the statistics reach the supervisor without the cached entries
+    supervisor_diagnostics = ReadoutDiagnostics()
+    supervisor_diagnostics.add_reader_measurements(
+        pickle.loads(pickle.dumps(diagnostics.take_reader_measurements()))
+    )
+
+    assert supervisor_diagnostics.get_summary()["decode_caches"] == {
+        "data_set": {"hits": 2, "misses": 2, "evictions": 1, "hit_rate": 0.5}
+    }
+
+
+def test_add_reader_measurements_of_each_readout():
+    reader_diagnostics = ReadoutDiagnostics()
+    supervisor_diagnostics = ReadoutDiagnostics()
+
+    for duration in (1.0, 3.0):
+        reader_diagnostics.record_phase(ReadoutPhase.READOUT, duration)
+        reader_diagnostics.record_error(ReadoutErrorKind.TIMEOUT)
+        reader_diagnostics.record_transfer(byte_count=480, duration=duration)
+        # only what changed since the last readout is sent
+        supervisor_diagnostics.add_reader_measurements(
+            pickle.loads(pickle.dumps(reader_diagnostics.take_reader_measurements()))
+        )
+
+    summary = supervisor_diagnostics.get_summary()
+
+    assert summary["phases"]["readout"]["count"] == 2
+    assert summary["phases"]["readout"]["mean"] == 2.0
+    assert summary["errors"]["timeout"] == 2
+    assert summary["received_bytes"] == 960
+    assert summary["transfer_rate"] == 160.0
+    assert reader_diagnostics.get_summary()["phases"] == {}
@@ -0,0 +1,118 @@
+import asyncio
+
+from pytest import MonkeyPatch, raises
+
+from .. import readout_scheduler
+from ..readout_scheduler import ReadoutSchedule, ReadoutScheduler
+
+
+class FakeClock:
+    def __init__(self, wall_clock_time: float):
+        self.wall_clock_time = wall_clock_time
+        self.monotonic_time = 0.0
+        self.sleeps: list[float] = []
+
+    def time(self) -> float:
+        return self.wall_clock_time
+
+    def monotonic(self) -> float:
+        return self.monotonic_time
+
+    def advance(self, duration: float):
+        self.wall_clock_time += duration
+        self.monotonic_time += duration
+
+    async def sleep(self, duration: float):
+        self.sleeps.append(duration)
+        self.advance(duration)
+
+
+def patch_clock(monkeypatch: MonkeyPatch, wall_clock_time: float) -> FakeClock:
+    clock = FakeClock(wall_clock_time)
+    monkeypatch.setattr(readout_scheduler, "time", clock.time)
+    monkeypatch.setattr(readout_scheduler, "monotonic", clock.monotonic)
+    monkeypatch.setattr(readout_scheduler.asyncio, "sleep", clock.sleep)
+
+    return clock
+
+
+def test_align_readouts_to_interval(monkeypatch: MonkeyPatch):
+    clock = patch_clock(monkeypatch, wall_clock_time=1000.25)
+    scheduler = ReadoutScheduler(schedule=ReadoutSchedule.ALIGNED, interval=10)
+    readout_start_times: list[float] = []
+
+    async def read_three_times():
+        await scheduler.wait_for_first_readout()
+
+        for readout_duration in (2, 3, 0):
+            readout_start_times.append(clock.wall_clock_time)
+            clock.advance(readout_duration)
+            await scheduler.wait_for_next_readout()
+
+    asyncio.run(read_three_times())
+
+    assert readout_start_times == [1010, 1020, 1030]
+    assert clock.sleeps == [9.75, 8, 7, 10]
+    assert scheduler.skipped_slot_count == 0
+
+
+def test_skip_slots_after_overrun(monkeypatch: MonkeyPatch):
+    clock = patch_clock(monkeypatch, wall_clock_time=1000)
+    scheduler = ReadoutScheduler(schedule=ReadoutSchedule.ALIGNED, interval=10)
+
+    async def read_too_long():
+        await scheduler.wait_for_first_readout()
+        clock.advance(25)
+        await scheduler.wait_for_next_readout()
+
+    asyncio.run(read_too_long())
+
+    # the slots at 1020 and 1030 have passed during the readout
+    assert clock.wall_clock_time == 1040
+    assert clock.sleeps == [10, 5]
+    assert scheduler.skipped_slot_count == 2
+
+
+def test_wait_for_next_slot_after_error(monkeypatch: MonkeyPatch):
+    clock = patch_clock(monkeypatch, wall_clock_time=1003)
+    scheduler = ReadoutScheduler(schedule=ReadoutSchedule.ALIGNED, interval=10)
+
+    asyncio.run(scheduler.wait_after_error())
+
+    assert clock.wall_clock_time == 1010
+
+
+def test_read_continuously(monkeypatch: MonkeyPatch):
+    clock = patch_clock(monkeypatch, wall_clock_time=1000)
+    scheduler = ReadoutScheduler(schedule=ReadoutSchedule.CONTINUOUS, interval=5)
+
+    async def read_and_fail():
+        await scheduler.wait_for_first_readout()
+        await scheduler.wait_for_next_readout()
+        # a failing meter isn't retried continuously
+        await scheduler.wait_after_error()
+
+    asyncio.run(read_and_fail())
+
+    assert clock.sleeps == [0, 5]
+
+
+def test_delay_readouts(monkeypatch: MonkeyPatch):
+    clock = patch_clock(monkeypatch, wall_clock_time=1003)
+    scheduler = ReadoutScheduler(schedule=ReadoutSchedule.DELAY, interval=5)
+
+    async def read_and_fail():
+        await scheduler.wait_for_first_readout()
+        clock.advance(2)
+        await scheduler.wait_for_next_readout()
+        await scheduler.wait_after_error()
+
+    asyncio.run(read_and_fail())
+
+    # the delay follows the end of the readout regardless of its duration
+    assert clock.sleeps == [5, 5]
+
+
+def test_require_positive_interval_for_aligned_readouts():
+    with raises(ValueError):
+        ReadoutScheduler(schedule=ReadoutSchedule.ALIGNED, interval=0)
@@ -0,0 +1,105 @@
+import asyncio
+import errno
+import os
+import termios
+import tty
+
+from pytest import MonkeyPatch, raises
+import serial  # type: ignore
+
+from ..serial_stream import SerialStream
+
+
+def open_pseudo_terminal_stream(baud_rate: int) -> tuple[int, SerialStream]:
+    (controller, port) = os.openpty()
+    tty.setraw(controller)
+    serial_port = serial.Serial(port=os.ttyname(port), baudrate=baud_rate)
+    # the serial port keeps its own file descriptor
+    os.close(port)
+
+    return (controller, SerialStream(serial_port))
+
+
+def test_switch_baud_rate_while_reading():
+    async def read_at_both_baud_rates():
+        (controller, stream) = open_pseudo_terminal_stream(baud_rate=300)
+
+        try:
+            os.write(controller, b"/SIM6METER\r\n")
+            identification = await stream.reader.readline()
+
+            await stream.switch_baud_rate(19200)
+            speed = termios.tcgetattr(stream.file_descriptor)[4]
+
+            # the reader stays registered across the reconfiguration
+            os.write(controller, b"1.8.0(1)\r\n")
+            data = await stream.reader.readline()
+
+            return (identification, speed, data, stream.serial_port.baudrate)
+        finally:
+            stream.close()
+            os.close(controller)
+
+    assert asyncio.run(read_at_both_baud_rates()) == (
+        b"/SIM6METER\r\n",
+        termios.B19200,
+        b"1.8.0(1)\r\n",
+        19200,
+    )
+
+
+def test_remove_reader_on_close():
+    async def open_and_close():
+        (controller, stream) = open_pseudo_terminal_stream(baud_rate=300)
+        stream.close()
+        os.close(controller)
+
+        return (
+            stream.serial_port.is_open,
+            asyncio.get_running_loop().remove_reader(stream.file_descriptor),
+        )
+
+    assert asyncio.run(open_and_close()) == (False, False)
+
+
+def test_remove_reader_on_hang_up():
+    async def read_after_hang_up():
+        (controller, stream) = open_pseudo_terminal_stream(baud_rate=300)
+
+        try:
+            os.write(controller, b"1.8.0(1)\r\n")
+            data = await stream.reader.readline()
+            # the port reads the end of the file once the controller is closed
+            os.close(controller)
+            data += await stream.reader.read()
+
+            return (
+                data,
+                asyncio.get_running_loop().remove_reader(stream.file_descriptor),
+            )
+        finally:
+            stream.close()
+
+    assert asyncio.run(read_after_hang_up()) == (b"1.8.0(1)\r\n", False)
+
+
+def test_remove_reader_on_error(monkeypatch: MonkeyPatch):
+    def fail_to_read(file_descriptor: int, size: int) -> bytes:
+        raise OSError(errno.EIO, "Input/output error")
+
+    async def read_after_error():
+        (controller, stream) = open_pseudo_terminal_stream(baud_rate=300)
+
+        try:
+            monkeypatch.setattr(os, "read", fail_to_read)
+            os.write(controller, b"1.8.0(1)\r\n")
+
+            with raises(OSError):
+                await stream.reader.read()
+
+            return asyncio.get_running_loop().remove_reader(stream.file_descriptor)
+        finally:
+            stream.close()
+            os.close(controller)
+
+    assert asyncio.run(read_after_error()) is False
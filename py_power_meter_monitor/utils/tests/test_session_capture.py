@@ -0,0 +1,132 @@
+import asyncio
+from random import Random
+from typing import Optional
+
+from ...iec_62056_protocol.data_block import DataBlock, DataBlockStatus
+from ...iec_62056_protocol.iec_62056_21_messages import IdentificationMessage
+from ...workers.iec_62056_data_serial_reader import read_iec_62056_data_from_serial
+from ...workers.mode_c_meter_simulator import create_synthetic_data_messages
+from ..publish_subscribe_topic import PublishSubscribeTopic
+from ..readout_scheduler import ReadoutSchedule
+from ..session_capture import (
+    ReplaySerialStream,
+    SessionCaptureWriter,
+    SessionRecord,
+    SessionRecordKind,
+    read_session_records,
+    replay_session_reads,
+)
+
+
+def test_append_sessions_to_capture(tmp_path):
+    capture_file = tmp_path / "session.capture"
+
+    with SessionCaptureWriter(capture_file) as capture:
+        capture.record_baud_rate(300)
+        capture.record_write(b"/?!\r\n")
+
+    with SessionCaptureWriter(capture_file) as capture:
+        capture.record_read(b"/LOG5LK123\r\n")
+
+    records = list(read_session_records(capture_file))
+
+    assert [(record.kind, record.data) for record in records] == [
+        (SessionRecordKind.BAUD_RATE, b"\x2c\x01\x00\x00"),
+        (SessionRecordKind.WRITE, b"/?!\r\n"),
+        (SessionRecordKind.READ, b"/LOG5LK123\r\n"),
+    ]
+    assert records[0].baud_rate == 300
+    assert records[0].timestamp <= records[1].timestamp <= records[2].timestamp
+
+
+def test_ignore_incomplete_last_record(tmp_path):
+    capture_file = tmp_path / "session.capture"
+
+    with SessionCaptureWriter(capture_file) as capture:
+        capture.record_read(b"/LOG5")
+        capture.record_read(b"LK123\r\n")
+
+    capture_file.write_bytes(capture_file.read_bytes()[:-1])
+
+    assert [record.data for record in read_session_records(capture_file)] == [b"/LOG5"]
+
+
+def test_replay_reads_into_stream():
+    records = [
+        SessionRecord(kind=SessionRecordKind.WRITE, timestamp=1.0, data=b"/?!\r\n"),
+        SessionRecord(kind=SessionRecordKind.READ, timestamp=1.2, data=b"/LOG5"),
+        SessionRecord(kind=SessionRecordKind.READ, timestamp=1.3, data=b"LK123\r\n"),
+    ]
+
+    async def replay_identification(speed):
+        reader = asyncio.StreamReader()
+        replay = asyncio.create_task(replay_session_reads(records, reader, speed))
+        message = await IdentificationMessage.read_from_stream(reader)
+        await replay
+
+        return message
+
+    for speed in (None, 100.0):
+        message = asyncio.run(replay_identification(speed))
+
+        assert message.manufacturer_id == "LOG"
+        assert message.identification == "LK123"
+
+
+def test_replay_every_readout_regardless_of_speed():
+    get_data_message = create_synthetic_data_messages(2, Random(0))
+    records = [
+        record
+        for cycle in range(3)
+        for record in (
+            SessionRecord(
+                kind=SessionRecordKind.READ,
+                timestamp=cycle + 0.1,
+                data=b"/SIM6METER\r\n",
+            ),
+            SessionRecord(
+                kind=SessionRecordKind.READ,
+                timestamp=cycle + 0.5,
+                data=get_data_message(),
+            ),
+        )
+    ]
+
+    async def replay_readouts(speed: Optional[float]) -> list[DataBlock]:
+        topic: PublishSubscribeTopic[DataBlock] = PublishSubscribeTopic()
+        data_blocks: list[DataBlock] = []
+
+        async def collect_data_blocks():
+            async for data_block in topic.items():
+                data_blocks.append(data_block)
+
+        collector = asyncio.create_task(collect_data_blocks())
+        await asyncio.sleep(0)
+
+        with ReplaySerialStream(records=records, speed=speed) as serial_port:
+            try:
+                await read_iec_62056_data_from_serial(
+                    topic=topic,
+                    serial_port=serial_port,
+                    baud_rate=300,
+                    polling_delay=0,
+                    response_delay=0,
+                    read_timeout=5,
+                    write_timeout=5,
+                    readout_schedule=ReadoutSchedule.CONTINUOUS,
+                )
+            except asyncio.IncompleteReadError:
+                # the reader stops at the end of the capture
+                pass
+
+        await topic.join()
+        collector.cancel()
+
+        return data_blocks
+
+    for speed in (None, 1000.0):
+        data_blocks = asyncio.run(replay_readouts(speed))
+
+        assert [data_block.status for data_block in data_blocks] == [
+            DataBlockStatus.CONFIRMED
+        ] * 3
@@ -1,54 +1,167 @@
 # pyright: reportUnnecessaryIsInstance=false
 import asyncio
 from logging import getLogger
+from time import monotonic, time
+from typing import Optional, Sequence, Type, Union
 
 from aioserial import AioSerial  # type: ignore
 from async_timeout import timeout
 
-from ..iec_62056_protocol.data_block import DataBlock
-from ..iec_62056_protocol.errors import Iec62056ProtocolError
+from ..iec_62056_protocol.baud_rate_negotiation import (
+    BaudRateNegotiator,
+    accept_proposed_baud_rate_id,
+)
+from ..iec_62056_protocol.data_block import (
+    DataBlock,
+    DataBlockStatus,
+    DataSet,
+    DataSetFields,
+    cache_data_set_parser,
+)
+from ..iec_62056_protocol.errors import (
+    BlockCheckCharacterError,
+    Iec62056ProtocolError,
+    ParsingError,
+)
+from ..iec_62056_protocol.frame_decoder import FrameDecoder
+from ..iec_62056_protocol.iec_62056_21_messages import (
+    Iec6205621Message,
+    IdentificationMessage,
+)
 from ..iec_62056_protocol.mode_c_state_machine import (
     AwaitMessageEffect,
     ChangeSpeedEffect,
     DataReadoutSuccessState,
+    IdentifiedState,
     InitialState,
+    KeepSessionEffect,
+    ProgrammingModeState,
     ProtocolErrorState,
+    ReceiveInvalidMessageEvent,
     ReceiveMessageEvent,
     ResetEffect,
     ResetEvent,
     ResetSpeedEffect,
+    ResumeSessionEvent,
     SendMessageEffect,
     get_next_state,
 )
 from ..iec_62056_protocol.transmission_speeds import mode_c_transmission_speeds
+from ..utils.bounded_cache import BoundedCache
 from ..utils.publish_subscribe_topic import PublishSubscribeTopic
+from ..utils.readout_diagnostics import (
+    ReadoutDiagnostics,
+    ReadoutErrorKind,
+    ReadoutPhase,
+)
+from ..utils.readout_scheduler import ReadoutSchedule, ReadoutScheduler
+from ..utils.serial_stream import SerialStream
 
 logger = getLogger(__package__)
 
+SerialConnection = Union[SerialStream, AioSerial]
+
 
 async def read_iec_62056_data_from_serial(
     topic: PublishSubscribeTopic[DataBlock],
-    serial_port: AioSerial,
+    serial_port: SerialConnection,
     baud_rate: int,
     polling_delay: float,
     response_delay: float,
     read_timeout: float,
     write_timeout: float,
+    streaming_readout: bool = False,
+    data_set_cache: Optional[BoundedCache[bytes, DataSetFields]] = None,
+    readout_schedule: ReadoutSchedule = ReadoutSchedule.DELAY,
+    baud_rate_negotiator: Optional[BaudRateNegotiator] = None,
+    register_addresses: Sequence[str] = (),
+    keep_session: bool = False,
+    maximum_retransmissions: int = 0,
+    salvage_unverified_data: bool = False,
+    diagnostics: Optional[ReadoutDiagnostics] = None,
 ):
     current_state = InitialState()
     next_event = ResetEvent()
+    negotiated_baud_rate_id: Optional[str] = None
+    select_baud_rate_id = (
+        baud_rate_negotiator.select_baud_rate_id
+        if baud_rate_negotiator is not None
+        else accept_proposed_baud_rate_id
+    )
+    provisional_data_sets: list[DataSet] = []
+
+    def publish_provisional_data_set(data_set: DataSet):
+        provisional_data_sets.append(data_set)
+        topic.publish(
+            DataBlock(
+                manufacturer_identification=current_state.identification
+                if isinstance(current_state, IdentifiedState)
+                else "",
+                data_lines=[data_set],
+                status=DataBlockStatus.PROVISIONAL,
+            )
+        )
+
+    def retract_provisional_data_sets():
+        if provisional_data_sets:
+            topic.publish(
+                DataBlock(
+                    manufacturer_identification="",
+                    data_lines=provisional_data_sets.copy(),
+                    status=DataBlockStatus.RETRACTED,
+                )
+            )
+            provisional_data_sets.clear()
+
+    decoder = FrameDecoder(
+        on_data_set=publish_provisional_data_set if streaming_readout else None,
+        parse_data_set=cache_data_set_parser(DataSet.from_bytes, data_set_cache)
+        if data_set_cache is not None
+        else DataSet.from_bytes,
+    )
+
+    scheduler = ReadoutScheduler(schedule=readout_schedule, interval=polling_delay)
+    await scheduler.wait_for_first_readout()
+    readout_start_time = monotonic()
 
     while True:
         (current_state, next_effects) = get_next_state(
-            state=current_state, event=next_event
+            state=current_state,
+            event=next_event,
+            select_baud_rate_id=select_baud_rate_id,
+            register_addresses=register_addresses,
+            keep_session=keep_session,
+            maximum_retransmissions=maximum_retransmissions,
+            salvage_unverified_data=salvage_unverified_data,
         )
 
         try:
             # react to state change
             logger.debug(f"IEC 62056 state machine in state {current_state}")
 
-            if isinstance(current_state, DataReadoutSuccessState):
-                topic.publish(current_state.data)
+            if isinstance(current_state, (IdentifiedState, ProgrammingModeState)):
+                negotiated_baud_rate_id = current_state.baud_rate_id
+            elif isinstance(current_state, DataReadoutSuccessState):
+                if diagnostics is not None:
+                    diagnostics.record_phase(
+                        ReadoutPhase.READOUT, monotonic() - readout_start_time
+                    )
+
+                if current_state.data.status == DataBlockStatus.CONFIRMED:
+                    provisional_data_sets.clear()
+                else:
+                    # streamed values are only replaced by a verified block
+                    retract_provisional_data_sets()
+
+                # waits for subscribers with the blocking policy to catch up
+                await topic.put(current_state.data)
+
+                if (
+                    baud_rate_negotiator is not None
+                    and negotiated_baud_rate_id
+                    and current_state.data.status == DataBlockStatus.CONFIRMED
+                ):
+                    baud_rate_negotiator.record_success(negotiated_baud_rate_id)
             elif isinstance(current_state, ProtocolErrorState):
                 raise Iec62056ProtocolError(current_state.message)
 
@@ -58,35 +171,152 @@ async def read_iec_62056_data_from_serial(
 
                 if isinstance(next_effect, SendMessageEffect):
                     async with timeout(write_timeout):
-                        await serial_port.write_async(bytes(next_effect.message))
+                        await write_message(serial_port, next_effect.message)
+                    delay_start_time = monotonic()
                     await asyncio.sleep(response_delay)
+
+                    if diagnostics is not None:
+                        diagnostics.record_phase(
+                            ReadoutPhase.RESPONSE_DELAY, monotonic() - delay_start_time
+                        )
                 elif isinstance(next_effect, AwaitMessageEffect):
-                    async with timeout(read_timeout):
-                        message = await next_effect.message_type.read_from_serial_port(
-                            serial_port
+                    receive_start_time = monotonic()
+
+                    try:
+                        async with timeout(read_timeout):
+                            message = await read_message(
+                                serial_port, next_effect.message_type, decoder
+                            )
+                            next_event = ReceiveMessageEvent(message=message)
+
+                        if diagnostics is not None:
+                            record_received_message(
+                                diagnostics,
+                                message_type=next_effect.message_type,
+                                duration=monotonic() - receive_start_time,
+                                decoder=decoder,
+                            )
+                    except BlockCheckCharacterError as error:
+                        # the state machine decides whether to request the
+                        # message again
+                        logger.warning(
+                            f"Invalid block check character in state {current_state}"
+                        )
+
+                        if diagnostics is not None:
+                            diagnostics.record_error(
+                                ReadoutErrorKind.BLOCK_CHECK_CHARACTER
+                            )
+
+                        # the lines streamed from the invalid frame are suspect,
+                        # whether it is repeated or salvaged
+                        retract_provisional_data_sets()
+
+                        if baud_rate_negotiator is not None and isinstance(
+                            current_state, (IdentifiedState, ProgrammingModeState)
+                        ):
+                            baud_rate_negotiator.record_block_check_character_error(
+                                current_state.baud_rate_id
+                            )
+
+                        next_event = ReceiveInvalidMessageEvent(
+                            timestamp=time(),
+                            message_type=next_effect.message_type,
+                            frame=error.frame,
                         )
-                        next_event = ReceiveMessageEvent(message=message)
                 elif isinstance(next_effect, ResetEffect):
-                    switch_baud_rate(serial_port=serial_port, baud_rate=baud_rate)
+                    await switch_baud_rate(serial_port=serial_port, baud_rate=baud_rate)
+                    decoder.reset()
                     next_event = ResetEvent()
-                    await asyncio.sleep(polling_delay)
+                    await scheduler.wait_for_next_readout()
+                    readout_start_time = monotonic()
+                elif isinstance(next_effect, KeepSessionEffect):
+                    await scheduler.wait_for_next_readout()
+                    readout_start_time = monotonic()
+                    next_event = ResumeSessionEvent()
                 elif isinstance(next_effect, ResetSpeedEffect):
-                    switch_baud_rate(serial_port=serial_port, baud_rate=baud_rate)
+                    await switch_baud_rate(serial_port=serial_port, baud_rate=baud_rate)
                 elif isinstance(next_effect, ChangeSpeedEffect):
                     new_speed = mode_c_transmission_speeds.get(next_effect.baud_rate_id)
                     if isinstance(new_speed, int):
-                        switch_baud_rate(serial_port=serial_port, baud_rate=new_speed)
-        except Iec62056ProtocolError:
+                        await switch_baud_rate(
+                            serial_port=serial_port, baud_rate=new_speed
+                        )
+        except Iec62056ProtocolError as error:
             logger.exception(f"Protocol error in state {current_state}")
+
+            if diagnostics is not None and isinstance(error, ParsingError):
+                diagnostics.record_error(ReadoutErrorKind.PARSING)
+
+            retract_provisional_data_sets()
+            decoder.reset()
             next_event = ResetEvent()
-            await asyncio.sleep(polling_delay)
-        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # the meter falls back to the initial baud rate after a failed readout
+            await switch_baud_rate(serial_port=serial_port, baud_rate=baud_rate)
+            await scheduler.wait_after_error()
+            readout_start_time = monotonic()
+        except asyncio.TimeoutError:
             logger.exception(f"Error in state {current_state}")
+
+            if diagnostics is not None:
+                diagnostics.record_error(ReadoutErrorKind.TIMEOUT)
+
+            if baud_rate_negotiator is not None and isinstance(
+                current_state, (IdentifiedState, ProgrammingModeState)
+            ):
+                baud_rate_negotiator.record_timeout(current_state.baud_rate_id)
+
+            retract_provisional_data_sets()
+            decoder.reset()
             next_event = ResetEvent()
-            await asyncio.sleep(polling_delay)
+            # the meter falls back to the initial baud rate after a failed readout
+            await switch_baud_rate(serial_port=serial_port, baud_rate=baud_rate)
+            await scheduler.wait_after_error()
+            readout_start_time = monotonic()
 
 
-def switch_baud_rate(serial_port: AioSerial, baud_rate: int):
+def record_received_message(
+    diagnostics: ReadoutDiagnostics,
+    message_type: Type[Iec6205621Message],
+    duration: float,
+    decoder: FrameDecoder,
+):
+    # the frame is parsed once it is complete, which ends the wait for it
+    parse_duration = decoder.last_parse_duration
+    diagnostics.record_phase(ReadoutPhase.PARSE, parse_duration)
+
+    if message_type is IdentificationMessage:
+        diagnostics.record_phase(ReadoutPhase.SIGN_ON, duration - parse_duration)
+    else:
+        diagnostics.record_phase(ReadoutPhase.TRANSFER, duration - parse_duration)
+        diagnostics.record_transfer(
+            decoder.last_frame_length, duration - parse_duration
+        )
+
+
+async def write_message(serial_port: SerialConnection, message: Iec6205621Message):
+    if isinstance(serial_port, SerialStream):
+        await serial_port.write(bytes(message))
+    else:
+        await serial_port.write_async(bytes(message))
+
+
+async def read_message(
+    serial_port: SerialConnection,
+    message_type: Type[Iec6205621Message],
+    decoder: FrameDecoder,
+) -> Iec6205621Message:
+    if isinstance(serial_port, SerialStream):
+        return await message_type.read_from_stream(serial_port.reader, decoder)
+    else:
+        return await message_type.read_from_serial_port(serial_port, decoder)
+
+
+async def switch_baud_rate(serial_port: SerialConnection, baud_rate: int):
     logger.debug(f"Switching serial baud rate to {baud_rate}")
-    serial_port.flush()
-    serial_port.baudrate = baud_rate
+
+    if isinstance(serial_port, SerialStream):
+        await serial_port.switch_baud_rate(baud_rate)
+    else:
+        serial_port.flush()
+        serial_port.baudrate = baud_rate
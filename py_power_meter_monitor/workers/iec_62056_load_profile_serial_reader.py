@@ -0,0 +1,107 @@
+# pyright: reportUnnecessaryIsInstance=false
+import asyncio
+from logging import getLogger
+from time import time
+from typing import AsyncIterator
+
+from async_timeout import timeout
+
+from ..iec_62056_protocol.errors import (
+    BlockCheckCharacterError,
+    Iec62056ProtocolError,
+)
+from ..iec_62056_protocol.frame_decoder import FrameDecoder
+from ..iec_62056_protocol.load_profile import LoadProfileBlock, LoadProfileParser
+from ..iec_62056_protocol.mode_c_state_machine import (
+    AwaitMessageEffect,
+    ChangeSpeedEffect,
+    InitialState,
+    LoadProfileReadoutSuccessState,
+    LoadProfileState,
+    ModeCEvent,
+    ModeCState,
+    ProtocolErrorState,
+    ReceiveInvalidMessageEvent,
+    ReceiveMessageEvent,
+    ResetEffect,
+    ResetEvent,
+    ResetSpeedEffect,
+    SendMessageEffect,
+    get_next_state,
+)
+from ..iec_62056_protocol.transmission_speeds import mode_c_transmission_speeds
+from .iec_62056_data_serial_reader import (
+    SerialConnection,
+    read_message,
+    switch_baud_rate,
+    write_message,
+)
+
+logger = getLogger(__package__)
+
+
+async def read_iec_62056_load_profile_from_serial(
+    serial_port: SerialConnection,
+    baud_rate: int,
+    response_delay: float,
+    read_timeout: float,
+    write_timeout: float,
+    load_profile_request: str,
+    maximum_retransmissions: int = 0,
+) -> AsyncIterator[LoadProfileBlock]:
+    current_state: ModeCState = InitialState()
+    next_event: ModeCEvent = ResetEvent()
+    decoder = FrameDecoder()
+    parser = LoadProfileParser()
+
+    while True:
+        (current_state, next_effects) = get_next_state(
+            state=current_state,
+            event=next_event,
+            load_profile_request=load_profile_request,
+            maximum_retransmissions=maximum_retransmissions,
+        )
+        logger.debug(f"IEC 62056 state machine in state {current_state}")
+
+        # the records are parsed block by block while the transfer continues
+        if isinstance(current_state, LoadProfileState):
+            for load_profile_block in parser.feed(current_state.data):
+                yield load_profile_block
+        elif isinstance(current_state, LoadProfileReadoutSuccessState):
+            for load_profile_block in parser.feed(current_state.data):
+                yield load_profile_block
+            for load_profile_block in parser.finish():
+                yield load_profile_block
+        elif isinstance(current_state, ProtocolErrorState):
+            raise Iec62056ProtocolError(current_state.message)
+
+        for next_effect in next_effects:
+            logger.debug(f"IEC 62056 state machine evaluating effect {next_effect}")
+
+            if isinstance(next_effect, SendMessageEffect):
+                async with timeout(write_timeout):
+                    await write_message(serial_port, next_effect.message)
+                await asyncio.sleep(response_delay)
+            elif isinstance(next_effect, AwaitMessageEffect):
+                try:
+                    async with timeout(read_timeout):
+                        message = await read_message(
+                            serial_port, next_effect.message_type, decoder
+                        )
+                        next_event = ReceiveMessageEvent(message=message)
+                except BlockCheckCharacterError as error:
+                    next_event = ReceiveInvalidMessageEvent(
+                        timestamp=time(),
+                        message_type=next_effect.message_type,
+                        frame=error.frame,
+                    )
+            elif isinstance(next_effect, ResetEffect):
+                # the load profile is only read once
+                await switch_baud_rate(serial_port=serial_port, baud_rate=baud_rate)
+                return
+            elif isinstance(next_effect, ResetSpeedEffect):
+                await switch_baud_rate(serial_port=serial_port, baud_rate=baud_rate)
+            elif isinstance(next_effect, ChangeSpeedEffect):
+                new_speed = mode_c_transmission_speeds.get(next_effect.baud_rate_id)
+                if isinstance(new_speed, int):
+                    await switch_baud_rate(serial_port=serial_port, baud_rate=new_speed)
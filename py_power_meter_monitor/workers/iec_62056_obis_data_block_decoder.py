@@ -0,0 +1,39 @@
+from logging import getLogger
+from typing import Dict, Optional
+
+from ..config import ObisDataSetConfig
+from ..iec_62056_protocol.data_block import DataBlock
+from ..iec_62056_protocol.obis_data_block import (
+    ObisDataBlock,
+    ObisDataSetCacheEntry,
+    ObisDataSetCacheKey,
+)
+from ..iec_62056_protocol.obis_data_set import ObisId
+from ..utils.bounded_cache import BoundedCache
+from ..utils.publish_subscribe_topic import OverflowPolicy, PublishSubscribeTopic
+
+logger = getLogger(__package__)
+
+
+async def decode_iec_62056_obis_data_blocks(
+    data_blocks: PublishSubscribeTopic[DataBlock],
+    obis_data_blocks: PublishSubscribeTopic[ObisDataBlock],
+    obis_data_set_configs_by_id: Dict[ObisId, ObisDataSetConfig],
+    obis_data_set_cache: Optional[
+        BoundedCache[ObisDataSetCacheKey, ObisDataSetCacheEntry]
+    ] = None,
+):
+    # a sink that blocks the decoder in turn blocks the reader
+    async for data_block in data_blocks.items(OverflowPolicy.BLOCK):
+        try:
+            obis_data_block = ObisDataBlock.from_iec_62056_21_data_block(
+                obis_data_set_configs=obis_data_set_configs_by_id,
+                data_block=data_block,
+                cache=obis_data_set_cache,
+            )
+        except ValueError:
+            # a single bad block must not stop the sinks of the meter
+            logger.exception(f"Failed to decode {data_block}")
+            continue
+
+        await obis_data_blocks.put(obis_data_block)
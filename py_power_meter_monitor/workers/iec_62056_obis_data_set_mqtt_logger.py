@@ -1,73 +1,452 @@
 # pyright: reportUnknownMemberType=false
+from dataclasses import dataclass
 import json
+from json.encoder import encode_basestring_ascii
 from logging import getLogger
+from math import isfinite
 import re
-from typing import Dict
+from time import monotonic, time
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional
 
 import asyncio_mqtt  # type: ignore
 
-from ..config import MqttConfig, ObisDataSetConfig
-from ..iec_62056_protocol.data_block import DataBlock
+from ..config import (
+    MqttConfig,
+    MqttStateMessageMode,
+    ObisDataSetConfig,
+    PublishPolicyConfig,
+)
+from ..iec_62056_protocol.data_block import DataBlockStatus
 from ..iec_62056_protocol.obis_data_block import ObisDataBlock
 from ..iec_62056_protocol.obis_data_set import (
     ObisDataSet,
     ObisId,
     UnknownObisDataSet,
+    format_obis_id,
 )
+from ..utils.pipelined_publisher import PipelinedPublisher
 from ..utils.publish_subscribe_topic import PublishSubscribeTopic
+from ..utils.readout_diagnostics import (
+    DecodeCacheKind,
+    ReadoutDiagnostics,
+    ReadoutErrorKind,
+    ReadoutPhase,
+)
 
 
 logger = getLogger(__package__)
 
 
 async def mqtt_log_iec_62056_obis_data_sets(
-    topic: PublishSubscribeTopic[DataBlock],
+    topic: PublishSubscribeTopic[ObisDataBlock],
     mqtt_client: asyncio_mqtt.Client,
     mqtt_config: MqttConfig,
     obis_data_set_configs_by_id: Dict[ObisId, ObisDataSetConfig],
+    diagnostics: Optional[ReadoutDiagnostics] = None,
 ):
+    publish_plan = compile_mqtt_publish_plan(
+        mqtt_config, obis_data_set_configs_by_id.values()
+    )
+    publisher = PipelinedPublisher(
+        mqtt_client=mqtt_client,
+        maximum_in_flight=mqtt_config.maximum_in_flight_publishes,
+    )
     configured_ids: set[ObisId] = set()
-
-    async for frame in topic.items():
-        obis_data_block = ObisDataBlock.from_iec_62056_21_data_block(
-            obis_data_set_configs=obis_data_set_configs_by_id, data_block=frame
-        )
-
-        for obis_data_set in obis_data_block.data_sets:
-            obis_data_set_config = obis_data_set_configs_by_id.get(obis_data_set.id)
-
+    # the last state payloads of confirmed and provisional (streamed) data sets
+    confirmed_state_payloads: dict[ObisId, bytes] = {}
+    provisional_state_payloads: dict[ObisId, bytes] = {}
+    # the timestamps and values last published for entities with a policy
+    published_values: dict[ObisId, PublishedValue] = {}
+    device_state_topic = get_device_state_topic(mqtt_config)
+    is_device_state_mode = mqtt_config.state_message_mode == MqttStateMessageMode.DEVICE
+    configured_diagnostic_keys: set[str] = set()
+
+    try:
+        async for obis_data_block in topic.items(mqtt_config.overflow_policy):
+            # device states are only published for complete and verified blocks
             if (
-                isinstance(obis_data_set, UnknownObisDataSet)
-                or obis_data_set_config is None
+                is_device_state_mode
+                and obis_data_block.status != DataBlockStatus.CONFIRMED
             ):
-                logger.error(f"Unknown obis data set config for id {obis_data_set.id}")
                 continue
 
-            # configure entity upon first sighting
-            if obis_data_set.id not in configured_ids:
-                configuration_topic = get_configuration_topic(
-                    mqtt_config, obis_data_set_config
-                )
-                configuration_payload = get_configuration_payload(
-                    mqtt_config=mqtt_config,
-                    obis_data_set_config=obis_data_set_config,
-                    obis_data_block=obis_data_block,
-                    obis_data_set=obis_data_set,
+            publish_start_time = monotonic()
+
+            device_state_values: dict[str, Any] = {}
+            is_device_state_due = False
+
+            for obis_data_set in obis_data_block.data_sets:
+                entity_plan = publish_plan.get(obis_data_set.id)
+
+                if isinstance(obis_data_set, UnknownObisDataSet) or entity_plan is None:
+                    logger.error(
+                        f"Unknown obis data set config for id {obis_data_set.id}"
+                    )
+                    continue
+
+                if obis_data_block.status == DataBlockStatus.RETRACTED:
+                    # restore the last confirmed state of retracted data sets
+                    provisional_state_payloads.pop(obis_data_set.id, None)
+                    published_values.pop(obis_data_set.id, None)
+                    confirmed_state_payload = confirmed_state_payloads.get(
+                        obis_data_set.id
+                    )
+
+                    if confirmed_state_payload is not None:
+                        await publisher.publish(
+                            topic=entity_plan.state_topic,
+                            payload=confirmed_state_payload,
+                            retain=True,
+                        )
+                    continue
+
+                # configure entity upon first sighting
+                if obis_data_set.id not in configured_ids:
+                    configuration_payload = get_configuration_payload(
+                        mqtt_config=mqtt_config,
+                        obis_data_set_config=entity_plan.obis_data_set_config,
+                        obis_data_block=obis_data_block,
+                        obis_data_set=obis_data_set,
+                    )
+                    await publisher.publish(
+                        topic=entity_plan.configuration_topic,
+                        payload=configuration_payload,
+                        retain=True,
+                    )
+                    configured_ids.add(obis_data_set.id)
+
+                publish_policy = entity_plan.publish_policy
+
+                if is_device_state_mode:
+                    device_state_values[
+                        entity_plan.device_state_key
+                    ] = obis_data_set.value
+                    is_device_state_due = (
+                        is_device_state_due
+                        or publish_policy is None
+                        or is_publish_due(
+                            publish_policy,
+                            obis_data_set,
+                            published_values.get(obis_data_set.id),
+                        )
+                    )
+                    continue
+
+                # publish state
+                state_payload = entity_plan.serialize_state(obis_data_set)
+
+                if obis_data_block.status == DataBlockStatus.PROVISIONAL:
+                    if publish_policy is not None and not is_publish_due(
+                        publish_policy,
+                        obis_data_set,
+                        published_values.get(obis_data_set.id),
+                    ):
+                        continue
+
+                    provisional_state_payloads[obis_data_set.id] = state_payload
+                else:
+                    provisional_state_payload = provisional_state_payloads.pop(
+                        obis_data_set.id, None
+                    )
+
+                    # unverified states are published, but never restored
+                    is_confirmed = obis_data_block.status == DataBlockStatus.CONFIRMED
+
+                    # a streamed data set has already been published provisionally
+                    if provisional_state_payload == state_payload:
+                        if is_confirmed:
+                            confirmed_state_payloads[obis_data_set.id] = state_payload
+                        continue
+
+                    # a differing provisional state is overwritten regardless of policy
+                    if (
+                        publish_policy is not None
+                        and provisional_state_payload is None
+                        and not is_publish_due(
+                            publish_policy,
+                            obis_data_set,
+                            published_values.get(obis_data_set.id),
+                        )
+                    ):
+                        continue
+
+                    if is_confirmed:
+                        confirmed_state_payloads[obis_data_set.id] = state_payload
+
+                await publisher.publish(
+                    topic=entity_plan.state_topic, payload=state_payload, retain=True
                 )
-                await mqtt_client.publish(
-                    topic=configuration_topic,
-                    payload=configuration_payload,
+
+                if publish_policy is not None:
+                    published_values[obis_data_set.id] = (
+                        obis_data_set.timestamp,
+                        obis_data_set.value,
+                    )
+
+            # the device state is published if any of its data sets is due
+            if is_device_state_due:
+                await publisher.publish(
+                    topic=device_state_topic,
+                    payload=get_device_state_payload(
+                        obis_data_block, device_state_values
+                    ),
                     retain=True,
                 )
-                configured_ids.add(obis_data_set.id)
 
-            # publish state
-            state_topic = get_state_topic(mqtt_config, obis_data_set_config)
-            state_payload = get_state_payload(obis_data_set)
+                for obis_data_set in obis_data_block.data_sets:
+                    if obis_data_set.id in publish_plan:
+                        published_values[obis_data_set.id] = (
+                            obis_data_set.timestamp,
+                            obis_data_set.value,
+                        )
+
+            await publisher.flush()
+
+            if diagnostics is not None:
+                diagnostics.record_phase(
+                    ReadoutPhase.PUBLISH, monotonic() - publish_start_time
+                )
+                diagnostics.dropped_data_block_count = topic.dropped_count
+
+                # once per readout rather than for each streamed data set
+                if obis_data_block.status in (
+                    DataBlockStatus.CONFIRMED,
+                    DataBlockStatus.UNVERIFIED,
+                ):
+                    await publish_diagnostics(
+                        publisher=publisher,
+                        mqtt_config=mqtt_config,
+                        diagnostics=diagnostics,
+                        obis_data_block=obis_data_block,
+                        configured_diagnostic_keys=configured_diagnostic_keys,
+                    )
+
+            logger.debug(
+                f"Published {publisher.published_count} messages with a mean latency "
+                f"of {publisher.mean_latency:.3f}s and a maximum latency of "
+                f"{publisher.maximum_latency:.3f}s."
+            )
+
+    finally:
+        # publishes handed to the client before a shutdown are still delivered
+        await publisher.drain()
+
+
+async def publish_diagnostics(
+    publisher: PipelinedPublisher,
+    mqtt_config: MqttConfig,
+    diagnostics: ReadoutDiagnostics,
+    obis_data_block: ObisDataBlock,
+    configured_diagnostic_keys: set[str],
+):
+    diagnostics_topic = get_diagnostics_topic(mqtt_config)
+    summary = diagnostics.get_summary()
+
+    # phases are only configured once they have been measured
+    for diagnostic_entity in get_diagnostic_entities(summary):
+        if diagnostic_entity.key in configured_diagnostic_keys:
+            continue
+
+        sensor_name = f"{mqtt_config.device.name} {diagnostic_entity.name}"
+        await publisher.publish(
+            topic=mqtt_config.configuration_topic_template.format(
+                entity_id=slugify_sensor_name(sensor_name)
+            ),
+            payload=get_diagnostic_configuration_payload(
+                mqtt_config=mqtt_config,
+                diagnostic_entity=diagnostic_entity,
+                obis_data_block=obis_data_block,
+            ),
+            retain=True,
+        )
+        configured_diagnostic_keys.add(diagnostic_entity.key)
+
+    await publisher.publish(
+        topic=diagnostics_topic,
+        payload=json.dumps({"timestamp": time(), **summary}),
+        retain=True,
+    )
+
+
+@dataclass(frozen=True)
+class MqttDiagnosticEntity:
+    key: str
+    name: str
+    value_template: str
+    attributes_template: Optional[str]
+    details: Mapping[str, str]
+
+
+phase_names = {
+    ReadoutPhase.SIGN_ON: "Sign-on Time",
+    ReadoutPhase.RESPONSE_DELAY: "Response Delay Time",
+    ReadoutPhase.TRANSFER: "Transfer Time",
+    ReadoutPhase.PARSE: "Parse Time",
+    ReadoutPhase.READOUT: "Readout Time",
+    ReadoutPhase.PUBLISH: "Publish Time",
+}
+
+error_names = {
+    ReadoutErrorKind.PARSING: "Parsing Errors",
+    ReadoutErrorKind.TIMEOUT: "Timeouts",
+    ReadoutErrorKind.BLOCK_CHECK_CHARACTER: "Block Check Character Errors",
+}
+
+decode_cache_names = {
+    DecodeCacheKind.DATA_SET: "Data Set Cache Hit Rate",
+    DecodeCacheKind.OBIS_DATA_SET: "OBIS Data Set Cache Hit Rate",
+}
+
+
+def get_diagnostic_entities(summary: Mapping[str, Any]) -> list[MqttDiagnosticEntity]:
+    # the state of a phase is its 95th percentile, the other statistics of its
+    # histogram are attributes
+    diagnostic_entities = [
+        MqttDiagnosticEntity(
+            key=f"phase_{phase.value}",
+            name=phase_names[phase],
+            value_template=f"{{{{ value_json.phases.{phase.value}.p95 }}}}",
+            attributes_template=f"{{{{ value_json.phases.{phase.value} | tojson }}}}",
+            details={
+                "unit_of_measurement": "s",
+                "device_class": "duration",
+                "state_class": "measurement",
+            },
+        )
+        for phase in ReadoutPhase
+        if phase.value in summary["phases"]
+    ]
+    diagnostic_entities.append(
+        MqttDiagnosticEntity(
+            key="dropped_data_blocks",
+            name="Dropped Data Blocks",
+            value_template="{{ value_json.dropped_data_blocks }}",
+            attributes_template=None,
+            details={"state_class": "total_increasing"},
+        )
+    )
+    diagnostic_entities.extend(
+        MqttDiagnosticEntity(
+            key=f"error_{error_kind.value}",
+            name=error_names[error_kind],
+            value_template=f"{{{{ value_json.errors.{error_kind.value} }}}}",
+            attributes_template=None,
+            details={"state_class": "total_increasing"},
+        )
+        for error_kind in ReadoutErrorKind
+    )
+    # the hits, misses and evictions of a cache are attributes
+    diagnostic_entities.extend(
+        MqttDiagnosticEntity(
+            key=f"decode_cache_{cache_kind.value}",
+            name=decode_cache_names[cache_kind],
+            value_template=(
+                f"{{{{ (value_json.decode_caches.{cache_kind.value}.hit_rate * 100)"
+                " | round(1) }}"
+            ),
+            attributes_template=(
+                f"{{{{ value_json.decode_caches.{cache_kind.value} | tojson }}}}"
+            ),
+            details={"unit_of_measurement": "%", "state_class": "measurement"},
+        )
+        for cache_kind in DecodeCacheKind
+        if cache_kind.value in summary["decode_caches"]
+    )
+
+    if summary["transfer_rate"] is not None:
+        diagnostic_entities.append(
+            MqttDiagnosticEntity(
+                key="transfer_rate",
+                name="Transfer Rate",
+                value_template="{{ value_json.transfer_rate | round(1) }}",
+                attributes_template=None,
+                details={
+                    "unit_of_measurement": "B/s",
+                    "device_class": "data_rate",
+                    "state_class": "measurement",
+                },
+            )
+        )
+
+    return diagnostic_entities
+
+
+def get_diagnostic_configuration_payload(
+    mqtt_config: MqttConfig,
+    diagnostic_entity: MqttDiagnosticEntity,
+    obis_data_block: ObisDataBlock,
+):
+    sensor_name = f"{mqtt_config.device.name} {diagnostic_entity.name}"
+    diagnostics_topic = get_diagnostics_topic(mqtt_config)
+
+    return json.dumps(
+        {
+            "name": sensor_name,
+            "state_topic": diagnostics_topic,
+            "value_template": diagnostic_entity.value_template,
+            **(
+                {
+                    "json_attributes_topic": diagnostics_topic,
+                    "json_attributes_template": diagnostic_entity.attributes_template,
+                }
+                if diagnostic_entity.attributes_template is not None
+                else {}
+            ),
+            "entity_category": "diagnostic",
+            "device": {
+                "identifiers": [obis_data_block.device_id],
+                "manufacturer": mqtt_config.device.manufacturer,
+                "model": (
+                    obis_data_block.manufacturer_identification
+                    or mqtt_config.device.model
+                ),
+                "name": mqtt_config.device.name,
+            },
+            "unique_id": sensor_name,
+            **diagnostic_entity.details,
+        }
+    )
+
+
+@dataclass(frozen=True)
+class MqttEntityPublishPlan:
+    obis_data_set_config: ObisDataSetConfig
+    state_topic: str
+    configuration_topic: str
+    serialize_state: Callable[[ObisDataSet], bytes]
+    # entities without a policy are published on every readout
+    publish_policy: Optional[PublishPolicyConfig]
+    device_state_key: str
+
+
+MqttPublishPlan = Mapping[ObisId, MqttEntityPublishPlan]
 
-            await mqtt_client.publish(
-                topic=state_topic, payload=state_payload, retain=True
+
+def compile_mqtt_publish_plan(
+    mqtt_config: MqttConfig, obis_data_set_configs: Iterable[ObisDataSetConfig]
+) -> MqttPublishPlan:
+    # topics and serializers only depend on the configuration, so they are
+    # derived once instead of for every reading
+    return MappingProxyType(
+        {
+            obis_data_set_config.id: MqttEntityPublishPlan(
+                obis_data_set_config=obis_data_set_config,
+                state_topic=get_state_topic(mqtt_config, obis_data_set_config),
+                configuration_topic=get_configuration_topic(
+                    mqtt_config, obis_data_set_config
+                ),
+                serialize_state=state_serializers[obis_data_set_config.value_type],
+                publish_policy=(
+                    obis_data_set_config.publish_policy
+                    if obis_data_set_config.publish_policy != PublishPolicyConfig()
+                    else None
+                ),
+                device_state_key=get_device_state_key(obis_data_set_config),
             )
+            for obis_data_set_config in obis_data_set_configs
+        }
+    )
 
 
 def get_configuration_payload(
@@ -77,14 +456,22 @@ def get_configuration_payload(
     obis_data_set: ObisDataSet,
 ):
     sensor_name = get_sensor_name(mqtt_config, obis_data_set_config)
-    state_topic = get_state_topic(mqtt_config, obis_data_set_config)
+
+    if mqtt_config.state_message_mode == MqttStateMessageMode.DEVICE:
+        state_topic = get_device_state_topic(mqtt_config)
+        value_template = (
+            f'{{{{ value_json["{get_device_state_key(obis_data_set_config)}"] }}}}'
+        )
+    else:
+        state_topic = get_state_topic(mqtt_config, obis_data_set_config)
+        value_template = "{{ value_json.value }}"
 
     return json.dumps(
         {
             **{
                 "name": sensor_name,
                 "state_topic": state_topic,
-                "value_template": "{{ value_json.value }}",
+                "value_template": value_template,
                 "device": {
                     "identifiers": [obis_data_block.device_id],
                     "manufacturer": mqtt_config.device.manufacturer,
@@ -107,6 +494,84 @@ def get_state_payload(obis_data_set: ObisDataSet):
     )
 
 
+PublishedValue = tuple[float, Any]
+
+
+def is_publish_due(
+    publish_policy: PublishPolicyConfig,
+    obis_data_set: ObisDataSet,
+    published_value: Optional[PublishedValue],
+) -> bool:
+    if published_value is None:
+        return True
+
+    published_timestamp, published = published_value
+    elapsed_time = obis_data_set.timestamp - published_timestamp
+
+    if (
+        publish_policy.minimum_interval
+        and elapsed_time < publish_policy.minimum_interval
+    ):
+        return False
+
+    if (
+        publish_policy.maximum_interval is not None
+        and elapsed_time >= publish_policy.maximum_interval
+    ):
+        return True
+
+    if not publish_policy.is_change_driven:
+        return True
+
+    value = obis_data_set.value
+
+    if isinstance(value, (int, float)) and isinstance(published, (int, float)):
+        return abs(value - published) > max(
+            publish_policy.absolute_deadband,
+            publish_policy.relative_deadband * abs(published),
+        )
+
+    return value != published
+
+
+def get_device_state_payload(
+    obis_data_block: ObisDataBlock, device_state_values: dict[str, Any]
+):
+    return json.dumps(
+        {
+            "timestamp": max(
+                obis_data_set.timestamp for obis_data_set in obis_data_block.data_sets
+            ),
+            **device_state_values,
+        },
+        separators=(",", ":"),
+    )
+
+
+def serialize_number_state(obis_data_set: ObisDataSet) -> bytes:
+    value = obis_data_set.value
+
+    # json encodes non-finite floats differently than `repr`
+    if isinstance(value, float) and not isfinite(value):
+        return get_state_payload(obis_data_set).encode()
+
+    return b'{"timestamp": %r, "value": %r}' % (obis_data_set.timestamp, value)
+
+
+def serialize_string_state(obis_data_set: ObisDataSet) -> bytes:
+    return b'{"timestamp": %r, "value": %s}' % (
+        obis_data_set.timestamp,
+        encode_basestring_ascii(obis_data_set.value).encode(),
+    )
+
+
+state_serializers: dict[str, Callable[[ObisDataSet], bytes]] = {
+    "integer": serialize_number_state,
+    "float": serialize_number_state,
+    "string": serialize_string_state,
+}
+
+
 def get_configuration_topic(
     mqtt_config: MqttConfig, obis_data_set_config: ObisDataSetConfig
 ):
@@ -125,6 +590,22 @@ def get_state_topic(mqtt_config: MqttConfig, obis_data_set_config: ObisDataSetCo
     )
 
 
+def get_device_state_topic(mqtt_config: MqttConfig):
+    return mqtt_config.device_state_topic_template.format(
+        device_id=slugify_sensor_name(mqtt_config.device.id)
+    )
+
+
+def get_diagnostics_topic(mqtt_config: MqttConfig):
+    return mqtt_config.diagnostics_topic_template.format(
+        device_id=slugify_sensor_name(mqtt_config.device.id)
+    )
+
+
+def get_device_state_key(obis_data_set_config: ObisDataSetConfig):
+    return format_obis_id(obis_data_set_config.id)
+
+
 def get_sensor_name(mqtt_config: MqttConfig, obis_data_set_config: ObisDataSetConfig):
     return f"{mqtt_config.device.name} {obis_data_set_config.name}"
 
@@ -0,0 +1,345 @@
+import asyncio
+from logging import getLogger
+import os
+from pathlib import Path
+from random import Random
+from time import monotonic, time
+from types import TracebackType
+from typing import Awaitable, Callable, Optional, Type, Union
+
+from ..iec_62056_protocol.data_block import DataBlock, DataSet
+from ..iec_62056_protocol.errors import Iec62056ProtocolError
+from ..iec_62056_protocol.frame_decoder import FrameDecoder
+from ..iec_62056_protocol.iec_62056_21_messages import (
+    AcknowledgementMessage,
+    CommandMessage,
+    DataMessage,
+    IdentificationMessage,
+    NegativeAcknowledgementMessage,
+    ProgrammingDataMessage,
+    RequestMessage,
+    stream_read_size,
+)
+from ..iec_62056_protocol.transmission_speeds import mode_c_transmission_speeds
+from ..utils.session_capture import SessionRecordKind, read_session_records
+
+logger = getLogger(__package__)
+
+# mode C uses 7 data bits, even parity and one stop bit besides the start bit
+mode_c_character_bits = 10
+# the interval at which paced data is handed to the monitor
+simulator_write_interval = 0.01
+
+MasterMessage = Union[
+    RequestMessage,
+    AcknowledgementMessage,
+    CommandMessage,
+    NegativeAcknowledgementMessage,
+]
+
+
+class PseudoTerminalStream:
+    def __init__(self, file_descriptor: int):
+        self.file_descriptor = file_descriptor
+        self.loop = asyncio.get_running_loop()
+        self.reader = asyncio.StreamReader()
+        os.set_blocking(file_descriptor, False)
+        self.loop.add_reader(file_descriptor, self.read_available)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ):
+        self.close()
+
+    def read_available(self):
+        try:
+            self.reader.feed_data(os.read(self.file_descriptor, stream_read_size))
+        except BlockingIOError:
+            pass
+
+    async def write(self, data: bytes):
+        remaining_data = memoryview(data)
+
+        while remaining_data:
+            try:
+                remaining_data = remaining_data[
+                    os.write(self.file_descriptor, remaining_data) :
+                ]
+            except BlockingIOError:
+                # the other end doesn't read fast enough
+                await asyncio.sleep(simulator_write_interval)
+
+    def close(self):
+        self.loop.remove_reader(self.file_descriptor)
+
+
+async def simulate_mode_c_meter(
+    reader: asyncio.StreamReader,
+    write: Callable[[bytes], Awaitable[None]],
+    identification: IdentificationMessage,
+    get_data_message: Callable[[], bytes],
+    initial_baud_rate: int = 300,
+    response_delay: float = 0.2,
+    noise_rate: float = 0.0,
+    random: Optional[Random] = None,
+):
+    random = random or Random()
+    buffer = bytearray()
+    baud_rate = initial_baud_rate
+    data_message: Optional[bytes] = None
+    programming_response: Optional[bytes] = None
+
+    while True:
+        message = await read_master_message(reader, buffer)
+        logger.debug(f"Simulated meter received {message}")
+
+        if isinstance(message, RequestMessage):
+            # every session starts at the initial baud rate
+            baud_rate = initial_baud_rate
+            response = bytes(identification)
+        elif isinstance(message, AcknowledgementMessage):
+            if message.mode_control not in ("0", "1"):
+                logger.warning(f"Simulated meter ignored {message}")
+                continue
+
+            baud_rate = mode_c_transmission_speeds.get(message.baud_rate_id, baud_rate)
+
+            if message.mode_control == "0":
+                data_message = get_data_message()
+                programming_response = None
+                response = add_line_noise(data_message, noise_rate, random)
+            else:
+                # the simulated meter doesn't protect programming mode with a
+                # password, so the master may read right after the prompt
+                data_message = None
+                programming_response = bytes(
+                    CommandMessage(timestamp=0, command="P0", data="()")
+                )
+                response = programming_response
+        elif isinstance(message, CommandMessage):
+            if message.command == "B0":
+                # the break ends the session without a response
+                data_message = None
+                programming_response = None
+                continue
+
+            programming_response = get_programming_response(message, get_data_message)
+            response = programming_response
+        elif data_message is not None:
+            # the noise of a repetition is independent of the first one
+            response = add_line_noise(data_message, noise_rate, random)
+        elif programming_response is not None:
+            response = programming_response
+        else:
+            continue
+
+        await asyncio.sleep(response_delay)
+        await write_paced(write, response, baud_rate)
+
+
+async def read_master_message(
+    reader: asyncio.StreamReader, buffer: bytearray
+) -> MasterMessage:
+    while True:
+        # bytes before the start of a message are line noise or messages of
+        # other modes, which the simulator doesn't support
+        message_start = min(
+            (
+                position
+                for position in (
+                    buffer.find(RequestMessage.initiator),
+                    buffer.find(AcknowledgementMessage.initiator),
+                    buffer.find(CommandMessage.initiator),
+                    buffer.find(NegativeAcknowledgementMessage.initiator),
+                )
+                if position >= 0
+            ),
+            default=len(buffer),
+        )
+        del buffer[:message_start]
+
+        if buffer[:1] == NegativeAcknowledgementMessage.initiator:
+            del buffer[:1]
+            return NegativeAcknowledgementMessage(timestamp=time())
+
+        if buffer[:1] == CommandMessage.initiator:
+            terminator_position = buffer.find(CommandMessage.terminator)
+            # the block check character follows the terminator
+            frame_end = (
+                terminator_position
+                + len(CommandMessage.terminator)
+                + CommandMessage.extra_bytes_after_terminator
+            )
+
+            if terminator_position < 0 or len(buffer) < frame_end:
+                buffer += await read_chunk(reader, buffer)
+                continue
+
+            frame = bytes(buffer[:frame_end])
+            del buffer[:frame_end]
+
+            try:
+                return CommandMessage.from_bytes(timestamp=time(), frame=frame)
+            except Iec62056ProtocolError:
+                logger.warning(f"Simulated meter received invalid frame {frame!r}")
+                continue
+
+        if (message_end := buffer.find(RequestMessage.terminator)) >= 0:
+            frame = bytes(buffer[: message_end + len(RequestMessage.terminator)])
+            del buffer[: len(frame)]
+
+            try:
+                if frame.startswith(RequestMessage.initiator):
+                    return RequestMessage.from_bytes(timestamp=time(), frame=frame)
+                else:
+                    return AcknowledgementMessage.from_bytes(
+                        timestamp=time(), frame=frame
+                    )
+            except Iec62056ProtocolError:
+                logger.warning(f"Simulated meter received invalid frame {frame!r}")
+                continue
+
+        buffer += await read_chunk(reader, buffer)
+
+
+async def read_chunk(reader: asyncio.StreamReader, buffer: bytearray) -> bytes:
+    chunk = await reader.read(stream_read_size)
+
+    if not chunk:
+        raise asyncio.IncompleteReadError(partial=bytes(buffer), expected=None)
+
+    return chunk
+
+
+def get_programming_response(
+    message: CommandMessage, get_data_message: Callable[[], bytes]
+) -> bytes:
+    if message.command == "R5" and message.data is not None:
+        # the data of a read command is the register address followed by
+        # its parameters, which the simulated meter doesn't support
+        address = message.data.split("(", 1)[0]
+        data_message = DataMessage.from_bytes(timestamp=0, frame=get_data_message())
+
+        for data_set in data_message.data.data_lines:
+            if data_set.address == address:
+                return bytes(
+                    ProgrammingDataMessage(
+                        timestamp=0,
+                        data=DataBlock(
+                            manufacturer_identification="", data_lines=[data_set]
+                        ),
+                    )
+                )
+
+    logger.warning(f"Simulated meter rejected {message}")
+
+    return bytes(
+        ProgrammingDataMessage(
+            timestamp=0,
+            data=DataBlock(
+                manufacturer_identification="",
+                data_lines=[DataSet(timestamp=0, address="", value="ERROR", unit=None)],
+            ),
+        )
+    )
+
+
+async def write_paced(
+    write: Callable[[bytes], Awaitable[None]], data: bytes, baud_rate: int
+):
+    # hand over the data no faster than the meter would transmit it
+    character_time = mode_c_character_bits / baud_rate
+    chunk_size = max(1, round(simulator_write_interval / character_time))
+    start_time = monotonic()
+
+    for chunk_start in range(0, len(data), chunk_size):
+        deadline = start_time + chunk_start * character_time
+
+        while (remaining_time := deadline - monotonic()) > 0:
+            await asyncio.sleep(remaining_time)
+
+        await write(data[chunk_start : chunk_start + chunk_size])
+
+    while (remaining_time := start_time + len(data) * character_time - monotonic()) > 0:
+        await asyncio.sleep(remaining_time)
+
+
+def add_line_noise(data_message: bytes, noise_rate: float, random: Random) -> bytes:
+    if noise_rate <= 0 or random.random() >= noise_rate:
+        return data_message
+
+    # flip a data bit between the start of text and the terminator, which the
+    # block check character always detects
+    frame = bytearray(data_message)
+    position = random.randrange(
+        len(DataMessage.initiator),
+        len(frame)
+        - len(DataMessage.terminator)
+        - DataMessage.extra_bytes_after_terminator,
+    )
+    frame[position] ^= 1 << random.randrange(7)
+
+    return bytes(frame)
+
+
+def create_synthetic_data_messages(
+    register_count: int, random: Random
+) -> Callable[[], bytes]:
+    energies = [random.uniform(0, 100000) for _ in range(register_count)]
+
+    def get_data_message() -> bytes:
+        power = random.uniform(0, 5000)
+        data_lines = [
+            DataSet(
+                timestamp=0, address="1-0:96.1.0*255", value="SIMULATED", unit=None
+            ),
+            DataSet(
+                timestamp=0, address="1-0:16.7.0*255", value=f"{power:08.2f}", unit="W"
+            ),
+        ]
+
+        for index in range(register_count):
+            energies[index] += power * random.uniform(0, 0.01)
+            data_lines.append(
+                DataSet(
+                    timestamp=0,
+                    address=f"1-0:1.8.{index}*255",
+                    value=f"{energies[index]:011.4f}",
+                    unit="kWh",
+                )
+            )
+
+        return bytes(
+            DataMessage(
+                timestamp=0,
+                data=DataBlock(manufacturer_identification="", data_lines=data_lines),
+            )
+        )
+
+    return get_data_message
+
+
+def load_captured_data_message(capture_file: Path) -> bytes:
+    decoder = FrameDecoder()
+
+    for record in read_session_records(capture_file):
+        if record.kind != SessionRecordKind.READ:
+            continue
+
+        decoder.feed(record.data)
+
+        try:
+            data_message = decoder.decode(DataMessage)
+        except Iec62056ProtocolError:
+            continue
+
+        if data_message is not None:
+            return bytes(data_message)
+
+    raise ValueError(f"{capture_file} doesn't contain a valid data message")
@@ -0,0 +1,87 @@
+import asyncio
+from logging import getLogger
+from time import time
+from typing import Optional
+
+from async_timeout import timeout
+
+from ..iec_62056_protocol.data_block import (
+    DataBlock,
+    DataSet,
+    DataSetFields,
+    cache_data_set_parser,
+)
+from ..iec_62056_protocol.errors import Iec62056ProtocolError
+from ..iec_62056_protocol.frame_decoder import FrameDecoder
+from ..iec_62056_protocol.iec_62056_21_messages import (
+    ModeDDataMessage,
+    stream_read_size,
+)
+from ..sml_protocol.errors import SmlProtocolError
+from ..sml_protocol.sml_frame_decoder import SmlFrameDecoder
+from ..sml_protocol.sml_messages import get_sml_data_block
+from ..utils.bounded_cache import BoundedCache
+from ..utils.publish_subscribe_topic import PublishSubscribeTopic
+from ..utils.serial_stream import SerialStream
+from .iec_62056_data_serial_reader import SerialConnection, read_message
+
+logger = getLogger(__package__)
+
+
+async def read_mode_d_data_from_serial(
+    topic: PublishSubscribeTopic[DataBlock],
+    serial_port: SerialConnection,
+    read_timeout: float,
+    data_set_cache: Optional[BoundedCache[bytes, DataSetFields]] = None,
+):
+    decoder = FrameDecoder(
+        parse_data_set=cache_data_set_parser(DataSet.from_bytes, data_set_cache)
+        if data_set_cache is not None
+        else DataSet.from_bytes,
+    )
+
+    while True:
+        try:
+            async with timeout(read_timeout):
+                message = await read_message(serial_port, ModeDDataMessage, decoder)
+
+            topic.publish(message.data)
+        except Iec62056ProtocolError:
+            # the next telegram follows without being requested
+            logger.exception("Failed to decode pushed mode D telegram")
+        except asyncio.TimeoutError:
+            logger.warning(f"Received no telegram within {read_timeout} seconds")
+            decoder.reset()
+
+
+async def read_sml_data_from_serial(
+    topic: PublishSubscribeTopic[DataBlock],
+    serial_port: SerialConnection,
+    read_timeout: float,
+):
+    decoder = SmlFrameDecoder()
+
+    while True:
+        try:
+            async with timeout(read_timeout):
+                while (payload := decoder.decode()) is None:
+                    decoder.feed(await read_chunk(serial_port))
+
+            topic.publish(get_sml_data_block(timestamp=time(), payload=payload))
+        except SmlProtocolError:
+            logger.exception("Failed to decode pushed SML telegram")
+        except asyncio.TimeoutError:
+            logger.warning(f"Received no telegram within {read_timeout} seconds")
+            decoder.reset()
+
+
+async def read_chunk(serial_port: SerialConnection) -> bytes:
+    if isinstance(serial_port, SerialStream):
+        chunk = await serial_port.reader.read(stream_read_size)
+
+        if not chunk:
+            raise asyncio.IncompleteReadError(partial=b"", expected=None)
+
+        return chunk
+    else:
+        return await serial_port.read_async(max(1, serial_port.in_waiting))
@@ -0,0 +1,128 @@
+import asyncio
+from random import Random
+
+from ...iec_62056_protocol.data_block import DataBlock, DataBlockStatus
+from ...iec_62056_protocol.iec_62056_21_messages import IdentificationMessage
+from ...utils.memory_serial_stream import MemorySerialStream
+from ...utils.publish_subscribe_topic import PublishSubscribeTopic
+from ...utils.readout_diagnostics import (
+    ReadoutDiagnostics,
+    ReadoutErrorKind,
+    ReadoutPhase,
+)
+from ..iec_62056_data_serial_reader import read_iec_62056_data_from_serial
+from ..mode_c_meter_simulator import (
+    create_synthetic_data_messages,
+    simulate_mode_c_meter,
+)
+
+identification = IdentificationMessage(
+    timestamp=0,
+    manufacturer_id="SIM",
+    baud_rate_id="6",
+    mode_ids="",
+    identification="METER",
+)
+
+
+def read_first_readout(
+    noise_rate: float, streaming_readout: bool = False
+) -> tuple[list[DataBlock], ReadoutDiagnostics]:
+    async def read():
+        stream = MemorySerialStream()
+        topic: PublishSubscribeTopic[DataBlock] = PublishSubscribeTopic()
+        diagnostics = ReadoutDiagnostics()
+        tasks = [
+            asyncio.create_task(
+                simulate_mode_c_meter(
+                    reader=stream.meter_reader,
+                    write=stream.send_from_meter,
+                    identification=identification,
+                    get_data_message=create_synthetic_data_messages(2, Random(0)),
+                    initial_baud_rate=19200,
+                    response_delay=0,
+                    noise_rate=noise_rate,
+                    random=Random(0),
+                )
+            ),
+            asyncio.create_task(
+                read_iec_62056_data_from_serial(
+                    topic=topic,
+                    serial_port=stream,
+                    baud_rate=300,
+                    polling_delay=0.1,
+                    response_delay=0.01,
+                    read_timeout=5,
+                    write_timeout=5,
+                    streaming_readout=streaming_readout,
+                    salvage_unverified_data=True,
+                    diagnostics=diagnostics,
+                )
+            ),
+        ]
+
+        data_blocks: list[DataBlock] = []
+
+        try:
+            async for data_block in topic.items():
+                data_blocks.append(data_block)
+
+                if data_block.status in (
+                    DataBlockStatus.CONFIRMED,
+                    DataBlockStatus.UNVERIFIED,
+                ):
+                    return (data_blocks, diagnostics)
+        finally:
+            # the reader stops at the end of the stream
+            stream.close()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    return asyncio.run(read())
+
+
+def test_measure_readout_phases():
+    ([data_block], diagnostics) = read_first_readout(noise_rate=0.0)
+
+    assert data_block.status == DataBlockStatus.CONFIRMED
+
+    for phase in (
+        ReadoutPhase.SIGN_ON,
+        ReadoutPhase.RESPONSE_DELAY,
+        ReadoutPhase.TRANSFER,
+        ReadoutPhase.PARSE,
+        ReadoutPhase.READOUT,
+    ):
+        assert diagnostics.phase_histograms[phase].count > 0
+
+    assert diagnostics.phase_histograms[ReadoutPhase.PUBLISH].count == 0
+    # the data lines are framed by the start and end of text, the end line and
+    # the block check character
+    assert diagnostics.received_byte_count == len(bytes(data_block)) + 6
+    assert diagnostics.transfer_rate is not None
+    assert set(diagnostics.error_counts.values()) == {0}
+
+
+def test_count_block_check_character_errors():
+    ([data_block], diagnostics) = read_first_readout(noise_rate=1.0)
+
+    assert data_block.status == DataBlockStatus.UNVERIFIED
+    assert diagnostics.error_counts[ReadoutErrorKind.BLOCK_CHECK_CHARACTER] == 1
+    assert diagnostics.error_counts[ReadoutErrorKind.PARSING] == 0
+    assert diagnostics.error_counts[ReadoutErrorKind.TIMEOUT] == 0
+
+
+def test_retract_streamed_data_sets_of_invalid_frame():
+    (data_blocks, _) = read_first_readout(noise_rate=1.0, streaming_readout=True)
+    streamed_data_sets = [
+        data_set
+        for data_block in data_blocks
+        if data_block.status == DataBlockStatus.PROVISIONAL
+        for data_set in data_block.data_lines
+    ]
+
+    assert streamed_data_sets
+    assert [data_block.status for data_block in data_blocks[-2:]] == [
+        DataBlockStatus.RETRACTED,
+        DataBlockStatus.UNVERIFIED,
+    ]
+    assert data_blocks[-2].data_lines == streamed_data_sets
@@ -0,0 +1,89 @@
+import asyncio
+
+from ...config import ObisFloatDataSetConfig
+from ...iec_62056_protocol.data_block import DataBlock, DataSet
+from ...iec_62056_protocol.obis_data_block import ObisDataBlock
+from ...utils.publish_subscribe_topic import PublishSubscribeTopic
+from ..iec_62056_obis_data_block_decoder import decode_iec_62056_obis_data_blocks
+
+obis_data_set_configs_by_id = {
+    (1, 0, 1, 8, 0, 255): ObisFloatDataSetConfig(
+        id=(1, 0, 1, 8, 0, 255), name="Energy", value_type="float"
+    ),
+}
+
+
+def create_data_block(address: str, value: str) -> DataBlock:
+    return DataBlock(
+        manufacturer_identification="LOG",
+        data_lines=[DataSet(timestamp=0, address=address, value=value, unit="kWh")],
+    )
+
+
+def decode_and_fan_out(
+    data_blocks_to_decode: list[DataBlock], sink_count: int
+) -> list[list[ObisDataBlock]]:
+    async def decode():
+        data_blocks: PublishSubscribeTopic[DataBlock] = PublishSubscribeTopic()
+        obis_data_blocks: PublishSubscribeTopic[ObisDataBlock] = PublishSubscribeTopic()
+        received_by_sink: list[list[ObisDataBlock]] = [[] for _ in range(sink_count)]
+
+        async def consume(received: list[ObisDataBlock]):
+            async for obis_data_block in obis_data_blocks.items():
+                received.append(obis_data_block)
+
+        tasks = [
+            asyncio.create_task(
+                decode_iec_62056_obis_data_blocks(
+                    data_blocks=data_blocks,
+                    obis_data_blocks=obis_data_blocks,
+                    obis_data_set_configs_by_id=obis_data_set_configs_by_id,
+                )
+            ),
+            *(asyncio.create_task(consume(received)) for received in received_by_sink),
+        ]
+        # let the stages subscribe before publishing
+        await asyncio.sleep(0)
+
+        for data_block in data_blocks_to_decode:
+            data_blocks.publish(data_block)
+
+        await data_blocks.join()
+        await obis_data_blocks.join()
+
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        return received_by_sink
+
+    return asyncio.run(decode())
+
+
+def test_decode_once_for_all_sinks():
+    (first_sink, second_sink) = decode_and_fan_out(
+        [create_data_block("1-0:1.8.0*255", "1.5")], sink_count=2
+    )
+
+    assert [data_set.value for data_set in first_sink[0].data_sets] == [1.5]
+    # the sinks share the same decoded block
+    assert len(first_sink) == len(second_sink) == 1
+    assert first_sink[0] is second_sink[0]
+
+
+def test_skip_blocks_that_fail_to_decode():
+    (received,) = decode_and_fan_out(
+        [
+            create_data_block("1-0:1.8.0*255", "1.5"),
+            create_data_block("1-0:x.8.0*255", "2.5"),
+            create_data_block("1-0:1.8.0*255", "twelve"),
+            create_data_block("1-0:1.8.0*255", "3.5"),
+        ],
+        sink_count=1,
+    )
+
+    assert [obis_data_block.data_sets[0].value for obis_data_block in received] == [
+        1.5,
+        3.5,
+    ]
@@ -0,0 +1,278 @@
+import asyncio
+import json
+from pathlib import Path
+import re
+from typing import Any, Optional, Union
+
+from hypothesis import given
+from hypothesis import strategies as st
+
+from ...commands.monitor_serial import get_meter_mqtt_config
+from ...config import (
+    MqttConfig,
+    ObisFloatDataSetConfig,
+    PublishPolicyConfig,
+    load_configuration_from_file_path,
+)
+from ...iec_62056_protocol.data_block import DataBlockStatus
+from ...iec_62056_protocol.obis_data_block import ObisDataBlock
+from ...iec_62056_protocol.obis_data_set import (
+    ObisFloatDataSet,
+    ObisId,
+    ObisIntegerDataSet,
+    ObisStringDataSet,
+)
+from ...utils.publish_subscribe_topic import PublishSubscribeTopic
+from ..iec_62056_obis_data_set_mqtt_logger import (
+    PublishedValue,
+    compile_mqtt_publish_plan,
+    get_state_topic,
+    is_publish_due,
+    mqtt_log_iec_62056_obis_data_sets,
+)
+
+config_directory = Path(__file__).parents[3] / "etc"
+
+power_obis_id: ObisId = (1, 0, 16, 7, 0, 255)
+
+
+# the per-message topics and payloads that preceded the publish plan
+def get_reference_topic(topic_template: str, mqtt_config: MqttConfig, name: str):
+    return topic_template.format(
+        entity_id=re.sub(r"\W", "-", f"{mqtt_config.device.name} {name}")
+    )
+
+
+def get_reference_state_payload(timestamp: float, value: Any) -> bytes:
+    return json.dumps({"timestamp": timestamp, "value": value}).encode()
+
+
+etc_mqtt_configs_and_plans = [
+    (
+        meter_mqtt_config,
+        compile_mqtt_publish_plan(meter_mqtt_config, meter_config.obis.data_sets),
+    )
+    for config_file_path in sorted(config_directory.glob("*-config.toml"))
+    for configuration in [load_configuration_from_file_path(config_file_path)]
+    for meter_config in configuration.meter_configs
+    for meter_mqtt_config in [get_meter_mqtt_config(configuration.mqtt, meter_config)]
+]
+
+
+class RecordingMqttClient:
+    def __init__(self, publish_delay: float = 0.0):
+        self.publish_delay = publish_delay
+        self.publications: list[tuple[str, bytes]] = []
+
+    async def publish(self, topic: str, payload: Union[bytes, str], retain: bool):
+        await asyncio.sleep(self.publish_delay)
+        self.publications.append(
+            (topic, payload.encode() if isinstance(payload, str) else payload)
+        )
+
+
+def get_power_data_set(timestamp: float, value: float) -> ObisFloatDataSet:
+    return ObisFloatDataSet(
+        timestamp=timestamp, id=power_obis_id, unit="kW", value=value
+    )
+
+
+def is_power_publish_due(
+    published_value: Optional[PublishedValue],
+    timestamp: float,
+    value: float,
+    **policy: Any,
+) -> bool:
+    return is_publish_due(
+        PublishPolicyConfig(**policy),
+        get_power_data_set(timestamp, value),
+        published_value,
+    )
+
+
+def test_publish_first_value():
+    assert is_power_publish_due(None, 0.0, 1.0, on_change=True, minimum_interval=60)
+
+
+def test_publish_changed_values():
+    assert not is_power_publish_due((0.0, 1.0), 1.0, 1.0, on_change=True)
+    assert is_power_publish_due((0.0, 1.0), 1.0, 1.5, on_change=True)
+
+
+def test_publish_every_value_without_change_policy():
+    assert not PublishPolicyConfig(minimum_interval=10).is_change_driven
+    assert is_power_publish_due((0.0, 1.0), 10.0, 1.0, minimum_interval=10)
+
+
+def test_publish_values_outside_absolute_deadband():
+    assert not is_power_publish_due((0.0, 10.0), 1.0, 10.5, absolute_deadband=0.5)
+    assert is_power_publish_due((0.0, 10.0), 1.0, 10.6, absolute_deadband=0.5)
+    assert is_power_publish_due((0.0, 10.0), 1.0, 9.4, absolute_deadband=0.5)
+
+
+def test_publish_values_outside_relative_deadband():
+    assert not is_power_publish_due((0.0, 100.0), 1.0, 104.0, relative_deadband=0.05)
+    assert is_power_publish_due((0.0, 100.0), 1.0, 106.0, relative_deadband=0.05)
+
+
+def test_apply_larger_deadband():
+    policy = {"absolute_deadband": 1.0, "relative_deadband": 0.05}
+
+    # 5% of 100 is larger than the absolute deadband
+    assert not is_power_publish_due((0.0, 100.0), 1.0, 104.0, **policy)
+    # the absolute deadband is larger than 5% of 10
+    assert not is_power_publish_due((0.0, 10.0), 1.0, 10.9, **policy)
+    assert is_power_publish_due((0.0, 10.0), 1.0, 11.1, **policy)
+
+
+def test_withhold_values_within_minimum_interval():
+    policy = {"on_change": True, "minimum_interval": 10}
+
+    assert not is_power_publish_due((0.0, 1.0), 9.0, 2.0, **policy)
+    assert is_power_publish_due((0.0, 1.0), 10.0, 2.0, **policy)
+
+
+def test_publish_unchanged_values_after_maximum_interval():
+    policy = {"on_change": True, "maximum_interval": 60}
+
+    assert not is_power_publish_due((0.0, 1.0), 59.0, 1.0, **policy)
+    assert is_power_publish_due((0.0, 1.0), 60.0, 1.0, **policy)
+
+
+def test_restore_and_republish_retracted_values():
+    async def publish_data_blocks():
+        mqtt_client = RecordingMqttClient()
+        mqtt_config = MqttConfig()
+        obis_data_set_config = ObisFloatDataSetConfig(
+            id=power_obis_id,
+            name="Power",
+            value_type="float",
+            publish_policy=PublishPolicyConfig(on_change=True),
+        )
+        topic: PublishSubscribeTopic[ObisDataBlock] = PublishSubscribeTopic()
+        worker = asyncio.create_task(
+            mqtt_log_iec_62056_obis_data_sets(
+                topic=topic,
+                mqtt_client=mqtt_client,  # type: ignore
+                mqtt_config=mqtt_config,
+                obis_data_set_configs_by_id={power_obis_id: obis_data_set_config},
+            )
+        )
+        await asyncio.sleep(0)
+
+        for (timestamp, value, status) in (
+            (0.0, 1.0, DataBlockStatus.CONFIRMED),
+            # unchanged values are withheld
+            (1.0, 1.0, DataBlockStatus.PROVISIONAL),
+            (1.0, 1.0, DataBlockStatus.CONFIRMED),
+            # a streamed value of an invalid frame is restored
+            (2.0, 2.0, DataBlockStatus.PROVISIONAL),
+            (2.0, 2.0, DataBlockStatus.RETRACTED),
+            # the restored value is no longer known to be published
+            (3.0, 1.0, DataBlockStatus.CONFIRMED),
+        ):
+            topic.publish(
+                ObisDataBlock(
+                    data_sets=[get_power_data_set(timestamp, value)],
+                    manufacturer_identification="SIM",
+                    status=status,
+                )
+            )
+            await topic.join()
+
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+
+        state_topic = get_state_topic(mqtt_config, obis_data_set_config)
+        return [
+            json.loads(payload)
+            for (publication_topic, payload) in mqtt_client.publications
+            if publication_topic == state_topic
+        ]
+
+    assert asyncio.run(publish_data_blocks()) == [
+        {"timestamp": 0.0, "value": 1.0},
+        {"timestamp": 2.0, "value": 2.0},
+        {"timestamp": 0.0, "value": 1.0},
+        {"timestamp": 3.0, "value": 1.0},
+    ]
+
+
+def test_deliver_pending_publishes_when_cancelled():
+    async def publish_data_block():
+        mqtt_client = RecordingMqttClient(publish_delay=0.01)
+        topic: PublishSubscribeTopic[ObisDataBlock] = PublishSubscribeTopic()
+        worker = asyncio.create_task(
+            mqtt_log_iec_62056_obis_data_sets(
+                topic=topic,
+                mqtt_client=mqtt_client,  # type: ignore
+                mqtt_config=MqttConfig(),
+                obis_data_set_configs_by_id={
+                    power_obis_id: ObisFloatDataSetConfig(
+                        id=power_obis_id, name="Power", value_type="float"
+                    )
+                },
+            )
+        )
+        await asyncio.sleep(0)
+
+        topic.publish(
+            ObisDataBlock(
+                data_sets=[get_power_data_set(0.0, 1.0)],
+                manufacturer_identification="SIM",
+            )
+        )
+        # cancels the worker while the configuration and state are in flight
+        await asyncio.sleep(0.001)
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+
+        return mqtt_client.publications
+
+    assert len(asyncio.run(publish_data_block())) == 2
+
+
+def test_compile_topics_of_etc_configs():
+    assert len(etc_mqtt_configs_and_plans) == 3
+
+    for mqtt_config, publish_plan in etc_mqtt_configs_and_plans:
+        for entity_plan in publish_plan.values():
+            name = entity_plan.obis_data_set_config.name
+
+            assert entity_plan.state_topic == get_reference_topic(
+                mqtt_config.state_topic_template, mqtt_config, name
+            )
+            assert entity_plan.configuration_topic == get_reference_topic(
+                mqtt_config.configuration_topic_template, mqtt_config, name
+            )
+
+
+@given(
+    timestamp=st.floats(allow_nan=False, allow_infinity=False),
+    integer=st.integers(),
+    float_value=st.floats(),
+    string=st.text(),
+)
+def test_serialize_states_of_etc_configs(
+    timestamp: float, integer: int, float_value: float, string: str
+):
+    for _, publish_plan in etc_mqtt_configs_and_plans:
+        for obis_id, entity_plan in publish_plan.items():
+            value_type = entity_plan.obis_data_set_config.value_type
+
+            if value_type == "integer":
+                obis_data_set = ObisIntegerDataSet(
+                    timestamp=timestamp, id=obis_id, unit=None, value=integer
+                )
+            elif value_type == "float":
+                obis_data_set = ObisFloatDataSet(
+                    timestamp=timestamp, id=obis_id, unit="kWh", value=float_value
+                )
+            else:
+                obis_data_set = ObisStringDataSet(
+                    timestamp=timestamp, id=obis_id, unit=None, value=string
+                )
+
+            assert entity_plan.serialize_state(
+                obis_data_set
+            ) == get_reference_state_payload(timestamp, obis_data_set.value)
@@ -0,0 +1,157 @@
+import asyncio
+import os
+from random import Random
+import tty
+from typing import Awaitable, Callable, TypeVar
+
+from pytest import raises
+
+from ...iec_62056_protocol.errors import BlockCheckCharacterError
+from ...iec_62056_protocol.frame_decoder import FrameDecoder
+from ...iec_62056_protocol.iec_62056_21_messages import (
+    AcknowledgementMessage,
+    CommandMessage,
+    DataMessage,
+    IdentificationMessage,
+    ProgrammingDataMessage,
+    RequestMessage,
+)
+from ..mode_c_meter_simulator import (
+    PseudoTerminalStream,
+    add_line_noise,
+    create_synthetic_data_messages,
+    simulate_mode_c_meter,
+)
+
+identification = IdentificationMessage(
+    timestamp=0,
+    manufacturer_id="SIM",
+    baud_rate_id="6",
+    mode_ids="",
+    identification="METER",
+)
+
+
+T = TypeVar("T")
+
+
+def run_with_simulator(
+    exchange: Callable[[asyncio.StreamReader, FrameDecoder, int], Awaitable[T]]
+) -> T:
+    async def run() -> T:
+        (controller, port) = os.openpty()
+        tty.setraw(controller)
+        tty.setraw(port)
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        loop.add_reader(port, lambda: reader.feed_data(os.read(port, 4096)))
+        stream = PseudoTerminalStream(controller)
+        simulator = asyncio.create_task(
+            simulate_mode_c_meter(
+                reader=stream.reader,
+                write=stream.write,
+                identification=identification,
+                get_data_message=create_synthetic_data_messages(2, Random(0)),
+                initial_baud_rate=19200,
+                response_delay=0,
+            )
+        )
+
+        try:
+            return await exchange(reader, FrameDecoder(), port)
+        finally:
+            simulator.cancel()
+            stream.close()
+            loop.remove_reader(port)
+            os.close(port)
+            os.close(controller)
+
+    return asyncio.run(run())
+
+
+async def sign_on(
+    reader: asyncio.StreamReader, decoder: FrameDecoder, port: int, mode_control: str
+) -> IdentificationMessage:
+    os.write(port, bytes(RequestMessage(timestamp=0)))
+    identification_message = await IdentificationMessage.read_from_stream(
+        reader, decoder
+    )
+    os.write(
+        port,
+        bytes(
+            AcknowledgementMessage(
+                timestamp=0,
+                protocol_control="0",
+                baud_rate_id=identification_message.baud_rate_id,
+                mode_control=mode_control,
+            )
+        ),
+    )
+
+    return identification_message
+
+
+def test_simulate_data_readout():
+    async def read_data(reader: asyncio.StreamReader, decoder: FrameDecoder, port: int):
+        identification_message = await sign_on(reader, decoder, port, "0")
+
+        return (
+            identification_message,
+            await DataMessage.read_from_stream(reader, decoder),
+        )
+
+    (identification_message, data_message) = run_with_simulator(read_data)
+
+    assert identification_message.identification == "METER"
+    assert [data_set.address for data_set in data_message.data.data_lines] == [
+        "1-0:96.1.0*255",
+        "1-0:16.7.0*255",
+        "1-0:1.8.0*255",
+        "1-0:1.8.1*255",
+    ]
+
+
+def test_answer_programming_mode_commands():
+    async def read_registers(
+        reader: asyncio.StreamReader, decoder: FrameDecoder, port: int
+    ):
+        await sign_on(reader, decoder, port, "1")
+        password_prompt = await CommandMessage.read_from_stream(reader, decoder)
+        responses = []
+
+        for address in ("1-0:16.7.0*255", "1-0:2.8.0*255"):
+            os.write(
+                port,
+                bytes(CommandMessage(timestamp=0, command="R5", data=f"{address}()")),
+            )
+            responses.append(
+                await ProgrammingDataMessage.read_from_stream(reader, decoder)
+            )
+
+        return (password_prompt, responses)
+
+    (password_prompt, responses) = run_with_simulator(read_registers)
+
+    assert password_prompt.command == "P0"
+    assert [
+        (data_set.address, data_set.unit)
+        for response in responses
+        for data_set in response.data.data_lines
+    ] == [("1-0:16.7.0*255", "W"), ("", None)]
+    assert responses[1].data.data_lines[0].value == "ERROR"
+
+
+def test_line_noise_corrupts_block_check_character():
+    get_data_message = create_synthetic_data_messages(4, Random(0))
+    random = Random(0)
+
+    for _ in range(100):
+        data_message = get_data_message()
+
+        assert add_line_noise(data_message, 0, random) == data_message
+
+        decoder = FrameDecoder()
+        decoder.feed(add_line_noise(data_message, 1, random))
+
+        with raises(BlockCheckCharacterError):
+            decoder.decode(DataMessage)